@@ -0,0 +1,21 @@
+"""
+ASGI config for ProjectRecipe project.
+
+Django 2.2 only speaks WSGI, so the WSGI application is served from a
+thread pool while the ASGI server handles the connections, e.g.:
+
+    uvicorn ProjectRecipe.asgi:application
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+from coreapp.asgi import WsgiToAsgi
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ProjectRecipe.settings')
+
+application = WsgiToAsgi(
+    get_wsgi_application(),
+    max_workers=int(os.environ.get('ASGI_THREADS', 32)),
+)
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'coreapp.apps.CoreappConfig',
     'userapp.apps.UserappConfig',
     'recipeapp.apps.RecipeappConfig',
@@ -81,15 +82,69 @@ WSGI_APPLICATION = 'ProjectRecipe.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'coreapp.db',
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
         'HOST': os.environ.get('DB_HOME'),
-        'PORT': os.environ.get('DB_PORT')
+        'PORT': os.environ.get('DB_PORT'),
+        # Reuse connections across requests, checking them before reuse
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Optional in-process pool, see coreapp.db. Connections go back to the pool
+# at the end of each request instead of staying with the thread.
+if os.environ.get('DB_POOL_SIZE'):
+    DATABASES['default'].update(
+        CONN_MAX_AGE=0,
+        POOL={
+            'MAX_SIZE': int(os.environ.get('DB_POOL_SIZE')),
+            'MAX_OVERFLOW': int(os.environ.get('DB_POOL_OVERFLOW', 0)),
+            'TIMEOUT': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+    )
+
+# Safe requests of the recipe API read from the replicas, see
+# coreapp.routers. Users are pinned to the primary after a write in a cache
+# shared by all workers, so replicas require CACHE_LOCATION. Tests run the
+# replica as a mirror of the primary, ProjectRecipe.test_settings gives it
+# its own test database instead.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        HOST=os.environ.get('DB_REPLICA_HOST'),
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['coreapp.routers.ReplicaRouter']
+
+RECIPE_READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Caches are local to each process unless CACHE_LOCATION names a shared
+# cache, memcached by default. The response cache of the recipe API is only
+# enabled with a shared cache, see recipeapp.cache, and so is the
+# in-process token cache, which needs revocations seen by every worker, see
+# userapp.authentication.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+if os.environ.get('CACHE_LOCATION'):
+    CACHES['shared'] = {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.memcached.MemcachedCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION'),
+    }
+    RECIPE_CACHE_ALIAS = 'shared'
+    RECIPE_REPLICA_PIN_ALIAS = 'shared'
+    RECIPE_TOKEN_REVOCATION_ALIAS = 'shared'
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -108,6 +163,59 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing profiles, selected with RECIPE_PASSWORD_HASHER. The first
+# hasher of a profile hashes new passwords, the others verify older hashes,
+# which are upgraded in the background after the next successful login.
+# Hashing costs about the same per login in every profile, the login
+# throughput comes from keeping the upgrades off the request path.
+
+PASSWORD_HASHER_PROFILES = {
+    'scrypt': [
+        'userapp.hashers.ScryptPasswordHasher',
+        'userapp.hashers.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    ],
+    'argon2': [
+        'userapp.hashers.TunedArgon2PasswordHasher',
+        'userapp.hashers.ScryptPasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    ],
+    'pbkdf2': [
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'userapp.hashers.ScryptPasswordHasher',
+        'userapp.hashers.TunedArgon2PasswordHasher',
+    ],
+}
+
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[
+    os.environ.get('RECIPE_PASSWORD_HASHER', 'scrypt')
+]
+
+AUTHENTICATION_BACKENDS = [
+    'userapp.backends.DeferredRehashModelBackend',
+]
+
+# Only used by manage.py test, switches to a fast password hasher
+TEST_RUNNER = 'userapp.tests.runner.FastHasherTestRunner'
+
+# Sliding-window throttles of the login and sign up endpoints. Counts are
+# kept per process unless RECIPE_THROTTLE_CACHE_ALIAS names a shared cache.
+# Clients are told apart by REMOTE_ADDR, or by X-Forwarded-For when
+# NUM_PROXIES gives the number of proxies in front of the app.
+REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_email': '10/min',
+        'signup_ip': '20/hour',
+    },
+}
+
+if os.environ.get('NUM_PROXIES'):
+    REST_FRAMEWORK['NUM_PROXIES'] = int(os.environ.get('NUM_PROXIES'))
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
 
@@ -0,0 +1,19 @@
+"""Settings for running the test suite
+
+    python manage.py test --settings=ProjectRecipe.test_settings
+
+The read replica gets its own test database on the primary's server,
+so the replica routing tests see rows the primary does not have.
+"""
+from ProjectRecipe.settings import *  # noqa: F401,F403
+from ProjectRecipe.settings import DATABASES
+
+DATABASES['replica'] = dict(
+    DATABASES['default'],
+    TEST={'NAME': 'test_%s_replica' % DATABASES['default']['NAME']},
+)
+
+RECIPE_READ_REPLICAS = ['replica']
+
+# The tests run in a single process, which shares its local caches
+SILENCED_SYSTEM_CHECKS = ['coreapp.E001']
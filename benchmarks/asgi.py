@@ -0,0 +1,187 @@
+"""Benchmark serving many slow keep-alive clients over WSGI and ASGI
+
+Each client sends several requests to the profile endpoint one after the
+other, and every request spends --latency ms receiving the request and
+sending the response, like a client on a slow network. The modes are:
+
+- wsgi: a fixed pool of threads, each held for the whole request
+- wsgi-per-client: one thread per client connection
+- asgi: ProjectRecipe.asgi, threads only held while the view runs
+
+Every mode runs in its own process so the memory figures do not mix:
+
+    python -m benchmarks.asgi --clients 1000 --requests 5
+"""
+import argparse
+import io
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks import utils
+
+MODES = ('wsgi', 'wsgi-per-client', 'asgi')
+
+
+def get_rss():
+    """Return the resident memory of this process in KiB"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+class PeakMemory(threading.Thread):
+    """Sample the resident memory until stopped, keeping the peak"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = get_rss()
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, get_rss())
+            time.sleep(0.01)
+
+    def stop(self):
+        self.running = False
+        self.join()
+        return self.peak
+
+
+def make_scope(path, token):
+    """Return the ASGI scope of an authenticated GET"""
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', ('Token %s' % token).encode()),
+        ],
+    }
+
+
+def run_wsgi(args, handler, scope, threads):
+    """Serve the clients with a pool of blocking threads"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from coreapp.asgi import WsgiToAsgi
+
+    latency = args.latency / 1000
+    make_environ = WsgiToAsgi(handler).get_environ
+
+    def client():
+        for _ in range(args.requests):
+            # Reading the request and writing the response hold the thread
+            time.sleep(latency / 2)
+            environ = make_environ(scope, io.BytesIO())
+            statuses = []
+            response = handler(environ, lambda s, h: statuses.append(s))
+            b''.join(response)
+            response.close()
+            time.sleep(latency / 2)
+            assert statuses[0].startswith('200'), statuses
+
+    with ThreadPoolExecutor(threads) as executor:
+        for future in [executor.submit(client)
+                       for _ in range(args.clients)]:
+            future.result()
+
+
+def run_asgi(args, handler, scope):
+    """Serve the clients from an event loop through the ASGI bridge"""
+    import asyncio
+
+    from coreapp.asgi import WsgiToAsgi
+
+    application = WsgiToAsgi(handler, max_workers=args.threads)
+    latency = args.latency / 1000
+
+    async def client():
+        for _ in range(args.requests):
+            messages = []
+
+            async def receive():
+                await asyncio.sleep(latency / 2)
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    await asyncio.sleep(latency / 2)
+                messages.append(message)
+
+            await application(scope, receive, send)
+            assert messages[0]['status'] == 200, messages[0]
+
+    async def main():
+        await asyncio.gather(*[client() for _ in range(args.clients)])
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(main())
+    loop.close()
+
+
+def run_mode(args):
+    """Serve all clients in one mode and print the throughput"""
+    utils.setup()
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import reverse
+
+    from coreapp.models import ExpiringToken
+
+    handler = get_wsgi_application()
+
+    with utils.test_database():
+        token = ExpiringToken.objects.create_token(utils.create_user())
+        scope = make_scope(reverse('userapp:profile'), token.key)
+
+        baseline = get_rss()
+        memory = PeakMemory()
+        memory.start()
+        start = time.perf_counter()
+
+        if args.mode == 'wsgi':
+            run_wsgi(args, handler, scope, args.threads)
+        elif args.mode == 'wsgi-per-client':
+            run_wsgi(args, handler, scope, args.clients)
+        else:
+            run_asgi(args, handler, scope)
+
+        elapsed = time.perf_counter() - start
+        peak = memory.stop()
+
+    print('%-16s %8.0f requests/s  %6.1f KiB/connection' % (
+        args.mode, args.clients * args.requests / elapsed,
+        (peak - baseline) / args.clients,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=50)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--mode', choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    for mode in MODES:
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.asgi', '--mode', mode] +
+            sys.argv[1:], check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
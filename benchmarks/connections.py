@@ -0,0 +1,65 @@
+"""Benchmark connection handling per request on PostgreSQL
+
+Each simulated request closes obsolete connections at its start and end,
+as Django does, and runs one trivial query in between:
+
+    python -m benchmarks.connections --repeat 500
+"""
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--pool-size', type=int, default=4)
+    args = parser.parse_args()
+
+    utils.setup()
+    from django.db import close_old_connections, connection
+
+    from coreapp.db import pool
+
+    if not hasattr(connection, 'get_pool'):
+        parser.exit(message='The default database must use coreapp.db\n')
+
+    scenarios = [
+        ('new connection per request', {'CONN_MAX_AGE': 0}),
+        ('persistent, health checked', {
+            'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True,
+        }),
+        ('pool', {
+            'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False,
+            'POOL': {'MAX_SIZE': args.pool_size},
+        }),
+        ('pool, health checked', {
+            'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True,
+            'POOL': {'MAX_SIZE': args.pool_size},
+        }),
+    ]
+
+    def request():
+        close_old_connections()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        close_old_connections()
+
+    for name, options in scenarios:
+        connection.close()
+        pool.close_pools()
+        connection.settings_dict.pop('POOL', None)
+        connection.settings_dict.update(options)
+
+        samples = utils.measure(request, repeat=args.repeat)
+        utils.report(name, samples)
+        stats = pool.get_stats().get(connection.alias)
+        if stats:
+            print('%40s %d checkouts, %d connects, %.2f ms waited' % (
+                '', stats['checkouts'], stats['connects'],
+                stats['wait_time'] * 1000,
+            ))
+
+
+if __name__ == '__main__':
+    main()
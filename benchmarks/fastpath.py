@@ -0,0 +1,57 @@
+"""Benchmark the read endpoints with and without the serializer bypass
+
+Every scenario is requested with RECIPE_FAST_READS off, which runs the
+serializers on model instances, and on, which builds the output from
+values() rows:
+
+    python -m benchmarks.fastpath --recipes 10000
+"""
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=10000)
+    parser.add_argument('--tags', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    utils.setup()
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    from coreapp.models import Recipe
+
+    # Repeated requests would otherwise be answered by the response cache
+    with utils.test_database(), override_settings(RECIPE_CACHE_ENABLED=False):
+        user = utils.create_user()
+        utils.seed_recipes(user, args.recipes, tags=args.tags)
+        client = utils.api_client(user)
+        recipe_id = Recipe.objects.values_list('id', flat=True).first()
+
+        scenarios = [
+            ('tags', reverse('recipeapp:tag-list'), {}),
+            ('recipes', reverse('recipeapp:recipe-list'), {}),
+            ('recipes page of 100', reverse('recipeapp:recipe-list'),
+             {'page_size': 100}),
+            ('recipe detail',
+             reverse('recipeapp:recipe-detail', args=[recipe_id]), {}),
+        ]
+
+        print('%d recipes, %d tags' % (args.recipes, args.tags))
+        for name, url, params in scenarios:
+            for enabled in (False, True):
+                with override_settings(RECIPE_FAST_READS=enabled):
+                    samples = utils.measure(
+                        lambda: client.get(url, params),
+                        repeat=args.repeat, warmup=2,
+                    )
+                utils.report('%s (%s)' % (
+                    name, 'values()' if enabled else 'serializer'
+                ), samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark logins per second per worker for each password hasher profile
+
+Every login goes through the token endpoint, so the numbers include the
+user lookup and the token insert besides hashing:
+
+    python -m benchmarks.login --repeat 50
+"""
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    utils.setup()
+    from django.conf import settings
+    from django.test.utils import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    url = reverse('userapp:token')
+    client = APIClient()
+    payload = {'email': 'bench@recipeapp.com', 'password': 'bench-pass-123'}
+
+    # Every login comes from one client, which would soon be throttled
+    unthrottled = {'DEFAULT_THROTTLE_RATES': {
+        'login_ip': None, 'login_email': None, 'signup_ip': None,
+    }}
+
+    with utils.test_database(), override_settings(REST_FRAMEWORK=unthrottled):
+        for profile, hashers in settings.PASSWORD_HASHER_PROFILES.items():
+            with override_settings(PASSWORD_HASHERS=hashers):
+                try:
+                    user = utils.create_user(payload['email'])
+                except ValueError as exc:
+                    # Missing optional library, e.g. argon2-cffi
+                    print('%-40s skipped: %s' % (profile, exc))
+                    continue
+
+                def login():
+                    response = client.post(url, payload)
+                    assert response.status_code == 200, response.data
+
+                samples = utils.measure(login, repeat=args.repeat, warmup=2)
+                utils.report('%s (%.0f logins/s)' % (
+                    profile, 1000 / (sum(samples) / len(samples))
+                ), samples)
+                user.delete()
+
+
+if __name__ == '__main__':
+    main()
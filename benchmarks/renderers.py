@@ -0,0 +1,63 @@
+"""Benchmark rendering the recipe list in each format of the API
+
+The recipes are serialized once, then rendered by every renderer, so
+the times only cover encoding:
+
+    python -m benchmarks.renderers --recipes 10000
+"""
+import argparse
+import gzip
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    utils.setup()
+    from rest_framework.renderers import JSONRenderer
+
+    from coreapp.models import Recipe
+    from recipeapp import renderers
+    from recipeapp.serializers import RecipeSerializer
+    from recipeapp.views import shape_queryset
+
+    with utils.test_database():
+        user = utils.create_user()
+        utils.seed_recipes(user, args.recipes)
+        serializer = RecipeSerializer(many=True)
+        data = RecipeSerializer(
+            shape_queryset(Recipe.objects.order_by('id'), serializer.child),
+            many=True,
+        ).data
+
+    candidates = [
+        ('DRF JSONRenderer', JSONRenderer()),
+        ('FastJSONRenderer (%s)' % (
+            'orjson' if renderers.orjson else 'no orjson, DRF encoder'
+        ), renderers.FastJSONRenderer()),
+        ('MessagePackRenderer', renderers.msgpack and
+         renderers.MessagePackRenderer()),
+        ('CBORRenderer', renderers.cbor2 and renderers.CBORRenderer()),
+    ]
+
+    print('%d recipes' % len(data))
+    for name, renderer in candidates:
+        if not renderer:
+            print('%-40s skipped: library not installed' % name)
+            continue
+
+        samples = utils.measure(lambda: renderer.render(data),
+                                repeat=args.repeat, warmup=2)
+        content = renderer.render(data)
+        utils.report(name, samples)
+        print('%40s %d bytes, %d gzipped' % (
+            '', len(content), len(gzip.compress(content))
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark the shopping list of a meal plan
+
+The shopping list endpoint aggregates the plan in SQL. It is compared to
+what clients did before: fetching every recipe in detail, here through
+the batch endpoint, and merging the ingredients themselves:
+
+    python -m benchmarks.shopping_list --recipes 100000 --plan 500
+"""
+import argparse
+import random
+from collections import Counter
+from decimal import Decimal
+
+from benchmarks import utils
+
+
+def merge_details(client, url, ids, batch_size):
+    """Build the shopping list from recipe details, like clients did"""
+    counts = Counter()
+    price = Decimal('0')
+    time_taken = 0
+
+    for start in range(0, len(ids), batch_size):
+        res = client.post(url, {'ids': ids[start:start + batch_size]},
+                          format='json')
+        for recipe in res.data['results']:
+            price += Decimal(recipe['price'])
+            time_taken += recipe['time_taken']
+            counts.update(
+                (item['id'], item['name']) for item in recipe['ingredient']
+            )
+
+    return counts, price, time_taken
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=100000)
+    parser.add_argument('--plan', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    utils.setup()
+    from django.urls import reverse
+
+    from coreapp.models import Recipe
+    from recipeapp.views import RecipeViewSet
+
+    with utils.test_database():
+        user = utils.create_user()
+        utils.seed_recipes(user, args.recipes)
+        client = utils.api_client(user)
+        ids = random.Random(args.plan).sample(
+            list(Recipe.objects.values_list('id', flat=True)), args.plan
+        )
+
+        shopping_list_url = reverse('recipeapp:recipe-shopping-list')
+        batch_url = reverse('recipeapp:recipe-batch')
+
+        print('%d recipes, plans of %d' % (args.recipes, args.plan))
+        samples = utils.measure(
+            lambda: client.post(shopping_list_url, {'ids': ids},
+                                format='json'),
+            repeat=args.repeat,
+        )
+        utils.report('shopping-list endpoint', samples)
+
+        samples = utils.measure(
+            lambda: merge_details(client, batch_url, ids,
+                                  RecipeViewSet.batch_max_ids),
+            repeat=max(1, args.repeat // 10), warmup=1,
+        )
+        utils.report('batch details merged by the client', samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark the cost of a login throttle check for each counter store
+
+Each check uses another email, like a credential stuffing run, so the
+counts cover many distinct keys:
+
+    python -m benchmarks.throttling --repeat 10000
+"""
+import argparse
+import itertools
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10000)
+    args = parser.parse_args()
+
+    utils.setup()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from rest_framework.parsers import JSONParser
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from userapp import throttling
+
+    factory = APIRequestFactory()
+    emails = ('user%d@druk.com' % i for i in itertools.count())
+    rates = {'DEFAULT_THROTTLE_RATES': {'login_email': '10/min'}}
+
+    for name, alias in (('count-min sketch', None), ('cache', 'default')):
+        with override_settings(REST_FRAMEWORK=rates,
+                               RECIPE_THROTTLE_CACHE_ALIAS=alias):
+            throttling.reset_stores()
+
+            def check():
+                request = Request(factory.post(
+                    '/', {'email': next(emails)}, format='json'
+                ), parsers=[JSONParser()])
+                throttle = throttling.LoginEmailThrottle()
+                assert throttle.allow_request(request, None)
+
+            samples = utils.measure(check, repeat=args.repeat)
+            with CaptureQueriesContext(connection) as queries:
+                check()
+            utils.report('%s, %d queries/check' % (name, len(queries)),
+                         samples)
+
+
+if __name__ == '__main__':
+    main()
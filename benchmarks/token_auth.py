@@ -0,0 +1,57 @@
+"""Benchmark token authentication with and without the token cache
+
+Requests go to the profile endpoint, which does no work besides
+authenticating, so the difference is the token lookup:
+
+    python -m benchmarks.token_auth --repeat 1000
+"""
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    utils.setup()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.test import APIRequestFactory
+
+    from coreapp.models import ExpiringToken
+    from userapp.authentication import CachedTokenAuthentication
+    from userapp.views import ManageUserView
+
+    class UncachedTokenAuthentication(TokenAuthentication):
+        model = ExpiringToken
+
+    with utils.test_database():
+        token = ExpiringToken.objects.create_token(utils.create_user())
+        factory = APIRequestFactory()
+
+        for authentication in (UncachedTokenAuthentication,
+                               CachedTokenAuthentication):
+            view = ManageUserView.as_view(
+                authentication_classes=(authentication,)
+            )
+
+            def request():
+                response = view(factory.get(
+                    '/', HTTP_AUTHORIZATION='Token %s' % token.key
+                ))
+                assert response.status_code == 200, response.status_code
+                response.render()
+
+            samples = utils.measure(request, repeat=args.repeat)
+            with CaptureQueriesContext(connection) as queries:
+                request()
+            utils.report('%s, %d queries/request' % (
+                authentication.__name__, len(queries)
+            ), samples)
+
+
+if __name__ == '__main__':
+    main()
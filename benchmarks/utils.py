@@ -0,0 +1,137 @@
+"""Helpers shared by the benchmark scripts
+
+Benchmarks run against a throwaway test database created from the
+configured settings and destroyed afterwards, e.g.:
+
+    python -m benchmarks.filters --recipes 1000000
+"""
+import os
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    """Configure Django for a standalone script"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ProjectRecipe.settings')
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Run the block against a freshly migrated test database"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, \
+        teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=200, warmup=10):
+    """Return the run times of func in milliseconds"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return samples
+
+
+def report(name, samples):
+    """Print p50/p95/max of the samples"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print('%-40s p50 %8.2f ms  p95 %8.2f ms  max %8.2f ms' % (
+        name, statistics.median(ordered), p95, ordered[-1]
+    ))
+
+
+def create_user(email='bench@recipeapp.com'):
+    """Create the user the benchmark requests run as"""
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(email, 'bench-pass-123')
+
+
+def seed_recipes(user, count, tags=20, ingredients=50, tags_per_recipe=2,
+                 ingredients_per_recipe=5, batch_size=5000):
+    """Bulk create recipes for user linked to random tags and ingredients"""
+    from coreapp.models import Ingredient, Recipe, Tag
+
+    Tag.objects.bulk_create([
+        Tag(custom_user=user, name='tag %d' % i) for i in range(tags)
+    ])
+    Ingredient.objects.bulk_create([
+        Ingredient(custom_user=user, name='ingredient %d' % i)
+        for i in range(ingredients)
+    ])
+    tag_ids = list(Tag.objects.filter(custom_user=user)
+                   .values_list('id', flat=True))
+    ingredient_ids = list(Ingredient.objects.filter(custom_user=user)
+                          .values_list('id', flat=True))
+
+    rng = random.Random(count)
+    TagThrough = Recipe.tag.through
+    IngredientThrough = Recipe.ingredient.through
+
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        last_id = Recipe.objects.order_by('-id') \
+            .values_list('id', flat=True).first() or 0
+        Recipe.objects.bulk_create([
+            Recipe(
+                custom_user=user,
+                title='Recipe %d' % (start + i),
+                time_taken=rng.randint(5, 120),
+                price=rng.randint(100, 9999) / 100,
+            )
+            for i in range(size)
+        ])
+        recipe_ids = Recipe.objects.filter(custom_user=user, id__gt=last_id) \
+            .values_list('id', flat=True)
+
+        tag_rows, ingredient_rows = [], []
+        for recipe_id in recipe_ids:
+            for tag_id in rng.sample(tag_ids, tags_per_recipe):
+                tag_rows.append(TagThrough(recipe_id=recipe_id, tag_id=tag_id))
+            for ingredient_id in rng.sample(ingredient_ids,
+                                            ingredients_per_recipe):
+                ingredient_rows.append(IngredientThrough(
+                    recipe_id=recipe_id, ingredient_id=ingredient_id
+                ))
+        TagThrough.objects.bulk_create(tag_rows)
+        IngredientThrough.objects.bulk_create(ingredient_rows)
+
+    return tag_ids, ingredient_ids
+
+
+def analyze():
+    """Refresh the planner statistics of the seeded tables"""
+    from django.db import connection
+
+    # Autovacuum would get there eventually, plans are off until it does
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def api_client(user):
+    """Return an API client authenticated as user"""
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CoreappConfig(AppConfig):
     name = 'coreapp'
+
+    def ready(self):
+        """Register the system checks"""
+        from coreapp import checks  # noqa: F401
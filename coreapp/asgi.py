@@ -0,0 +1,165 @@
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+RESPONSE_END = object()
+RESPONSE_FAILED = object()
+
+
+class WsgiToAsgi:
+    """Serve a WSGI application to an ASGI server from a thread pool
+
+    Receiving the request body and sending the response happen on the
+    event loop, so a slow client holds a coroutine rather than a thread.
+    A pool thread is only taken to run the view and produce the response,
+    all in that one thread since Django's connections are per thread.
+    """
+
+    def __init__(self, application, max_workers=None, spool_size=1024 * 1024,
+                 buffered_chunks=8):
+        self.application = application
+        self.executor = ThreadPoolExecutor(max_workers,
+                                           thread_name_prefix='asgi')
+        self.spool_size = spool_size
+        self.buffered_chunks = buffered_chunks
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError('Unsupported scope type %s' % scope['type'])
+
+    async def lifespan(self, receive, send):
+        """Acknowledge the server's startup and shutdown"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def http(self, scope, receive, send):
+        """Read the body, run the application and stream its response"""
+        body = await self.read_body(receive)
+        if body is None:
+            return
+
+        loop = asyncio.get_event_loop()
+        queue = asyncio.Queue(self.buffered_chunks)
+        environ = self.get_environ(scope, body)
+        future = loop.run_in_executor(
+            self.executor, self.run, environ, loop, queue
+        )
+
+        item = None
+        try:
+            item = await queue.get()
+            if item not in (RESPONSE_END, RESPONSE_FAILED):
+                status, headers = item
+                await send({
+                    'type': 'http.response.start',
+                    'status': status,
+                    'headers': headers,
+                })
+                while True:
+                    item = await queue.get()
+                    if item in (RESPONSE_END, RESPONSE_FAILED):
+                        break
+                    if item:
+                        await send({'type': 'http.response.body',
+                                    'body': item, 'more_body': True})
+                # A failed stream is left unfinished so the server aborts
+                # it, rather than passing a truncated body as complete
+                if item is RESPONSE_END:
+                    await send({'type': 'http.response.body'})
+        finally:
+            # Unblock the thread when the client went away mid response
+            while item not in (RESPONSE_END, RESPONSE_FAILED):
+                item = await queue.get()
+            body.close()
+
+        # Raises the application's error, if any
+        await future
+
+    async def read_body(self, receive):
+        """Return the request body spooled to a file, None on disconnect"""
+        body = tempfile.SpooledTemporaryFile(self.spool_size)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body'):
+                body.seek(0)
+                return body
+
+    def run(self, environ, loop, queue):
+        """Run the application in a pool thread, queueing its output"""
+        def put(item):
+            # Blocks the thread while the client is behind on a stream
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        try:
+            result = self.application(environ, start_response)
+            try:
+                chunks = iter(result)
+                first = next(chunks, b'')
+                put((response['status'], response['headers']))
+                put(first)
+                for chunk in chunks:
+                    put(chunk)
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        except BaseException:
+            put(RESPONSE_FAILED)
+            raise
+        put(RESPONSE_END)
+
+    def get_environ(self, scope, body):
+        """Return the WSGI environ of an ASGI HTTP scope"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': 'HTTP/%s' % scope.get('http_version', '1.1'),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = 'HTTP_' + name
+            value = value.decode('latin-1')
+            if name in environ:
+                value = environ[name] + ',' + value
+            environ[name] = value
+
+        return environ
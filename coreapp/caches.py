@@ -0,0 +1,11 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Backends whose entries are only seen by the process that wrote them
+LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(alias):
+    """Return True when all worker processes see the same cache entries"""
+    return not isinstance(caches[alias], LOCAL_BACKENDS)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from coreapp import routers
+from coreapp.caches import is_shared
+
+
+@register()
+def check_replica_pins(app_configs, **kwargs):
+    """Refuse replica reads with pins that worker processes do not share"""
+    alias = getattr(settings, 'RECIPE_REPLICA_PIN_ALIAS', 'default')
+    if not routers.get_replicas() or is_shared(alias):
+        return []
+
+    return [Error(
+        'RECIPE_READ_REPLICAS is set but the %r cache is local to each '
+        'process, users would not read their own writes when their next '
+        'request reaches another worker.' % alias,
+        hint='Point RECIPE_REPLICA_PIN_ALIAS to a shared cache such as '
+             'memcached.',
+        id='coreapp.E001',
+    )]
@@ -0,0 +1,119 @@
+"""PostgreSQL backend with connection health checks and an optional pool
+
+Settings read from the database's entry in DATABASES:
+
+- ``CONN_HEALTH_CHECKS``: check a reused connection with a trivial query
+  once per request before using it.
+- ``POOL``: ``MAX_SIZE``, ``MAX_OVERFLOW`` and ``TIMEOUT`` of an
+  in-process pool. Connections go back to the pool instead of being
+  closed, so it should be used with ``CONN_MAX_AGE = 0``.
+"""
+import functools
+
+from django.db.backends.postgresql.base import Database, \
+    DatabaseWrapper as PostgresDatabaseWrapper
+
+from coreapp.db import pool
+
+
+def connect(conn_params, isolation_level=None):
+    """Open a connection the way Django's backend does"""
+    connection = Database.connect(**conn_params)
+    if isolation_level is not None and \
+            isolation_level != connection.isolation_level:
+        connection.set_session(isolation_level=isolation_level)
+    return connection
+
+
+def ping(connection):
+    """Return True if the connection answers a trivial query"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    health_check_done = False
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def get_pool(self):
+        """Return the pool of this database, if pooling is configured"""
+        options = self.settings_dict.get('POOL')
+        if not options:
+            return None
+
+        def factory():
+            return pool.ConnectionPool(
+                functools.partial(
+                    connect,
+                    self.get_connection_params(),
+                    self.settings_dict['OPTIONS'].get('isolation_level'),
+                ),
+                max_size=options.get('MAX_SIZE', 10),
+                max_overflow=options.get('MAX_OVERFLOW', 0),
+                timeout=options.get('TIMEOUT', 30),
+                validate=ping if self.health_check_enabled else None,
+            )
+
+        return pool.get_pool(self.alias, factory)
+
+    def get_new_connection(self, conn_params):
+        connection_pool = self.get_pool()
+        if connection_pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = connection_pool.checkout()
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def connect(self):
+        super().connect()
+        # New or checked out of the pool, either way known to work
+        self.health_check_done = True
+
+    def _close(self):
+        connection_pool = self.get_pool()
+        if connection_pool is None:
+            return super()._close()
+
+        connection = self.connection
+        if self.in_atomic_block or connection.closed:
+            # Django keeps the closed connection around until the rollback
+            connection_pool.discard(connection)
+            return
+
+        try:
+            status = connection.get_transaction_status()
+            if status != Database.extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Database.Error:
+            connection_pool.discard(connection)
+        else:
+            connection_pool.checkin(connection)
+
+    def close_if_health_check_failed(self):
+        """Close a reused connection that no longer answers"""
+        if self.connection is None or not self.health_check_enabled or \
+                self.health_check_done or self.in_atomic_block:
+            return
+
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # Called at the start and the end of each request
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
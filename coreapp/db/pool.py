@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """No connection became free before the wait timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections
+
+    Up to max_size connections are kept open when idle. Another
+    max_overflow may be opened under load, they are closed as soon as they
+    are returned. Checkouts wait at most timeout seconds for a connection.
+    """
+
+    def __init__(self, connect, max_size=10, max_overflow=0, timeout=30,
+                 validate=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.validate = validate
+        self.pid = os.getpid()
+        self.idle = deque()
+        self.size = 0
+        self.condition = threading.Condition()
+        self.counters = dict.fromkeys((
+            'checkouts', 'connects', 'discarded', 'waits', 'timeouts',
+        ), 0)
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def checkout(self):
+        """Return an idle connection or a new one, waiting if at the limit"""
+        while True:
+            connection = self.reserve()
+            if connection is None:
+                return self.open()
+            if self.is_usable(connection):
+                return connection
+            self.discard(connection)
+
+    def reserve(self):
+        """Take an idle connection, or a slot for a new one (None)"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+
+        with self.condition:
+            while not self.idle and \
+                    self.size >= self.max_size + self.max_overflow:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    logger.warning('No database connection free after %ss',
+                                   self.timeout)
+                    raise PoolTimeout(
+                        'Timed out waiting for a database connection'
+                    )
+                waited = True
+                self.condition.wait(remaining)
+
+            self.counters['checkouts'] += 1
+            if waited:
+                elapsed = time.monotonic() - start
+                self.counters['waits'] += 1
+                self.wait_time += elapsed
+                self.max_wait_time = max(self.max_wait_time, elapsed)
+
+            if self.idle:
+                return self.idle.pop()
+            self.size += 1
+            return None
+
+    def open(self):
+        """Open a connection for a slot taken by reserve()"""
+        try:
+            connection = self.connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.counters['connects'] += 1
+        return connection
+
+    def is_usable(self, connection):
+        """Return True if an idle connection can be handed out"""
+        if connection.closed:
+            return False
+        return self.validate is None or self.validate(connection)
+
+    def checkin(self, connection):
+        """Return a connection, closing it if the pool has enough idle"""
+        with self.condition:
+            if not connection.closed and len(self.idle) < self.max_size:
+                self.idle.append(connection)
+                self.condition.notify()
+                return
+
+        self.discard(connection)
+
+    def discard(self, connection):
+        """Close a connection and free its slot"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+        with self.condition:
+            self.size -= 1
+            self.counters['discarded'] += 1
+            self.condition.notify()
+
+    def prewarm(self, count=None):
+        """Open idle connections up to count, by default the pool size"""
+        count = min(self.max_size, self.max_size if count is None else count)
+        opened = 0
+        while True:
+            with self.condition:
+                if self.size >= count:
+                    return opened
+                self.size += 1
+            self.checkin(self.open())
+            opened += 1
+
+    def close(self):
+        """Close all idle connections"""
+        with self.condition:
+            idle, self.idle = self.idle, deque()
+        for connection in idle:
+            self.discard(connection)
+
+    def stats(self):
+        """Return the pool's size and checkout counters"""
+        with self.condition:
+            stats = dict(
+                self.counters,
+                size=self.size,
+                idle=len(self.idle),
+                in_use=self.size - len(self.idle),
+                wait_time=self.wait_time,
+                max_wait_time=self.max_wait_time,
+            )
+        return stats
+
+
+def get_pool(alias, factory):
+    """Return the pool of alias in this process, made by factory()"""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        # Connections must not be shared with a forked parent
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[alias] = factory()
+        return pool
+
+
+def get_stats():
+    """Return the stats of every pool in this process by alias"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+def close_pools():
+    """Close the idle connections of all pools and forget the pools"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -1,22 +1,137 @@
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connections
-from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.db.migrations.executor import MigrationExecutor
+from django.db.utils import DatabaseError
+
+
+class MigrationsPending(Exception):
+    """The database is reachable but not migrated yet"""
 
 
 class Command(BaseCommand):
     """Django command to make DB wait till it is available"""
+    help = 'Wait until the databases answer queries, backing off between ' \
+           'attempts so starting workers do not hammer them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='databases',
+            help='Alias of a database to check, may be repeated. All '
+                 'databases are checked by default.',
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Seconds to wait before giving up, 0 tries once.',
+        )
+        parser.add_argument(
+            '--initial-delay', type=float, default=0.5,
+            help='Longest wait after the first failed attempt. It doubles '
+                 'with every attempt.',
+        )
+        parser.add_argument(
+            '--max-delay', type=float, default=10,
+            help='Longest wait between two attempts.',
+        )
+        parser.add_argument(
+            '--check-migrations', action='store_true',
+            help='Also wait until all migrations are applied.',
+        )
+        parser.add_argument(
+            '--prewarm', action='store_true',
+            help='Open the connections of the database pools in this '
+                 'process, e.g. when called while a server starts.',
+        )
 
     def handle(self, *args, **options):
+        aliases = options['databases'] or list(connections)
+        self.output_lock = threading.Lock()
         self.stdout.write("Checking database connection...")
-        db_conn = None
 
-        while not db_conn:
-            try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 sec...")
-                time.sleep(1)
+        deadline = time.monotonic() + options['timeout']
+        with ThreadPoolExecutor(max_workers=len(aliases)) as executor:
+            errors = list(executor.map(
+                lambda alias: self.wait_for(alias, deadline, options),
+                aliases,
+            ))
+
+        failed = ['%s (%s)' % (alias, error)
+                  for alias, error in zip(aliases, errors) if error]
+        if failed:
+            raise CommandError("Database unavailable after %ss: %s" % (
+                options['timeout'], ', '.join(failed)
+            ))
+
+        self.stdout.write(self.style.SUCCESS("Database available!"))
+
+        if options['prewarm']:
+            self.prewarm()
+
+    def write(self, message):
+        """Write a line, one thread at a time"""
+        with self.output_lock:
+            self.stdout.write(message)
+
+    def wait_for(self, alias, deadline, options):
+        """Probe a database until it is ready, return the last error"""
+        start = time.monotonic()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    self.check_database(alias)
+                    if options['check_migrations']:
+                        self.check_migrations(alias)
+                except (DatabaseError, MigrationsPending) as exc:
+                    error = exc
+                else:
+                    self.write("Database %s ready after %d attempt(s), "
+                               "%.1fs" % (alias, attempt,
+                                          time.monotonic() - start))
+                    return None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return error
+
+                delay = min(self.get_delay(attempt, options), remaining)
+                self.write("Database %s unavailable (%s), waiting %.1f "
+                           "sec..." % (alias, str(error).strip(), delay))
+                time.sleep(delay)
+        finally:
+            connections[alias].close()
+
+    def get_delay(self, attempt, options):
+        """Return a random wait below the exponentially growing cap"""
+        cap = min(options['max_delay'],
+                  options['initial_delay'] * 2 ** (attempt - 1))
+        # Full jitter spreads out workers that started together
+        return random.uniform(0, cap)
+
+    def check_database(self, alias):
+        """Run a trivial query on the database"""
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def check_migrations(self, alias):
+        """Raise MigrationsPending if migrations are left to apply"""
+        executor = MigrationExecutor(connections[alias])
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if plan:
+            raise MigrationsPending("%d unapplied migrations" % len(plan))
 
-        self.stdout.write(self.style.SUCCESS("Database available!"))
\ No newline at end of file
+    def prewarm(self):
+        """Fill the pools of the databases using a pooling backend"""
+        for alias in connections:
+            get_pool = getattr(connections[alias], 'get_pool', None)
+            pool = get_pool and get_pool()
+            if pool is not None:
+                opened = pool.prewarm()
+                self.stdout.write("Opened %d pooled connections to %s" % (
+                    opened, alias
+                ))
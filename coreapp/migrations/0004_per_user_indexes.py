@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+import coreapp.operations
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently on PostgreSQL, which cannot run
+    # inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('coreapp', '0003_recipe'),
+    ]
+
+    operations = [
+        coreapp.operations.AddIndexConcurrently(
+            model_name='tag',
+            index=models.Index(fields=['custom_user', 'name'], name='coreapp_tag_user_name_idx'),
+        ),
+        coreapp.operations.AddIndexConcurrently(
+            model_name='ingredient',
+            index=models.Index(fields=['custom_user', 'name'], name='coreapp_ingr_user_name_idx'),
+        ),
+        coreapp.operations.AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['custom_user', 'id'], name='coreapp_recipe_user_id_idx'),
+        ),
+        coreapp.operations.AddThroughIndexConcurrently(
+            model_name='recipe',
+            field_name='tag',
+            columns=['tag_id', 'recipe_id'],
+            name='coreapp_recipe_tag_rev_idx',
+        ),
+        coreapp.operations.AddThroughIndexConcurrently(
+            model_name='recipe',
+            field_name='ingredient',
+            columns=['ingredient_id', 'recipe_id'],
+            name='coreapp_recipe_ingr_rev_idx',
+        ),
+    ]
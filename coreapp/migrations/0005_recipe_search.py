@@ -0,0 +1,46 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+import coreapp.operations
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Compute search vectors for the existing recipes on PostgreSQL"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    from recipeapp.search import build_search_vector
+
+    Recipe = apps.get_model('coreapp', 'Recipe')
+    Recipe.objects.using(schema_editor.connection.alias) \
+        .update(search_vector=build_search_vector(Recipe))
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently on PostgreSQL, which cannot run
+    # inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('coreapp', '0004_per_user_indexes'),
+    ]
+
+    operations = [
+        coreapp.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        coreapp.operations.AddIndexConcurrently(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='coreapp_recipe_search_gin'),
+        ),
+        coreapp.operations.AddIndexConcurrently(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='coreapp_recipe_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+import coreapp.operations
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently on PostgreSQL, which cannot run
+    # inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('coreapp', '0005_recipe_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='modified_on',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='modified_on',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='modified_on',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        coreapp.operations.AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['custom_user', 'modified_on'], name='coreapp_recipe_user_mod_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+import coreapp.operations
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently on PostgreSQL, which cannot run
+    # inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('coreapp', '0006_modified_on'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('custom_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=32)),
+                ('object_id', models.IntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_on', models.DateTimeField(default=django.utils.timezone.now)),
+                ('custom_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['custom_user', 'change_seq'], name='coreapp_tomb_user_seq_idx')],
+            },
+        ),
+        # Existing rows keep 0, a first sync without a token returns them
+        migrations.AddField(
+            model_name='tag',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        coreapp.operations.AddIndexConcurrently(
+            model_name='tag',
+            index=models.Index(fields=['custom_user', 'change_seq'], name='coreapp_tag_user_seq_idx'),
+        ),
+        coreapp.operations.AddIndexConcurrently(
+            model_name='ingredient',
+            index=models.Index(fields=['custom_user', 'change_seq'], name='coreapp_ingr_user_seq_idx'),
+        ),
+        coreapp.operations.AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['custom_user', 'change_seq'], name='coreapp_recipe_user_seq_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def copy_permanent_tokens(apps, schema_editor):
+    """Give the holders of permanent tokens one more token lifetime"""
+    Token = apps.get_model('authtoken', 'Token')
+    ExpiringToken = apps.get_model('coreapp', 'ExpiringToken')
+    using = schema_editor.connection.alias
+    expires = django.utils.timezone.now() + getattr(
+        settings, 'RECIPE_TOKEN_LIFETIME', timedelta(days=7)
+    )
+
+    ExpiringToken.objects.using(using).bulk_create([
+        ExpiringToken(key=token.key, user_id=token.user_id,
+                      created=token.created, expires=expires)
+        for token in Token.objects.using(using).iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authtoken', '0002_auto_20160226_1747'),
+        ('coreapp', '0007_change_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiringToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiring_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(copy_permanent_tokens, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,10 @@
-from django.db import models
+import binascii
+import os
+from datetime import timedelta
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, router, transaction
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
     PermissionsMixin
 from django.utils import timezone
@@ -43,7 +49,124 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
-class Tag(models.Model):
+class ExpiringTokenManager(models.Manager):
+
+    def create_token(self, user, lifetime=None):
+        """Creates and saves a new token for the user"""
+        lifetime = lifetime or getattr(
+            settings, 'RECIPE_TOKEN_LIFETIME', timedelta(days=7)
+        )
+        now = timezone.now()
+
+        return self.create(
+            key=binascii.hexlify(os.urandom(20)).decode(),
+            user=user,
+            created=now,
+            expires=now + lifetime,
+        )
+
+
+class ExpiringToken(models.Model):
+    """Authentication token that stops working at its expiry time"""
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='expiring_tokens',
+    )
+    created = models.DateTimeField(default=timezone.now)
+    # Indexed so expired tokens can be purged in batches
+    expires = models.DateTimeField(db_index=True)
+
+    objects = ExpiringTokenManager()
+
+    @property
+    def is_expired(self):
+        """Return whether the token can no longer be used"""
+        return self.expires <= timezone.now()
+
+    def __str__(self):
+        return self.key
+
+
+class ChangeCounterManager(models.Manager):
+
+    def reserve(self, user_id, count=1, using=None):
+        """Reserve count change sequence numbers, return the last one
+
+        The counter row stays locked until the transaction ends, so the
+        writes of a user become visible in sequence order.
+        """
+        using = using or router.db_for_write(self.model)
+        counters = self.using(using).filter(custom_user_id=user_id)
+        with transaction.atomic(using=using, savepoint=False):
+            if not counters.update(value=models.F('value') + count):
+                try:
+                    with transaction.atomic(using=using):
+                        self.using(using).create(
+                            custom_user_id=user_id, value=count
+                        )
+                    return count
+                except IntegrityError:
+                    counters.update(value=models.F('value') + count)
+
+            return counters.values_list('value', flat=True).get()
+
+
+class ChangeCounter(models.Model):
+    """Last change sequence number handed out for a user's data"""
+    custom_user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    value = models.BigIntegerField(default=0)
+
+    objects = ChangeCounterManager()
+
+
+class ChangeTrackedModel(models.Model):
+    """Model whose writes are numbered for delta sync"""
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """Save with the next change sequence number of the owner"""
+        using = kwargs.get('using') or \
+            router.db_for_write(type(self), instance=self)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = \
+                set(kwargs['update_fields']) | {'change_seq'}
+
+        # The number must be taken in the transaction that writes the row
+        with transaction.atomic(using=using, savepoint=False):
+            self.change_seq = ChangeCounter.objects.reserve(
+                self.custom_user_id, using=using
+            )
+            super().save(*args, **kwargs)
+
+
+class Tombstone(models.Model):
+    """Record of a deleted tag, ingredient or recipe for delta sync"""
+    custom_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    model = models.CharField(max_length=32)
+    object_id = models.IntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_on = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['custom_user', 'change_seq'],
+                         name='coreapp_tomb_user_seq_idx'),
+        ]
+
+
+class Tag(ChangeTrackedModel):
     """Tags to be used for recipe"""
     name = models.CharField(max_length=255)
     custom_user = models.ForeignKey(
@@ -51,12 +174,21 @@ class Tag(models.Model):
         on_delete=models.CASCADE,
     )
     created_on = models.DateTimeField(default=timezone.now)
+    modified_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['custom_user', 'name'],
+                         name='coreapp_tag_user_name_idx'),
+            models.Index(fields=['custom_user', 'change_seq'],
+                         name='coreapp_tag_user_seq_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Ingredient(models.Model):
+class Ingredient(ChangeTrackedModel):
     """Ingredients to be used for recipe"""
     name = models.CharField(max_length=255)
     custom_user = models.ForeignKey(
@@ -64,12 +196,21 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE,
     )
     created_on = models.DateTimeField(default=timezone.now)
+    modified_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['custom_user', 'name'],
+                         name='coreapp_ingr_user_name_idx'),
+            models.Index(fields=['custom_user', 'change_seq'],
+                         name='coreapp_ingr_user_seq_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Recipe(models.Model):
+class Recipe(ChangeTrackedModel):
     """Recipe that has ingredients and tags"""
     title = models.CharField(max_length=255)
     time_taken = models.IntegerField()
@@ -81,6 +222,25 @@ class Recipe(models.Model):
     )
     ingredient = models.ManyToManyField("Ingredient", related_name="ingredients")
     tag = models.ManyToManyField("Tag", related_name="tags")
+    # Weighted title, tag and ingredient names, kept up to date by
+    # recipeapp.search on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Also touched when the tags or ingredients of the recipe change
+    modified_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['custom_user', 'id'],
+                         name='coreapp_recipe_user_id_idx'),
+            models.Index(fields=['custom_user', 'modified_on'],
+                         name='coreapp_recipe_user_mod_idx'),
+            models.Index(fields=['custom_user', 'change_seq'],
+                         name='coreapp_recipe_user_seq_idx'),
+            GinIndex(fields=['search_vector'],
+                     name='coreapp_recipe_search_gin'),
+            GinIndex(fields=['title'], opclasses=['gin_trgm_ops'],
+                     name='coreapp_recipe_title_trgm'),
+        ]
 
     def __str__(self):
         return self.title
@@ -0,0 +1,151 @@
+from django.contrib.postgres.indexes import PostgresIndex
+from django.contrib.postgres.operations import CreateExtension
+from django.db.migrations.operations import AddIndex
+from django.db.migrations.operations.base import Operation
+
+
+def is_postgresql(schema_editor):
+    """Return True when the migration runs against PostgreSQL"""
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+def drop_invalid_index(schema_editor, name):
+    """Drop an index a failed concurrent build left INVALID
+
+    PostgreSQL keeps the index of a failed CREATE INDEX CONCURRENTLY, so
+    IF NOT EXISTS would skip it on a rerun and queries would never get a
+    usable index.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT indisvalid FROM pg_index '
+            'WHERE indexrelid = to_regclass(%s)',
+            [schema_editor.quote_name(name)]
+        )
+        row = cursor.fetchone()
+
+    if row is not None and not row[0]:
+        schema_editor.execute(
+            'DROP INDEX CONCURRENTLY %s' % schema_editor.quote_name(name)
+        )
+
+
+class AddIndexConcurrently(AddIndex):
+    """Add an index without locking writes to the table on PostgreSQL
+
+    Migrations using it must set ``atomic = False``. PostgreSQL specific
+    index types are skipped on other databases.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+
+        if not is_postgresql(schema_editor):
+            if not isinstance(self.index, PostgresIndex):
+                schema_editor.add_index(model, self.index)
+            return
+
+        drop_invalid_index(schema_editor, self.index.name)
+        sql = str(self.index.create_sql(model, schema_editor))
+        schema_editor.execute(sql.replace(
+            'CREATE INDEX', 'CREATE INDEX CONCURRENTLY IF NOT EXISTS', 1
+        ))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+
+        if not is_postgresql(schema_editor):
+            if not isinstance(self.index, PostgresIndex):
+                schema_editor.remove_index(model, self.index)
+            return
+
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS %s' % (
+            schema_editor.quote_name(self.index.name)
+        ))
+
+
+class AddThroughIndexConcurrently(Operation):
+    """Add an index on the auto-created through table of a many-to-many field
+
+    Through tables have no Meta of their own, so the index lives only in
+    the database. Like AddIndexConcurrently it needs ``atomic = False``.
+    """
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, field_name, columns, name):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.columns = columns
+        self.name = name
+
+    def deconstruct(self):
+        kwargs = {
+            'model_name': self.model_name,
+            'field_name': self.field_name,
+            'columns': self.columns,
+            'name': self.name,
+        }
+        return self.__class__.__name__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def get_through_table(self, app_label, state):
+        """Return the db table of the field's through model"""
+        model = state.apps.get_model(app_label, self.model_name)
+        field = model._meta.get_field(self.field_name)
+        return model, field.remote_field.through._meta.db_table
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model, table = self.get_through_table(app_label, to_state)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+
+        create = 'CREATE INDEX'
+        if is_postgresql(schema_editor):
+            drop_invalid_index(schema_editor, self.name)
+            create = 'CREATE INDEX CONCURRENTLY IF NOT EXISTS'
+        schema_editor.execute('%s %s ON %s (%s)' % (
+            create,
+            schema_editor.quote_name(self.name),
+            schema_editor.quote_name(table),
+            ', '.join(schema_editor.quote_name(c) for c in self.columns),
+        ))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model, table = self.get_through_table(app_label, from_state)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+
+        if is_postgresql(schema_editor):
+            schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS %s' % (
+                schema_editor.quote_name(self.name)
+            ))
+        else:
+            schema_editor.execute(schema_editor.sql_delete_index % {
+                'name': schema_editor.quote_name(self.name),
+                'table': schema_editor.quote_name(table),
+            })
+
+    def describe(self):
+        return 'Create index %s on the through table of %s.%s' % (
+            self.name, self.model_name, self.field_name
+        )
+
+
+class TrigramExtension(CreateExtension):
+    """Install pg_trgm, a no-op on databases other than PostgreSQL"""
+
+    def __init__(self):
+        self.name = 'pg_trgm'
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if is_postgresql(schema_editor):
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
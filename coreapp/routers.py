@@ -0,0 +1,126 @@
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.utils import ConnectionDoesNotExist
+
+logger = logging.getLogger(__name__)
+
+PIN_KEY = 'coreapp:replica-pin:%s'
+
+_local = threading.local()
+
+
+def get_replicas():
+    """Return the aliases of the read replicas"""
+    return getattr(settings, 'RECIPE_READ_REPLICAS', [])
+
+
+def get_check_interval():
+    """Return the seconds a replica health check result is trusted"""
+    return getattr(settings, 'RECIPE_REPLICA_CHECK_INTERVAL', 5)
+
+
+def get_pin_seconds():
+    """Return the seconds a user reads from the primary after a write"""
+    return getattr(settings, 'RECIPE_REPLICA_PIN_SECONDS', 10)
+
+
+def get_pin_cache():
+    """Return the cache holding which users are pinned to the primary"""
+    return caches[getattr(settings, 'RECIPE_REPLICA_PIN_ALIAS', 'default')]
+
+
+class ReplicaHealth:
+    """Remember whether each replica answered its last health check"""
+
+    def __init__(self):
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def is_healthy(self, alias):
+        """Return whether alias is usable, checking it when due"""
+        now = time.monotonic()
+        with self.lock:
+            checked_at, healthy = self.results.get(alias, (None, False))
+        if checked_at is not None and now - checked_at < get_check_interval():
+            return healthy
+
+        healthy = self.check(alias)
+        with self.lock:
+            self.results[alias] = (now, healthy)
+        return healthy
+
+    def check(self, alias):
+        """Run a trivial query on alias"""
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except ConnectionDoesNotExist:
+            logger.error('Read replica %s is not configured', alias)
+            return False
+        except DatabaseError:
+            logger.warning('Read replica %s failed its health check', alias,
+                           exc_info=True)
+            connections[alias].close()
+            return False
+        return True
+
+    def reset(self):
+        """Forget all check results"""
+        with self.lock:
+            self.results.clear()
+
+
+health = ReplicaHealth()
+
+
+def start_replica_reads():
+    """Let the reads of the current thread go to a replica"""
+    _local.replica_reads = True
+
+
+def end_replica_reads():
+    """Send the reads of the current thread to the primary again"""
+    _local.replica_reads = False
+
+
+def pin(user_id):
+    """Send the user's reads to the primary until replicas caught up"""
+    if get_replicas():
+        get_pin_cache().set(PIN_KEY % user_id, True, get_pin_seconds())
+
+
+def is_pinned(user_id):
+    """Return True if the user wrote recently"""
+    return bool(get_pin_cache().get(PIN_KEY % user_id))
+
+
+class ReplicaRouter:
+    """Route reads to a healthy replica while replica reads are enabled
+
+    Writes, reads inside a transaction on the primary and reads while no
+    replica is healthy all go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_local, 'replica_reads', False):
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        replicas = [
+            alias for alias in get_replicas() if health.is_healthy(alias)
+        ]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
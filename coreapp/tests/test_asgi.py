@@ -0,0 +1,173 @@
+import asyncio
+import json
+
+from django.core.wsgi import get_wsgi_application
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from coreapp.asgi import WsgiToAsgi
+
+RECIPES_URL = reverse('recipeapp:recipe-list')
+TOKEN_URL = reverse('userapp:token')
+
+
+class StreamingResponse:
+    """WSGI response yielding many chunks and recording when it is closed"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class WsgiToAsgiTests(SimpleTestCase):
+    """Test serving the WSGI application over ASGI"""
+
+    def request(self, application, method='GET', path='/', headers=(),
+                body_chunks=(b'',), on_send=None):
+        """Run one HTTP request, return the messages sent by the app"""
+        scope = {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': b'',
+            'headers': [(n.encode(), v.encode())
+                        for n, v in (('Host', 'testserver'),) + headers],
+        }
+        incoming = [
+            {'type': 'http.request', 'body': chunk,
+             'more_body': i < len(body_chunks) - 1}
+            for i, chunk in enumerate(body_chunks)
+        ]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            if on_send:
+                await on_send(message)
+            sent.append(message)
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(application(scope, receive, send))
+        finally:
+            loop.close()
+        return sent
+
+    def get_body(self, sent):
+        """Return the response body of the sent messages"""
+        return b''.join(message.get('body', b'') for message in sent[1:])
+
+    def test_django_response(self):
+        """Test a Django response is sent with its status and headers"""
+        application = WsgiToAsgi(get_wsgi_application(), max_workers=2)
+
+        sent = self.request(application, path=RECIPES_URL)
+
+        self.assertEqual(sent[0]['status'], 401)
+        self.assertIn((b'content-type', b'application/json'),
+                      sent[0]['headers'])
+        self.assertIn('detail', json.loads(self.get_body(sent).decode()))
+
+    def test_request_body_in_chunks(self):
+        """Test a body received in several messages reaches the view"""
+        application = WsgiToAsgi(get_wsgi_application(), max_workers=2)
+        body = json.dumps({'email': 'atman@druk.com'}).encode()
+
+        sent = self.request(
+            application, method='POST', path=TOKEN_URL,
+            headers=(('Content-Type', 'application/json'),
+                     ('Content-Length', str(len(body)))),
+            body_chunks=[body[:5], body[5:]],
+        )
+
+        self.assertEqual(sent[0]['status'], 400)
+        self.assertIn('password', json.loads(self.get_body(sent).decode()))
+
+    def test_streaming_response(self):
+        """Test long responses are streamed in order and then closed"""
+        response = StreamingResponse([b'%d,' % i for i in range(50)])
+
+        def wsgi_application(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/csv')])
+            return response
+
+        application = WsgiToAsgi(wsgi_application, buffered_chunks=2)
+        sent = self.request(application)
+
+        self.assertEqual(self.get_body(sent),
+                         b''.join(b'%d,' % i for i in range(50)))
+        self.assertFalse(sent[-1].get('more_body'))
+        self.assertTrue(response.closed)
+
+    def test_thread_released_before_slow_send(self):
+        """Test the view's thread is done before a slow client is served"""
+        response = StreamingResponse([b'recipes'])
+        closed_when_sent = []
+
+        def wsgi_application(environ, start_response):
+            start_response('200 OK', [])
+            return response
+
+        async def slow_client(message):
+            await asyncio.sleep(0.05)
+            closed_when_sent.append(response.closed)
+
+        self.request(WsgiToAsgi(wsgi_application), on_send=slow_client)
+
+        self.assertTrue(closed_when_sent[-1])
+
+    def test_client_gone_before_body(self):
+        """Test the view does not run when the client disconnects early"""
+        def wsgi_application(environ, start_response):
+            raise AssertionError('Should not be called')
+
+        application = WsgiToAsgi(wsgi_application)
+        scope = {'type': 'http', 'method': 'POST', 'path': '/',
+                 'query_string': b'', 'headers': []}
+
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            raise AssertionError('Nothing should be sent')
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(application(scope, receive, send))
+        loop.close()
+
+    def test_application_error_raised(self):
+        """Test an error before the response starts reaches the server"""
+        def wsgi_application(environ, start_response):
+            raise RuntimeError('broken')
+
+        with self.assertRaisesMessage(RuntimeError, 'broken'):
+            self.request(WsgiToAsgi(wsgi_application))
+
+    def test_error_while_streaming_not_finished(self):
+        """Test a response failing mid stream is not sent as complete"""
+        def chunks():
+            yield b'first,'
+            raise RuntimeError('broken')
+
+        def wsgi_application(environ, start_response):
+            start_response('200 OK', [])
+            return chunks()
+
+        sent = []
+
+        async def record(message):
+            sent.append(message)
+
+        with self.assertRaisesMessage(RuntimeError, 'broken'):
+            self.request(WsgiToAsgi(wsgi_application), on_send=record)
+
+        self.assertEqual(self.get_body(sent), b'first,')
+        self.assertTrue(sent[-1].get('more_body'))
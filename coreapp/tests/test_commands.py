@@ -1,23 +1,92 @@
+import io
 from unittest.mock import patch
 
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.db.utils import OperationalError
-from django.test import TestCase
+from django.test import TransactionTestCase
 
+from coreapp.management.commands.wait_for_db import Command, \
+    MigrationsPending
 
-class CommandTests(TestCase):
+CHECK_DATABASE = \
+    'coreapp.management.commands.wait_for_db.Command.check_database'
+CHECK_MIGRATIONS = \
+    'coreapp.management.commands.wait_for_db.Command.check_migrations'
+
+
+class CommandTests(TransactionTestCase):
+
+    def wait_for_db(self, **options):
+        """Run wait_for_db on the default database, return its output"""
+        out = io.StringIO()
+        call_command('wait_for_db', database=['default'], stdout=out,
+                     **options)
+        return out.getvalue()
 
     def test_wait_for_db_ready(self):
         """Test waiting for DB when DB is available"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+        out = self.wait_for_db(check_migrations=True)
+
+        self.assertIn('Database default ready after 1 attempt(s)', out)
+        self.assertIn('Database available!', out)
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
         """Test waiting for DB"""
+        with patch(CHECK_DATABASE) as check:
+            check.side_effect = [OperationalError] * 5 + [None]
+            self.wait_for_db()
+
+        self.assertEqual(check.call_count, 6)
+        self.assertEqual(ts.call_count, 5)
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_backs_off(self, ts):
+        """Test the waits stay below a doubling, capped limit"""
+        with patch(CHECK_DATABASE) as check:
+            check.side_effect = [OperationalError] * 6 + [None]
+            self.wait_for_db(initial_delay=1, max_delay=8)
+
+        caps = [1, 2, 4, 8, 8, 8]
+        for call, cap in zip(ts.call_args_list, caps):
+            self.assertLessEqual(call[0][0], cap)
+
+    def test_wait_for_db_timeout(self):
+        """Test giving up once the timeout has passed"""
+        with patch(CHECK_DATABASE, side_effect=OperationalError('down')):
+            with self.assertRaisesMessage(CommandError, 'default (down)'):
+                self.wait_for_db(timeout=0)
+
+    def test_wait_for_db_checks_all_databases(self):
+        """Test every configured database is probed by default"""
+        with patch(CHECK_DATABASE) as check:
+            call_command('wait_for_db', stdout=io.StringIO())
+
+        self.assertIn('default', [call[0][0] for call in check.call_args_list])
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_migrations(self, ts):
+        """Test waiting until the migrations are applied"""
+        with patch(CHECK_MIGRATIONS) as check:
+            check.side_effect = [MigrationsPending('2 unapplied')] * 2 + \
+                [None]
+            out = self.wait_for_db(check_migrations=True)
+
+        self.assertIn('Database default unavailable (2 unapplied)', out)
+        self.assertEqual(check.call_count, 3)
+
+    def test_unapplied_migrations_detected(self):
+        """Test pending migrations are found"""
+        call_command('migrate', 'coreapp', '0007', verbosity=0)
+        self.addCleanup(call_command, 'migrate', verbosity=0)
+
+        with self.assertRaises(MigrationsPending):
+            Command().check_migrations('default')
+
+    def test_wait_for_db_prewarm(self):
+        """Test the connection pools are filled when asked to"""
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+            gi.return_value.get_pool.return_value.prewarm.return_value = 4
+            out = self.wait_for_db(prewarm=True)
+
+        self.assertIn('Opened 4 pooled connections to default', out)
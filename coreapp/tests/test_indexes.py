@@ -0,0 +1,104 @@
+from unittest import skipUnless
+
+from django.apps import apps
+from django.db import connection
+from django.db.migrations.state import ProjectState
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+
+from coreapp import models
+from coreapp.operations import AddThroughIndexConcurrently
+
+
+def sample_user(email='test@druk.com', password='testpass'):
+    """Creates a sample User"""
+    return get_user_model().objects.create_user(email, password)
+
+
+class IndexUsageTests(TestCase):
+    """Test that per-user queries are planned on the composite indexes"""
+
+    def setUp(self):
+        self.user = sample_user()
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be scanned
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        """Assert that the query plan mentions the index"""
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_tag_list_uses_user_name_index(self):
+        """Test the tag list query uses the (custom_user, name) index"""
+        queryset = models.Tag.objects.filter(custom_user=self.user) \
+            .order_by('-name', 'id')
+        self.assertUsesIndex(queryset, 'coreapp_tag_user_name_idx')
+
+    def test_ingredient_list_uses_user_name_index(self):
+        """Test the ingredient list query uses the (custom_user, name) index"""
+        queryset = models.Ingredient.objects.filter(custom_user=self.user) \
+            .order_by('-name', 'id')
+        self.assertUsesIndex(queryset, 'coreapp_ingr_user_name_idx')
+
+    def test_recipe_list_uses_user_id_index(self):
+        """Test the recipe list query uses the (custom_user, id) index"""
+        queryset = models.Recipe.objects.filter(custom_user=self.user) \
+            .order_by('-id')
+
+        if connection.vendor == 'sqlite':
+            # SQLite indexes end with the rowid, so any index on
+            # custom_user already returns recipes in id order
+            plan = queryset.explain()
+            self.assertIn('USING INDEX', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+        else:
+            self.assertUsesIndex(queryset, 'coreapp_recipe_user_id_idx')
+
+    def test_recipes_by_tag_use_reverse_index(self):
+        """Test looking up recipes of a tag uses the reverse through index"""
+        queryset = models.Recipe.tag.through.objects.filter(tag_id=1) \
+            .values_list('recipe_id', flat=True)
+        self.assertUsesIndex(queryset, 'coreapp_recipe_tag_rev_idx')
+
+    def test_recipes_by_ingredient_use_reverse_index(self):
+        """Test looking up recipes of an ingredient uses the reverse index"""
+        queryset = models.Recipe.ingredient.through.objects \
+            .filter(ingredient_id=1).values_list('recipe_id', flat=True)
+        self.assertUsesIndex(queryset, 'coreapp_recipe_ingr_rev_idx')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+class ConcurrentIndexTests(TransactionTestCase):
+    """Test rerunning concurrent index builds"""
+
+    def is_valid(self, name):
+        """Return whether the index is valid, None if it does not exist"""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT indisvalid FROM pg_index '
+                           'WHERE indexrelid = to_regclass(%s)', [name])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def test_invalid_index_rebuilt(self):
+        """Test an index left INVALID by a failed build is built again"""
+        operation = AddThroughIndexConcurrently(
+            'recipe', 'tag', ['tag_id', 'recipe_id'], 'coreapp_test_rev_idx'
+        )
+        state = ProjectState.from_apps(apps)
+
+        def run(method):
+            with connection.schema_editor(atomic=False) as editor:
+                getattr(operation, method)('coreapp', editor, state, state)
+
+        run('database_forwards')
+        self.addCleanup(run, 'database_backwards')
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE pg_index SET indisvalid = false "
+                           "WHERE indexrelid = 'coreapp_test_rev_idx'::regclass")
+        self.assertIs(self.is_valid('coreapp_test_rev_idx'), False)
+
+        run('database_forwards')
+
+        self.assertIs(self.is_valid('coreapp_test_rev_idx'), True)
@@ -0,0 +1,168 @@
+import threading
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from coreapp.db import pool
+
+
+class FakeConnection:
+    """Stand-in for a DB-API connection"""
+
+    def __init__(self, usable=True):
+        self.closed = False
+        self.usable = usable
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test checking connections in and out of the pool"""
+
+    def make_pool(self, **kwargs):
+        self.opened = []
+
+        def connect():
+            self.opened.append(FakeConnection())
+            return self.opened[-1]
+
+        return pool.ConnectionPool(connect, **kwargs)
+
+    def test_connections_reused(self):
+        """Test a returned connection is handed out again"""
+        connection_pool = self.make_pool(max_size=2)
+
+        for _ in range(3):
+            connection_pool.checkin(connection_pool.checkout())
+
+        self.assertEqual(len(self.opened), 1)
+        stats = connection_pool.stats()
+        self.assertEqual(stats['checkouts'], 3)
+        self.assertEqual(stats['connects'], 1)
+        self.assertEqual(stats['idle'], 1)
+
+    def test_overflow_closed_on_checkin(self):
+        """Test connections beyond max_size are closed when returned"""
+        connection_pool = self.make_pool(max_size=1, max_overflow=1)
+        first = connection_pool.checkout()
+        second = connection_pool.checkout()
+
+        connection_pool.checkin(first)
+        connection_pool.checkin(second)
+
+        self.assertFalse(first.closed)
+        self.assertTrue(second.closed)
+        self.assertEqual(connection_pool.stats()['size'], 1)
+
+    def test_timeout_when_exhausted(self):
+        """Test a checkout gives up after the wait timeout"""
+        connection_pool = self.make_pool(max_size=1, timeout=0.01)
+        connection_pool.checkout()
+
+        with self.assertRaises(pool.PoolTimeout), \
+                self.assertLogs('coreapp.db.pool', 'WARNING'):
+            connection_pool.checkout()
+        self.assertEqual(connection_pool.stats()['timeouts'], 1)
+
+    def test_waiting_checkout_gets_returned_connection(self):
+        """Test a waiting checkout is served by the next checkin"""
+        connection_pool = self.make_pool(max_size=1, timeout=5)
+        held = connection_pool.checkout()
+        timer = threading.Timer(0.05, connection_pool.checkin, [held])
+        timer.start()
+
+        self.assertIs(connection_pool.checkout(), held)
+        timer.join()
+        stats = connection_pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreater(stats['wait_time'], 0)
+
+    def test_unusable_connection_replaced(self):
+        """Test idle connections failing validation are discarded"""
+        connection_pool = self.make_pool(
+            max_size=1, validate=lambda conn: conn.usable
+        )
+        broken = connection_pool.checkout()
+        broken.usable = False
+        connection_pool.checkin(broken)
+
+        fresh = connection_pool.checkout()
+
+        self.assertIsNot(fresh, broken)
+        self.assertTrue(broken.closed)
+        self.assertEqual(connection_pool.stats()['discarded'], 1)
+
+    def test_prewarm(self):
+        """Test prewarming opens idle connections up to the pool size"""
+        connection_pool = self.make_pool(max_size=3)
+
+        self.assertEqual(connection_pool.prewarm(), 3)
+        self.assertEqual(connection_pool.prewarm(), 0)
+        self.assertEqual(connection_pool.stats()['idle'], 3)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+class PooledBackendTests(TestCase):
+    """Test the pooling backend against the test database"""
+
+    def make_wrapper(self, **settings_dict):
+        from coreapp.db.base import DatabaseWrapper
+
+        wrapper = DatabaseWrapper(
+            dict(connection.settings_dict, CONN_HEALTH_CHECKS=True,
+                 **settings_dict),
+            # Type handlers are registered for a configured alias
+            alias=connection.alias,
+        )
+        self.addCleanup(pool.close_pools)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def terminate(self, raw_connection):
+        """Kill the server process of a connection"""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)',
+                           [raw_connection.get_backend_pid()])
+
+    def query(self, wrapper):
+        """Run a trivial query through the wrapper"""
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            return cursor.fetchone()[0]
+
+    def test_connection_returned_to_pool(self):
+        """Test closing the connection keeps it open in the pool"""
+        wrapper = self.make_wrapper(POOL={'MAX_SIZE': 1})
+        self.query(wrapper)
+        raw_connection = wrapper.connection
+
+        wrapper.close()
+        self.query(wrapper)
+
+        self.assertIs(wrapper.connection, raw_connection)
+        self.assertEqual(wrapper.get_pool().stats()['connects'], 1)
+
+    def test_dead_pooled_connection_replaced(self):
+        """Test a pooled connection killed meanwhile is not handed out"""
+        wrapper = self.make_wrapper(POOL={'MAX_SIZE': 1})
+        self.query(wrapper)
+        raw_connection = wrapper.connection
+        wrapper.close()
+
+        self.terminate(raw_connection)
+
+        self.assertEqual(self.query(wrapper), 1)
+        self.assertIsNot(wrapper.connection, raw_connection)
+
+    def test_persistent_connection_health_check(self):
+        """Test a persistent connection is replaced once it stops working"""
+        wrapper = self.make_wrapper(CONN_MAX_AGE=None)
+        self.query(wrapper)
+        self.terminate(wrapper.connection)
+
+        # As at the start of a request
+        wrapper.close_if_unusable_or_obsolete()
+
+        self.assertEqual(self.query(wrapper), 1)
@@ -0,0 +1,136 @@
+import os
+import tempfile
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, \
+    override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from coreapp import routers
+from coreapp.checks import check_replica_pins
+from coreapp.models import Tag
+
+TAGS_URL = reverse('recipeapp:tag-list')
+
+
+def has_replica():
+    """Return True if a replica with its own test database is configured"""
+    replica = settings.DATABASES.get('replica')
+    return replica is not None and \
+        not replica.get('TEST', {}).get('MIRROR')
+
+
+@override_settings(RECIPE_READ_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    """Test routing reads between the primary and the replicas"""
+
+    def setUp(self):
+        routers.health.reset()
+        self.addCleanup(routers.end_replica_reads)
+        self.router = routers.ReplicaRouter()
+        patcher = mock.patch.object(routers.health, 'check', return_value=True)
+        self.check = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_go_to_primary_by_default(self):
+        """Test reads stay on the primary unless replica reads started"""
+        self.assertIsNone(self.router.db_for_read(Tag))
+
+    def test_replica_reads(self):
+        """Test reads go to a healthy replica and writes to the primary"""
+        routers.start_replica_reads()
+
+        self.assertEqual(self.router.db_for_read(Tag), 'replica')
+        self.assertEqual(self.router.db_for_write(Tag), 'default')
+
+    def test_fallback_to_primary(self):
+        """Test reads go to the primary while no replica is healthy"""
+        self.check.return_value = False
+        routers.start_replica_reads()
+
+        self.assertEqual(self.router.db_for_read(Tag), 'default')
+
+    def test_health_checks_are_cached(self):
+        """Test the replica is checked once per interval"""
+        routers.start_replica_reads()
+        for _ in range(3):
+            self.router.db_for_read(Tag)
+
+        self.check.assert_called_once_with('replica')
+
+    def test_missing_replica_unhealthy(self):
+        """Test an alias missing from DATABASES fails its check"""
+        self.check.side_effect = routers.ReplicaHealth().check
+
+        with self.assertLogs('coreapp.routers', 'ERROR'):
+            self.assertFalse(routers.health.is_healthy('missing'))
+
+
+class ReplicaPinCacheTests(SimpleTestCase):
+    """Test replica reads require pins shared by all workers"""
+
+    @override_settings(RECIPE_READ_REPLICAS=['replica'])
+    def test_local_pin_cache_refused(self):
+        """Test replicas with a per-process pin cache are an error"""
+        errors = check_replica_pins(None)
+
+        self.assertEqual([error.id for error in errors], ['coreapp.E001'])
+
+    @override_settings(RECIPE_READ_REPLICAS=['replica'], CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'coreapp-test'),
+    }})
+    def test_shared_pin_cache(self):
+        """Test a shared pin cache passes the check"""
+        self.assertEqual(check_replica_pins(None), [])
+
+    @override_settings(RECIPE_READ_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test the pin cache does not matter without replicas"""
+        self.assertEqual(check_replica_pins(None), [])
+
+
+@skipUnless(has_replica(), 'Needs a replica with its own test database')
+@override_settings(RECIPE_READ_REPLICAS=['replica'],
+                   RECIPE_CACHE_ENABLED=False)
+class ReplicaReadApiTests(TransactionTestCase):
+    """Test the API against separate primary and replica databases"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        routers.health.reset()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'atman@druk.com', 'testpass'
+        )
+        self.user.save(using='replica')
+        Tag.objects.create(custom_user=self.user, name='Primary')
+        Tag.objects.using('replica').create(
+            custom_user=self.user, name='Replica'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_names(self):
+        """Return the names of the listed tags"""
+        return [tag['name'] for tag in self.client.get(TAGS_URL).data]
+
+    def test_reads_from_replica(self):
+        """Test listing tags reads the replica"""
+        self.assertEqual(self.get_names(), ['Replica'])
+
+    def test_reads_own_writes(self):
+        """Test a user who just wrote reads from the primary"""
+        self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        self.assertEqual(self.get_names(), ['Vegan', 'Primary'])
+
+    def test_unhealthy_replica_skipped(self):
+        """Test reads fall back to the primary when the replica is down"""
+        with mock.patch.object(routers.health, 'check', return_value=False):
+            self.assertEqual(self.get_names(), ['Primary'])
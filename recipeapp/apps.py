@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class RecipeappConfig(AppConfig):
     name = 'recipeapp'
+
+    def ready(self):
+        """Connect the signal handlers and register the system checks"""
+        from recipeapp import checks, signals  # noqa: F401
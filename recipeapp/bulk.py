@@ -0,0 +1,228 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from coreapp.models import ChangeCounter, ChangeTrackedModel, Recipe, \
+    Tombstone
+from recipeapp.cache import invalidate_users
+from recipeapp.search import update_search_vectors
+
+RELATED_FIELDS = ('tag', 'ingredient')
+
+_local = threading.local()
+
+
+def get_batch_size():
+    """Return the number of rows written per INSERT or UPDATE"""
+    return getattr(settings, 'RECIPE_BULK_BATCH_SIZE', 500)
+
+
+def get_pk(value):
+    """Return the primary key of a model instance or the value itself"""
+    return getattr(value, 'pk', value)
+
+
+@contextmanager
+def skipping_delete_signals():
+    """Have the delete signal handlers skip rows a bulk delete handles"""
+    _local.skip_delete_signals = True
+    try:
+        yield
+    finally:
+        _local.skip_delete_signals = False
+
+
+def delete_signals_skipped():
+    """Return True while a bulk delete handles the delete signal work"""
+    return getattr(_local, 'skip_delete_signals', False)
+
+
+def invalidate_owners(objs, using='default'):
+    """Invalidate the cached responses of the users owning objs"""
+    invalidate_users({obj.custom_user_id for obj in objs}, using)
+
+
+def assign_change_seqs(objs, using='default'):
+    """Number objs with consecutive change sequence numbers of their owners
+
+    Must run in the transaction that writes objs.
+    """
+    owned = defaultdict(list)
+    for obj in objs:
+        owned[obj.custom_user_id].append(obj)
+
+    # Locking the counters in a fixed order avoids deadlocks
+    for user_id in sorted(owned):
+        user_objs = owned[user_id]
+        last = ChangeCounter.objects.reserve(user_id, len(user_objs), using)
+        for seq, obj in enumerate(user_objs, last - len(user_objs) + 1):
+            obj.change_seq = seq
+
+
+def touch(model, pks, using='default'):
+    """Mark rows as modified without loading them"""
+    pks = list(pks or ())
+    if not pks:
+        return
+
+    queryset = model.objects.using(using).filter(pk__in=pks)
+    with transaction.atomic(using=using, savepoint=False):
+        user_ids = set(queryset.values_list('custom_user_id', flat=True))
+        for user_id in sorted(user_ids):
+            queryset.filter(custom_user_id=user_id).update(
+                modified_on=timezone.now(),
+                change_seq=ChangeCounter.objects.reserve(user_id, using=using),
+            )
+
+
+def bulk_insert(model, objs, batch_size=None, using='default'):
+    """Insert objs in batches and return them with their primary keys set
+
+    Backends that cannot return ids from a multi-row INSERT get one
+    INSERT per object instead, so callers can rely on the keys.
+    """
+    connection = connections[using]
+    if not objs:
+        return objs
+
+    if not connection.features.can_return_ids_from_bulk_insert and \
+            not model._meta.auto_created:
+        for obj in objs:
+            obj.save(force_insert=True, using=using)
+        return objs
+
+    fields = [field for field in model._meta.concrete_fields
+              if not field.primary_key]
+    limit = connection.ops.bulk_batch_size(fields, objs)
+    batch_size = max(min(batch_size or get_batch_size(), limit), 1)
+
+    with transaction.atomic(using=using, savepoint=False):
+        if issubclass(model, ChangeTrackedModel):
+            assign_change_seqs(objs, using)
+        objs = model.objects.using(using).bulk_create(
+            objs, batch_size=batch_size
+        )
+    if not model._meta.auto_created:
+        invalidate_owners(objs, using)
+
+    return objs
+
+
+def bulk_insert_relations(recipes, relations, batch_size=None,
+                          using='default'):
+    """Insert the through rows of recipes in batches
+
+    ``relations`` holds one dict per recipe mapping a field name to the
+    tags or ingredients (instances or ids) to link.
+    """
+    for field in RELATED_FIELDS:
+        through = Recipe._meta.get_field(field).remote_field.through
+        column = '%s_id' % field
+        rows = [
+            through(recipe_id=recipe.pk, **{column: get_pk(related)})
+            for recipe, related_objs in zip(recipes, relations)
+            for related in related_objs.get(field, ())
+        ]
+        bulk_insert(through, rows, batch_size, using)
+
+    invalidate_owners(recipes, using)
+
+
+def bulk_insert_recipes(recipes, relations, batch_size=None, using='default'):
+    """Insert recipes with their tags and ingredients in batches"""
+    bulk_insert(Recipe, recipes, batch_size, using)
+    bulk_insert_relations(recipes, relations, batch_size, using)
+    update_search_vectors([recipe.pk for recipe in recipes], using)
+
+    return recipes
+
+
+def replace_relations(recipes, relations, batch_size=None, using='default'):
+    """Replace the tags or ingredients given in relations for each recipe"""
+    for field in RELATED_FIELDS:
+        recipe_ids = [recipe.pk for recipe, related in zip(recipes, relations)
+                      if field in related]
+        if recipe_ids:
+            through = Recipe._meta.get_field(field).remote_field.through
+            through.objects.using(using) \
+                .filter(recipe_id__in=recipe_ids).delete()
+
+    bulk_insert_relations(recipes, relations, batch_size, using)
+    touch(Recipe, [recipe.pk for recipe, related in zip(recipes, relations)
+                   if related], using)
+
+
+def bulk_update(model, objs, fields, batch_size=None, using='default'):
+    """Update fields of objs with batched UPDATE queries"""
+    if objs and fields:
+        # bulk_update() bypasses save(), so auto_now fields are set here
+        fields = set(fields)
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                for obj in objs:
+                    field.pre_save(obj, add=False)
+                fields.add(field.name)
+
+        with transaction.atomic(using=using, savepoint=False):
+            if issubclass(model, ChangeTrackedModel):
+                assign_change_seqs(objs, using)
+                fields.add('change_seq')
+            model.objects.using(using).bulk_update(
+                objs, fields, batch_size=batch_size or get_batch_size()
+            )
+        invalidate_owners(objs, using)
+
+
+def bulk_delete(queryset, batch_size=None, using='default'):
+    """Delete the rows of queryset with batched queries, return the count
+
+    The per-row delete signal handlers are skipped: the change sequence
+    numbers of all tombstones are reserved once per owner and written
+    with one INSERT, and the recipes of deleted tags or ingredients are
+    touched together.
+    """
+    model = queryset.model
+    queryset = queryset.using(using)
+
+    with transaction.atomic(using=using), skipping_delete_signals():
+        rows = list(queryset.values_list('pk', 'custom_user_id'))
+        pks = [pk for pk, user_id in rows]
+        if not pks:
+            return 0
+
+        recipe_ids = []
+        if model is not Recipe:
+            field = model._meta.model_name
+            through = Recipe._meta.get_field(field).remote_field.through
+            recipe_ids = list(through.objects.using(using)
+                              .filter(**{'%s_id__in' % field: pks})
+                              .values_list('recipe_id', flat=True)
+                              .distinct())
+
+        model.objects.using(using).filter(pk__in=pks).delete()
+        touch(Recipe, recipe_ids, using)
+        update_search_vectors(recipe_ids, using)
+
+        owned = defaultdict(list)
+        for pk, user_id in rows:
+            owned[user_id].append(pk)
+
+        tombstones = []
+        for user_id in sorted(owned):
+            user_pks = owned[user_id]
+            last = ChangeCounter.objects.reserve(user_id, len(user_pks), using)
+            tombstones.extend(
+                Tombstone(custom_user_id=user_id, model=model._meta.model_name,
+                          object_id=pk, change_seq=seq)
+                for seq, pk in enumerate(user_pks, last - len(user_pks) + 1)
+            )
+        Tombstone.objects.using(using).bulk_create(
+            tombstones, batch_size=batch_size or get_batch_size()
+        )
+        invalidate_users(list(owned), using)
+
+    return len(pks)
@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+from coreapp.caches import is_shared
+
+GENERATION_KEY = 'recipeapp:generation:%s'
+RESPONSE_KEY = 'recipeapp:response:%s:%s:%s:%s'
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def is_enabled():
+    """Return whether responses are cached
+
+    By default only when the cache is shared by all worker processes, a
+    per-process cache would keep serving stale responses from the workers
+    that did not see the write.
+    """
+    enabled = getattr(settings, 'RECIPE_CACHE_ENABLED', None)
+    if enabled is None:
+        return is_shared(get_alias())
+
+    return enabled
+
+
+def get_alias():
+    """Return the alias of the cache used for responses"""
+    return getattr(settings, 'RECIPE_CACHE_ALIAS', 'default')
+
+
+def get_cache():
+    """Return the cache backend used for responses"""
+    return caches[get_alias()]
+
+
+def get_timeout():
+    """Return the number of seconds a response stays cached"""
+    return getattr(settings, 'RECIPE_CACHE_TIMEOUT', 300)
+
+
+def new_generation():
+    """Return a starting generation that no earlier entry can share"""
+    return int(time.time() * 1000000)
+
+
+def get_generation(user_id):
+    """Return the current cache generation of a user"""
+    cache = get_cache()
+    key = GENERATION_KEY % user_id
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, new_generation(), None)
+        generation = cache.get(key)
+
+    return generation
+
+
+def bump_generation(user_id):
+    """Move a user to a new generation, orphaning their cached responses"""
+    cache = get_cache()
+    key = GENERATION_KEY % user_id
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_generation(), None)
+
+
+def invalidate_users(user_ids, using='default'):
+    """Invalidate the cached responses of users whose data changed
+
+    Inside a transaction the generation is bumped again on commit, so a
+    response cached by a concurrent reader before the commit is dropped.
+    """
+    if not is_enabled():
+        return
+
+    user_ids = set(user_ids)
+    for user_id in user_ids:
+        bump_generation(user_id)
+
+    connection = connections[using]
+    if connection.in_atomic_block:
+        connection.on_commit(
+            lambda: [bump_generation(user_id) for user_id in user_ids]
+        )
+
+
+def get_response_key(user_id, generation, url, format):
+    """Return the cache key of a response for a user, URL and format
+
+    Each negotiated format is cached apart, since the validators cached
+    with the data differ per format.
+    """
+    digest = hashlib.md5(url.encode('utf-8')).hexdigest()
+    return RESPONSE_KEY % (user_id, generation, format, digest)
+
+
+def record(hit):
+    """Count a cache hit or miss"""
+    with _stats_lock:
+        _stats['hits' if hit else 'misses'] += 1
+
+
+def get_stats():
+    """Return the hit and miss counts of this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def reset_stats():
+    """Reset the hit and miss counts of this process"""
+    with _stats_lock:
+        _stats.update(hits=0, misses=0)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from coreapp.caches import is_shared
+from recipeapp import cache
+
+
+@register()
+def check_response_cache(app_configs, **kwargs):
+    """Refuse a response cache that worker processes do not share"""
+    if getattr(settings, 'RECIPE_CACHE_ENABLED', None) is not True or \
+            is_shared(cache.get_alias()):
+        return []
+
+    return [Error(
+        'RECIPE_CACHE_ENABLED is set but the %r cache is local to each '
+        'process, other workers would serve stale responses after a '
+        'write.' % cache.get_alias(),
+        hint='Point RECIPE_CACHE_ALIAS to a shared cache such as memcached, '
+             'or leave RECIPE_CACHE_ENABLED unset.',
+        id='recipeapp.E001',
+    )]
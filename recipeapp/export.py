@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+
+from coreapp.models import Recipe
+from recipeapp.bulk import RELATED_FIELDS
+
+RECIPE_FIELDS = ('id', 'title', 'time_taken', 'price', 'link')
+NAME_FIELDS = ('tags', 'ingredients')
+CSV_COLUMNS = RECIPE_FIELDS + NAME_FIELDS
+# Joins tag and ingredient names inside a single CSV cell
+CSV_NAME_SEPARATOR = '|'
+
+
+def get_chunk_size():
+    """Return the number of recipes fetched and written per chunk"""
+    return getattr(settings, 'RECIPE_EXPORT_CHUNK_SIZE', 1000)
+
+
+def attach_names(rows, using):
+    """Return export records for recipe rows, with tag and ingredient names"""
+    recipe_ids = [row[0] for row in rows]
+    names = {}
+
+    for field, key in zip(RELATED_FIELDS, NAME_FIELDS):
+        through = Recipe._meta.get_field(field).remote_field.through
+        names[key] = defaultdict(list)
+        linked = through.objects.using(using) \
+            .filter(recipe_id__in=recipe_ids) \
+            .order_by('%s__name' % field) \
+            .values_list('recipe_id', '%s__name' % field)
+        for recipe_id, name in linked:
+            names[key][recipe_id].append(name)
+
+    records = []
+    for row in rows:
+        record = OrderedDict(zip(RECIPE_FIELDS, row))
+        record['price'] = str(record['price'])
+        for key in NAME_FIELDS:
+            record[key] = names[key].get(record['id'], [])
+        records.append(record)
+
+    return records
+
+
+def iter_records(queryset, chunk_size=None):
+    """Yield chunks of export records without loading the whole queryset
+
+    Recipes are read through a server-side cursor where the database
+    supports it, and names are fetched with one query per chunk.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    rows = queryset.order_by('id').values_list(*RECIPE_FIELDS) \
+        .iterator(chunk_size=chunk_size)
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield attach_names(chunk, queryset.db)
+            chunk = []
+
+    if chunk:
+        yield attach_names(chunk, queryset.db)
+
+
+def iter_ndjson(queryset, chunk_size=None):
+    """Yield the recipes as newline delimited JSON, one chunk at a time"""
+    for records in iter_records(queryset, chunk_size):
+        yield ''.join(
+            json.dumps(record, separators=(',', ':')) + '\n'
+            for record in records
+        )
+
+
+def iter_csv(queryset, chunk_size=None):
+    """Yield the recipes as CSV with a header row, one chunk at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+
+    for records in iter_records(queryset, chunk_size):
+        for record in records:
+            writer.writerow([
+                CSV_NAME_SEPARATOR.join(record[column])
+                if column in NAME_FIELDS else record[column]
+                for column in CSV_COLUMNS
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', iter_ndjson),
+    'csv': ('text/csv', iter_csv),
+}
@@ -0,0 +1,199 @@
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models
+from django.db.models import OuterRef, Subquery
+from rest_framework import serializers
+
+COLUMN = 'column'
+PK_LIST = 'pk_list'
+NESTED = 'nested'
+
+
+def is_enabled():
+    """Return True when read actions may bypass the serializers"""
+    return getattr(settings, 'RECIPE_FAST_READS', True)
+
+
+def aggregate_ids(model, field):
+    """Return a subquery with the ids linked through an M2M field, in order"""
+    from django.contrib.postgres.aggregates import ArrayAgg
+    from django.contrib.postgres.fields import ArrayField
+
+    m2m = model._meta.get_field(field)
+    source = m2m.m2m_field_name()
+    target = '%s_id' % m2m.m2m_reverse_field_name()
+    ids = m2m.remote_field.through.objects \
+        .filter(**{source: OuterRef('pk')}) \
+        .values(source) \
+        .annotate(ids=ArrayAgg(target, ordering=target)) \
+        .values('ids')
+    return Subquery(ids, output_field=ArrayField(models.IntegerField()))
+
+
+def aggregates_ids(using):
+    """Return True when primary key lists are aggregated in SQL"""
+    return connections[using].vendor == 'postgresql'
+
+
+def get_linked(model, field, ids, columns, using):
+    """Return the rows linked to each id through an M2M field, in id order"""
+    m2m = model._meta.get_field(field)
+    source = '%s_id' % m2m.m2m_field_name()
+    target = m2m.m2m_reverse_field_name()
+    if columns is None:
+        lookups = ['%s_id' % target]
+    else:
+        lookups = ['%s__%s' % (target, column) for column in columns]
+
+    linked = defaultdict(list)
+    rows = m2m.remote_field.through.objects.using(using) \
+        .filter(**{source + '__in': ids}) \
+        .order_by('%s_id' % target) \
+        .values_list(source, *lookups)
+    for row in rows:
+        if columns is None:
+            linked[row[0]].append(row[1])
+        else:
+            linked[row[0]].append(dict(zip(columns, row[1:])))
+    return linked
+
+
+class FastReader:
+    """Build a serializer's output from values() rows
+
+    Skips instantiating models and running every field per row, the
+    output is the same the serializer gives for the shaped queryset:
+    related ids and nested objects are in id order. Primary key lists
+    are aggregated with ARRAY_AGG on PostgreSQL and grouped in Python
+    with one query per relation elsewhere.
+    """
+
+    def __init__(self, model, entries):
+        self.model = model
+        self.entries = entries
+        self.pk = model._meta.pk.name
+        self.columns = [source for kind, key, source, field in entries
+                        if kind == COLUMN]
+
+    def has_relations(self):
+        """Return True when the output includes related objects"""
+        return len(self.columns) < len(self.entries)
+
+    def get_alias(self, source):
+        """Return the annotation holding the aggregated ids of a relation"""
+        return '_%s_ids' % source
+
+    def values(self, queryset, *extra):
+        """Return the queryset as dicts of the columns read, plus extra"""
+        annotations = {}
+        if aggregates_ids(queryset.db):
+            annotations = {
+                self.get_alias(source): aggregate_ids(self.model, source)
+                for kind, key, source, field in self.entries
+                if kind == PK_LIST
+            }
+
+        columns = list(OrderedDict.fromkeys(
+            [self.pk] + self.columns + list(extra)
+        ))
+        return queryset.prefetch_related(None) \
+            .annotate(**annotations).values(*columns + list(annotations))
+
+    def represent(self, rows, using):
+        """Return the serialized data of the values() rows"""
+        rows = list(rows)
+        related = {}
+
+        for kind, key, source, field in self.entries:
+            if not rows or kind == COLUMN or \
+                    kind == PK_LIST and aggregates_ids(using):
+                continue
+            columns = field.columns if kind == NESTED else None
+            related[source] = get_linked(
+                self.model, source, [row[self.pk] for row in rows], columns,
+                using
+            )
+
+        return [self.represent_row(row, related) for row in rows]
+
+    def represent_row(self, row, related):
+        """Return the serialized data of one row"""
+        data = OrderedDict()
+        for kind, key, source, field in self.entries:
+            if kind == COLUMN:
+                value = row[source]
+                data[key] = None if value is None \
+                    else field.to_representation(value)
+            elif kind == PK_LIST:
+                if source in related:
+                    data[key] = related[source].get(row[self.pk], [])
+                else:
+                    data[key] = row[self.get_alias(source)] or []
+            else:
+                items = related[source].get(row[self.pk], [])
+                data[key] = [field.represent_row(item, {}) for item in items]
+        return data
+
+
+def is_pk_list(field):
+    """Return True for a field listing plain primary keys"""
+    if not isinstance(field, serializers.ManyRelatedField):
+        return False
+
+    child = field.child_relation
+    return isinstance(child, serializers.PrimaryKeyRelatedField) and \
+        child.pk_field is None and \
+        type(child).to_representation is \
+        serializers.PrimaryKeyRelatedField.to_representation
+
+
+@lru_cache(maxsize=None)
+def get_reader(model, serializer_class, options=()):
+    """Return a FastReader for the serializer, None if it is unsupported
+
+    Supported serializers only read model columns, lists of primary keys
+    and nested serializers of model columns. ``options`` are the keyword
+    arguments of the serializer as sorted (name, value) pairs.
+    """
+    return build_reader(model, serializer_class(**dict(options)))
+
+
+def build_reader(model, serializer):
+    """Return a FastReader for a serializer instance, or None"""
+    if type(serializer).to_representation is not \
+            serializers.Serializer.to_representation:
+        return None
+
+    entries = []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+
+        if isinstance(model_field, models.ManyToManyField):
+            if is_pk_list(field):
+                entries.append((PK_LIST, field.field_name, field.source, None))
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                child = build_reader(model_field.related_model, field.child)
+                if child is not None and not child.has_relations():
+                    entries.append(
+                        (NESTED, field.field_name, field.source, child)
+                    )
+                    continue
+            return None
+
+        if model_field.is_relation or \
+                isinstance(field, (serializers.RelatedField,
+                                   serializers.ManyRelatedField,
+                                   serializers.BaseSerializer)):
+            return None
+        entries.append((COLUMN, field.field_name, field.source, field))
+
+    return FastReader(model, entries)
@@ -0,0 +1,138 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from coreapp.models import Recipe
+from recipeapp.search import search_recipes
+
+
+def parse_ids(params, name):
+    """Return the comma separated ids of a query parameter"""
+    value = params.get(name)
+    if not value:
+        return []
+
+    try:
+        return [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise ValidationError({name: _('Expected a comma separated list of ids')})
+
+
+def parse_names(params, name):
+    """Return the comma separated names of a query parameter"""
+    value = params.get(name, '')
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_number(params, name, convert):
+    """Return a numeric query parameter, or None when absent"""
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+
+    try:
+        return convert(value)
+    except (ValueError, InvalidOperation):
+        raise ValidationError({name: _('Expected a number')})
+
+
+def related_exists(field, **lookups):
+    """Return an EXISTS subquery on a recipe M2M through table"""
+    through = Recipe._meta.get_field(field).remote_field.through
+    return Exists(through.objects.filter(**lookups))
+
+
+def related_ids(field, column, **lookups):
+    """Return a subquery of a column of a recipe M2M through table"""
+    through = Recipe._meta.get_field(field).remote_field.through
+    return through.objects.filter(**lookups).values(column)
+
+
+class RecipeFilterBackend(BaseFilterBackend):
+    """Filter recipes by tags, ingredients, time taken and price
+
+    ``?tags=1,2&ingredients=3`` keeps recipes linked to any of the ids,
+    ``&match=all`` to all of them. Relations are checked with semi-joins
+    on the through tables instead of joins, so no DISTINCT is needed:
+    EXISTS for any, so recipes are read in page order from the per-user
+    index until a page is filled, and IN subqueries for all. Ranges use ``time_taken_min``/
+    ``time_taken_max`` and ``price_min``/``price_max``.
+    """
+    related_params = (('tags', 'tag'), ('ingredients', 'ingredient'))
+    range_params = (('time_taken', int), ('price', Decimal))
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        match_all = params.get('match') == 'all'
+
+        for param, field in self.related_params:
+            ids = parse_ids(params, param)
+            if not ids:
+                continue
+
+            id_lookup = '%s_id' % field
+            if match_all:
+                # Recipes with every id are rare, the page-order scan
+                # below would read them all, so start from the links
+                for related_id in set(ids):
+                    queryset = queryset.filter(pk__in=related_ids(
+                        field, 'recipe_id', **{id_lookup: related_id}
+                    ))
+            else:
+                queryset = queryset.annotate(**{
+                    '_%s_any' % field: related_exists(
+                        field, recipe_id=OuterRef('pk'),
+                        **{id_lookup + '__in': ids}
+                    )
+                }).filter(**{'_%s_any' % field: True})
+
+        for field, convert in self.range_params:
+            minimum = parse_number(params, field + '_min', convert)
+            maximum = parse_number(params, field + '_max', convert)
+            if minimum is not None:
+                queryset = queryset.filter(**{field + '__gte': minimum})
+            if maximum is not None:
+                queryset = queryset.filter(**{field + '__lte': maximum})
+
+        return queryset
+
+
+def is_assigned_only(request):
+    """Return True when ``?assigned_only=`` asks for assigned objects"""
+    return request.query_params.get('assigned_only') in ('1', 'true')
+
+
+class AssignedOnlyFilterBackend(BaseFilterBackend):
+    """Keep only tags or ingredients assigned to a recipe
+
+    Enabled with ``?assigned_only=1``. The view names the recipe field
+    that links to its model in ``recipe_field``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not is_assigned_only(request):
+            return queryset
+
+        field = view.recipe_field
+        # An IN subquery is planned as a semi-join, EXISTS(...) = true
+        # would hash the ids of the whole through table
+        return queryset.filter(pk__in=related_ids(field, '%s_id' % field))
+
+
+class RecipeSearchFilterBackend(BaseFilterBackend):
+    """Rank recipes by how well ``?search=`` matches their title, tags and
+    ingredients
+
+    Only applies to the list action. Results are ranked best first and
+    capped at RECIPE_SEARCH_LIMIT.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get('search', '').strip()
+        if not text or view.action != 'list':
+            return queryset
+
+        return search_recipes(queryset, text)
@@ -0,0 +1,176 @@
+import codecs
+import csv
+import json
+
+from django.db import transaction
+
+from coreapp.models import Ingredient, Recipe, Tag
+from recipeapp import bulk
+from recipeapp.export import CSV_NAME_SEPARATOR, NAME_FIELDS
+from recipeapp.serializers import RecipeImportSerializer
+
+NAME_MODELS = (('tags', 'tag', Tag), ('ingredients', 'ingredient', Ingredient))
+# Only the first errors are reported back, the rest are counted
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(ValueError):
+    """A line of the import stream could not be parsed"""
+
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+
+
+def decode_lines(lines, encoding='utf-8-sig'):
+    """Yield the text of encoded lines, dropping a byte order mark"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    number = 0
+    try:
+        for number, line in enumerate(lines, 1):
+            yield decoder.decode(line)
+        yield decoder.decode(b'', final=True)
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError(number, str(exc))
+
+
+def parse_ndjson(lines):
+    """Yield (line number, record) for each non-blank line of NDJSON"""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            raise ImportFormatError(number, str(exc))
+
+
+def parse_csv(lines):
+    """Yield (line number, record) for each row of CSV with a header"""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        for key in NAME_FIELDS:
+            names = row.get(key) or ''
+            row[key] = [name for name in names.split(CSV_NAME_SEPARATOR) if name]
+        if not row.get('link'):
+            row.pop('link', None)
+        yield reader.line_num, row
+
+
+IMPORT_FORMATS = {
+    'ndjson': parse_ndjson,
+    'csv': parse_csv,
+}
+
+
+class RecipeImporter:
+    """Import a stream of recipe records for a user
+
+    Records are validated one by one and written in chunks, each in its
+    own transaction. Tags and ingredients are matched to the user's
+    existing rows by name, a chunk at a time, and missing ones are
+    created in bulk. Invalid records are skipped and reported.
+    """
+
+    def __init__(self, user, batch_size=None, using='default'):
+        self.user = user
+        self.batch_size = batch_size or bulk.get_batch_size()
+        self.using = using
+        self.name_ids = {field: {} for _key, field, _model in NAME_MODELS}
+        self.created = 0
+        self.created_names = {key: 0 for key, _field, _model in NAME_MODELS}
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, records):
+        """Import (line number, record) pairs and return a summary"""
+        chunk = []
+        try:
+            for number, record in records:
+                serializer = RecipeImportSerializer(data=record)
+                if not serializer.is_valid():
+                    self.add_error(number, serializer.errors)
+                    continue
+
+                chunk.append(serializer.validated_data)
+                if len(chunk) >= self.batch_size:
+                    self.import_chunk(chunk)
+                    chunk = []
+        except ImportFormatError as exc:
+            # The rest of the stream cannot be trusted, stop reading it
+            self.add_error(exc.line, {'non_field_errors': [str(exc)]})
+
+        if chunk:
+            self.import_chunk(chunk)
+
+        return self.summary()
+
+    def add_error(self, line, errors):
+        """Record the errors of a skipped record"""
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def summary(self):
+        """Return counts of what was imported and the reported errors"""
+        summary = {'created': self.created}
+        for key, count in self.created_names.items():
+            summary['%s_created' % key] = count
+        summary['error_count'] = self.error_count
+        summary['errors'] = self.errors
+        return summary
+
+    def resolve_names(self, key, field, model, names):
+        """Map names to ids of the user's rows, creating the missing ones"""
+        known = self.name_ids[field]
+        missing = set(names) - set(known)
+        if not missing:
+            return
+
+        existing = model.objects.using(self.using) \
+            .filter(custom_user=self.user, name__in=missing) \
+            .order_by('id').values_list('name', 'id')
+        for name, pk in existing:
+            known.setdefault(name, pk)
+
+        new_objs = [model(custom_user=self.user, name=name)
+                    for name in sorted(missing - set(known))]
+        bulk.bulk_insert(model, new_objs, self.batch_size, self.using)
+        for obj in new_objs:
+            known[obj.name] = obj.pk
+        self.created_names[key] += len(new_objs)
+
+    def import_chunk(self, chunk):
+        """Write a chunk of validated records in one transaction"""
+        with transaction.atomic(using=self.using):
+            for key, field, model in NAME_MODELS:
+                self.resolve_names(key, field, model, {
+                    name for attrs in chunk for name in attrs.get(key, ())
+                })
+
+            recipes, relations = [], []
+            for attrs in chunk:
+                relations.append({
+                    field: [self.name_ids[field][name]
+                            for name in dict.fromkeys(attrs.get(key, ()))]
+                    for key, field, _model in NAME_MODELS
+                })
+                recipes.append(Recipe(
+                    custom_user=self.user,
+                    title=attrs['title'],
+                    time_taken=attrs['time_taken'],
+                    price=attrs['price'],
+                    link=attrs.get('link', ''),
+                ))
+
+            bulk.bulk_insert_recipes(recipes, relations, self.batch_size, self.using)
+
+        self.created += len(recipes)
+
+
+def import_recipes(user, lines, input_format, batch_size=None):
+    """Import recipes from lines of NDJSON or CSV text"""
+    records = IMPORT_FORMATS[input_format](lines)
+    return RecipeImporter(user, batch_size).run(records)
@@ -0,0 +1,53 @@
+import io
+import os
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipeapp.importer import IMPORT_FORMATS, import_recipes
+
+
+class Command(BaseCommand):
+    """Django command to import recipes for a user from NDJSON or CSV"""
+    help = 'Import recipes for a user from an NDJSON or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, '-' for stdin")
+        parser.add_argument('--user', required=True,
+                            help='Email of the user owning the recipes')
+        parser.add_argument('--format', choices=sorted(IMPORT_FORMATS),
+                            help='Input format, guessed from the file '
+                                 'extension by default')
+        parser.add_argument('--batch-size', type=int,
+                            help='Recipes written per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['user'].lower())
+        except get_user_model().DoesNotExist:
+            raise CommandError('No user with email %s' % options['user'])
+
+        path = options['path']
+        input_format = options['format'] or \
+            os.path.splitext(path)[1].lstrip('.').lower()
+        if input_format not in IMPORT_FORMATS:
+            raise CommandError('Cannot tell the input format, use --format')
+
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig',
+                                      newline='')
+            summary = import_recipes(user, stream, input_format,
+                                     options['batch_size'])
+        else:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                summary = import_recipes(user, stream, input_format,
+                                         options['batch_size'])
+
+        for error in summary['errors']:
+            self.stderr.write('Line %(line)s: %(errors)s' % error)
+        self.stdout.write(self.style.SUCCESS(
+            'Imported %(created)s recipes, created %(tags_created)s tags and '
+            '%(ingredients_created)s ingredients, skipped %(error_count)s '
+            'records' % summary
+        ))
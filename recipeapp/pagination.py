@@ -0,0 +1,150 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination that seeks past the last row of the previous page
+
+    Pagination is opt-in: it only kicks in when the client sends a cursor
+    or a page size, so plain list requests keep returning a list. The
+    ordering must be unique and backed by an index, no COUNT(*) is issued.
+    """
+    ordering = ('id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of results, or None when not requested"""
+        params = request.query_params
+        if self.cursor_query_param not in params and \
+                self.page_size_query_param not in params:
+            return None
+
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position))
+
+        # Fetching one extra row tells us if there is a next page
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        """Wrap the page in a response with a link to the next page"""
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        """Return the page size requested by the client, within bounds"""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        """Return the URL of the next page, if there is one"""
+        if not self.has_next:
+            return None
+
+        position = [self.get_value(self.page[-1], field)
+                    for field in self.get_fields()]
+        url = replace_query_param(
+            self.base_url, self.page_size_query_param, self.page_size
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position)
+        )
+
+    def get_fields(self):
+        """Return the ordering field names without direction prefixes"""
+        return [field.lstrip('-') for field in self.ordering]
+
+    def get_value(self, item, field):
+        """Return the value of an ordering field for a result item"""
+        if isinstance(item, dict):
+            return item[field]
+
+        return getattr(item, field)
+
+    def get_seek_filter(self, position):
+        """Return a filter for rows after position in the ordering"""
+        seek = Q()
+        equal = Q()
+
+        for ordering, value in zip(self.ordering, position):
+            field = ordering.lstrip('-')
+            lookup = 'lt' if ordering.startswith('-') else 'gt'
+            seek |= equal & Q(**{'%s__%s' % (field, lookup): value})
+            equal &= Q(**{field: value})
+
+        return seek
+
+    def encode_cursor(self, position):
+        """Return an opaque cursor for the position"""
+        data = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        """Return the position encoded in the request cursor, if any
+
+        Each value is converted by its ordering field, a cursor that does
+        not fit the fields is rejected like a malformed one.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor is None:
+            return None
+
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or \
+                len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            position = [model._meta.get_field(field).to_python(value)
+                        for field, value in zip(self.get_fields(), position)]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+
+class NameKeysetPagination(KeysetPagination):
+    """Keyset pagination for tags and ingredients"""
+    ordering = ('-name', 'id')
+
+
+class RecipeKeysetPagination(KeysetPagination):
+    """Keyset pagination for recipes, newest first"""
+    ordering = ('-id',)
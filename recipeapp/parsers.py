@@ -0,0 +1,55 @@
+"""Parsers of the recipe API, the counterparts of recipeapp.renderers"""
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from recipeapp.renderers import CBORRenderer, FastJSONRenderer, \
+    MessagePackRenderer, cbor2, msgpack, orjson
+
+
+class FastJSONParser(parsers.JSONParser):
+    """Parse JSON with orjson when installed"""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if orjson is None or encoding.lower() not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(parsers.BaseParser):
+    """Parse MessagePack, requires msgpack"""
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
+
+
+class CBORParser(parsers.BaseParser):
+    """Parse CBOR, requires cbor2"""
+    media_type = 'application/cbor'
+    renderer_class = CBORRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return cbor2.loads(stream.read())
+        except (ValueError, cbor2.CBORDecodeError) as exc:
+            raise ParseError('CBOR parse error - %s' % str(exc))
+
+
+def get_parser_classes():
+    """Return the parsers whose libraries are installed, JSON first"""
+    classes = [FastJSONParser, parsers.FormParser, parsers.MultiPartParser]
+    if msgpack is not None:
+        classes.append(MessagePackParser)
+    if cbor2 is not None:
+        classes.append(CBORParser)
+    return classes
@@ -0,0 +1,96 @@
+"""Renderers of the recipe API
+
+orjson, msgpack and cbor2 are optional. Without orjson, JSON is rendered
+by DRF's encoder, and the binary formats are only offered when their
+library is installed. Decimals are always rendered as strings.
+"""
+from decimal import Decimal
+
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """DRF's encoder, keeping Decimals exact as strings"""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+encode_default = JSONEncoder().default
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """Render compact JSON with orjson, same bytes as DRF's renderer"""
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or data is None or indent is not None or \
+                self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=encode_default)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits or non-string keys
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like DRF does, to keep the JSON a JavaScript subset
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028') \
+            .replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Render MessagePack, requires msgpack"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+class CBORRenderer(renderers.BaseRenderer):
+    """Render CBOR, requires cbor2"""
+    media_type = 'application/cbor'
+    format = 'cbor'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return cbor2.dumps(data, default=lambda encoder, value: encoder.encode(
+            encode_default(value)
+        ))
+
+
+def get_renderer_classes():
+    """Return the renderers whose libraries are installed, JSON first"""
+    classes = [FastJSONRenderer, renderers.BrowsableAPIRenderer]
+    if msgpack is not None:
+        classes.append(MessagePackRenderer)
+    if cbor2 is not None:
+        classes.append(CBORRenderer)
+    return classes
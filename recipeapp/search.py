@@ -0,0 +1,165 @@
+import re
+from collections import defaultdict
+from difflib import get_close_matches
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, \
+    TextField, When
+
+from coreapp.models import Recipe
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Same ratio as the default PostgreSQL weights for A and B
+TITLE_WEIGHT = 1.0
+RELATED_WEIGHT = 0.4
+RELATED_FIELDS = ('tag', 'ingredient')
+
+
+def get_search_config():
+    """Return the text search configuration used on PostgreSQL"""
+    return getattr(settings, 'RECIPE_SEARCH_CONFIG', 'english')
+
+
+def get_search_limit():
+    """Return the maximum number of ranked results"""
+    return getattr(settings, 'RECIPE_SEARCH_LIMIT', 100)
+
+
+def is_postgresql(using):
+    """Return True when the database alias is PostgreSQL"""
+    return connections[using].vendor == 'postgresql'
+
+
+def related_names(model, field):
+    """Return a subquery joining the names linked to a recipe through field"""
+    from django.contrib.postgres.aggregates import StringAgg
+
+    through = model._meta.get_field(field).remote_field.through
+    names = through.objects.filter(recipe_id=OuterRef('pk')) \
+        .values('recipe_id') \
+        .annotate(names=StringAgg('%s__name' % field, ' ')) \
+        .values('names')
+    return Subquery(names, output_field=TextField())
+
+
+def build_search_vector(model):
+    """Return the search vector expression for a recipe model
+
+    Titles are weighted A, tag and ingredient names B. The model is a
+    parameter so migrations can pass their historical Recipe.
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    config = get_search_config()
+    vector = SearchVector('title', weight='A', config=config)
+    for field in RELATED_FIELDS:
+        vector += SearchVector(
+            related_names(model, field), weight='B', config=config
+        )
+    return vector
+
+
+def update_search_vectors(recipe_ids, using='default'):
+    """Recompute the search vectors of the recipes on PostgreSQL"""
+    recipe_ids = list(recipe_ids or ())
+    if not recipe_ids or not is_postgresql(using):
+        return
+
+    Recipe.objects.using(using).filter(id__in=recipe_ids) \
+        .update(search_vector=build_search_vector(Recipe))
+
+
+def tokenize(text):
+    """Return the lower-cased words of text"""
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """In-memory inverted index used when PostgreSQL is not available
+
+    Scores mirror the weighted PostgreSQL ranking, and unknown words fall
+    back to the closest indexed words the way trigram matching does.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(lambda: defaultdict(float))
+
+    def add(self, doc_id, text, weight):
+        """Index the words of text for a document"""
+        for token in tokenize(text):
+            self.postings[token][doc_id] += weight
+
+    def search(self, text):
+        """Return matching document ids, best match first"""
+        scores = defaultdict(float)
+
+        for token in tokenize(text):
+            if token in self.postings:
+                terms = [token]
+            else:
+                terms = get_close_matches(token, self.postings, n=3, cutoff=0.75)
+
+            for term in terms:
+                for doc_id, weight in self.postings[term].items():
+                    scores[doc_id] += weight
+
+        return sorted(scores, key=lambda doc_id: (-scores[doc_id], -doc_id))
+
+
+def search_postgresql(queryset, text, limit):
+    """Rank recipes with full text search, falling back to trigrams"""
+    from django.contrib.postgres.search import SearchQuery, SearchRank, \
+        TrigramSimilarity
+
+    query = SearchQuery(text, config=get_search_config())
+    ranked = queryset \
+        .annotate(search_rank=SearchRank(F('search_vector'), query)) \
+        .filter(search_vector=query) \
+        .order_by('-search_rank', '-id')[:limit]
+
+    # Evaluating here keeps the results cached for the serializer
+    if ranked:
+        return ranked
+
+    return queryset \
+        .annotate(search_rank=TrigramSimilarity('title', text)) \
+        .filter(title__trigram_similar=text) \
+        .order_by('-search_rank', '-id')[:limit]
+
+
+def search_python(queryset, text, limit):
+    """Rank recipes with an inverted index built from the queryset"""
+    index = InvertedIndex()
+
+    for recipe_id, title in queryset.values_list('id', 'title'):
+        index.add(recipe_id, title, TITLE_WEIGHT)
+
+    for field in RELATED_FIELDS:
+        through = Recipe._meta.get_field(field).remote_field.through
+        names = through.objects.using(queryset.db) \
+            .filter(recipe_id__in=queryset.values('id')) \
+            .values_list('recipe_id', '%s__name' % field)
+        for recipe_id, name in names:
+            index.add(recipe_id, name, RELATED_WEIGHT)
+
+    ranked = index.search(text)[:limit]
+    if not ranked:
+        return queryset.none()
+
+    return queryset.filter(id__in=ranked).order_by(Case(
+        *[When(id=recipe_id, then=position)
+          for position, recipe_id in enumerate(ranked)],
+        output_field=IntegerField()
+    ))
+
+
+def search_recipes(queryset, text, limit=None):
+    """Return the recipes matching text, best match first"""
+    limit = limit or get_search_limit()
+
+    if is_postgresql(queryset.db):
+        return search_postgresql(queryset, text, limit)
+
+    return search_python(queryset, text, limit)
@@ -3,6 +3,53 @@ from rest_framework import serializers
 from coreapp.models import Tag
 from coreapp.models import Ingredient
 from coreapp.models import Recipe
+from recipeapp import bulk
+from recipeapp.fields import UserPrimaryKeyRelatedField
+from recipeapp.search import update_search_vectors
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """List serializer that writes all items with batched queries"""
+
+    def create(self, validated_data):
+        """Insert all items with batched INSERTs"""
+        model = self.child.Meta.model
+        return bulk.bulk_insert(model, [model(**attrs) for attrs in validated_data])
+
+    def update(self, instances, validated_data):
+        """Update all items with batched UPDATEs"""
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+
+        bulk.bulk_update(self.child.Meta.model, instances, fields)
+        return instances
+
+
+class BulkRecipeListSerializer(BulkListSerializer):
+    """Bulk writes for recipes, including their tags and ingredients"""
+
+    def pop_relations(self, validated_data):
+        """Remove and return the many-to-many values of each item"""
+        return [
+            {field: attrs.pop(field)
+             for field in bulk.RELATED_FIELDS if field in attrs}
+            for attrs in validated_data
+        ]
+
+    def create(self, validated_data):
+        relations = self.pop_relations(validated_data)
+        recipes = [Recipe(**attrs) for attrs in validated_data]
+        return bulk.bulk_insert_recipes(recipes, relations)
+
+    def update(self, instances, validated_data):
+        relations = self.pop_relations(validated_data)
+        super().update(instances, validated_data)
+        bulk.replace_relations(instances, relations)
+        update_search_vectors([recipe.pk for recipe in instances])
+        return instances
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -14,6 +61,7 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ('id', 'name')
         read_only_fields = ('id',)
+        list_serializer_class = BulkListSerializer
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -23,25 +71,83 @@ class IngredientSerializer(serializers.ModelSerializer):
         model = Ingredient
         fields = ('id', 'name')
         read_only_fields = ('id',)
+        list_serializer_class = BulkListSerializer
+
+
+class SparseFieldsMixin:
+    """Serializer that can output a subset of its fields
 
+    ``fields`` names the fields to keep and ``expand`` the relations to
+    nest with the serializers of ``expandable_fields``. Both only apply to
+    reads, expanded relations are read only.
+    """
+    expandable_fields = {}
 
-class RecipeSerializer(serializers.ModelSerializer):
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', ())
+        super().__init__(*args, **kwargs)
+
+        for name in expand:
+            self.fields[name] = self.expandable_fields[name](
+                many=True, read_only=True
+            )
+        if fields is not None:
+            for name in set(self.fields) - set(fields) - set(expand):
+                self.fields.pop(name)
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Model Serializer for Recipes"""
-    ingredient = serializers.PrimaryKeyRelatedField(
+    ingredient = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Ingredient.objects.all()
     )
-    tag = serializers.PrimaryKeyRelatedField(
+    tag = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all()
     )
+    expandable_fields = {
+        'ingredient': IngredientSerializer,
+        'tag': TagSerializer,
+    }
 
     class Meta:
         model = Recipe
         fields = ('id', 'title', 'time_taken', 'price', 'link', 'ingredient', 'tag')
         read_only_fields = ('id',)
+        list_serializer_class = BulkRecipeListSerializer
 
 
 class RecipeDetailSerializer(RecipeSerializer):
     ingredient = IngredientSerializer(many=True, read_only=True)
     tag = TagSerializer(many=True, read_only=True)
+
+
+class ShoppingListItemSerializer(serializers.Serializer):
+    """An ingredient of a shopping list and how many recipes use it"""
+    id = serializers.IntegerField(source='ingredient_id')
+    name = serializers.CharField(source='ingredient__name')
+    count = serializers.IntegerField()
+
+
+class ShoppingListSerializer(serializers.Serializer):
+    """The ingredients and totals of a set of recipes"""
+    recipes = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    time_taken = serializers.IntegerField()
+    ingredients = ShoppingListItemSerializer(many=True)
+
+
+class RecipeImportSerializer(serializers.Serializer):
+    """Validates one record of a recipe import, tags and ingredients by name"""
+    title = serializers.CharField(max_length=255)
+    time_taken = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=5, decimal_places=2)
+    link = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=255), required=False
+    )
+    ingredients = serializers.ListField(
+        child=serializers.CharField(max_length=255), required=False
+    )
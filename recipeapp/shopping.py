@@ -0,0 +1,35 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Sum
+
+from coreapp.models import Recipe
+
+
+def get_shopping_list(recipes):
+    """Return the ingredients and totals of a recipe queryset
+
+    The ingredients are counted with one aggregate query over the recipe
+    ingredient through table, the totals with one over the recipes.
+    """
+    ids = recipes.order_by().values('id')
+    ingredients = Recipe.ingredient.through.objects.using(recipes.db) \
+        .filter(recipe_id__in=ids) \
+        .values('ingredient_id', 'ingredient__name') \
+        .annotate(count=Count('recipe_id')) \
+        .order_by('ingredient__name', 'ingredient_id')
+
+    # Sums of many recipes outgrow the digits of a single price
+    totals = recipes.order_by().aggregate(
+        recipes=Count('id'),
+        price=Sum('price', output_field=DecimalField(
+            max_digits=12, decimal_places=2
+        )),
+        time_taken=Sum('time_taken'),
+    )
+
+    return {
+        'recipes': totals['recipes'],
+        'price': totals['price'] or Decimal('0'),
+        'time_taken': totals['time_taken'] or 0,
+        'ingredients': list(ingredients),
+    }
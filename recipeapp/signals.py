@@ -0,0 +1,134 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, \
+    pre_delete
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+from django.utils import timezone
+
+from coreapp.models import ChangeCounter, Ingredient, Recipe, Tag, Tombstone
+from recipeapp.bulk import delete_signals_skipped, touch
+from recipeapp.cache import invalidate_users
+from recipeapp.search import update_search_vectors
+
+
+def linked_recipe_ids(instance, using):
+    """Return the ids of recipes linked to a tag or ingredient"""
+    through = Recipe._meta.get_field(instance._meta.model_name) \
+        .remote_field.through
+    return list(through.objects.using(using)
+                .filter(**{'%s_id' % instance._meta.model_name: instance.pk})
+                .values_list('recipe_id', flat=True))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, using, update_fields=None, **kwargs):
+    """Refresh the search vector when a recipe title may have changed"""
+    if update_fields is None or 'title' in update_fields:
+        update_search_vectors([instance.pk], using)
+
+
+@receiver(m2m_changed, sender=Recipe.tag.through)
+@receiver(m2m_changed, sender=Recipe.ingredient.through)
+def recipe_relations_changed(sender, instance, action, reverse, pk_set,
+                             using, **kwargs):
+    """Touch recipes whose tags or ingredients changed, refresh their vectors"""
+    if reverse and action == 'pre_clear':
+        instance._cleared_recipe_ids = linked_recipe_ids(instance, using)
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        recipe_ids = [instance.pk]
+        instance.modified_on = timezone.now()
+    elif action == 'post_clear':
+        recipe_ids = getattr(instance, '_cleared_recipe_ids', [])
+    else:
+        recipe_ids = pk_set
+
+    touch(Recipe, recipe_ids, using)
+    update_search_vectors(recipe_ids, using)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def recipe_attr_saved(sender, instance, created, using, **kwargs):
+    """Touch and refresh the recipes using a renamed tag or ingredient"""
+    if not created:
+        recipe_ids = linked_recipe_ids(instance, using)
+        touch(Recipe, recipe_ids, using)
+        update_search_vectors(recipe_ids, using)
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def recipe_attr_deleting(sender, instance, using, **kwargs):
+    """Touch the recipes of a tag or ingredient about to be deleted"""
+    if delete_signals_skipped():
+        return
+
+    instance._deleted_recipe_ids = linked_recipe_ids(instance, using)
+    touch(Recipe, instance._deleted_recipe_ids, using)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def recipe_attr_deleted(sender, instance, using, **kwargs):
+    """Drop a deleted tag or ingredient from its recipes' search vectors"""
+    if delete_signals_skipped():
+        return
+
+    update_search_vectors(getattr(instance, '_deleted_recipe_ids', []), using)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def user_data_changed(sender, instance, using, signal, **kwargs):
+    """Invalidate the cached responses of the owner of a changed object"""
+    if signal is post_delete and delete_signals_skipped():
+        return
+
+    invalidate_users([instance.custom_user_id], using)
+
+
+@receiver(m2m_changed, sender=Recipe.tag.through)
+@receiver(m2m_changed, sender=Recipe.ingredient.through)
+def user_relations_changed(sender, instance, action, using, **kwargs):
+    """Invalidate cached responses when tags or ingredients are relinked"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_users([instance.custom_user_id], using)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_created(sender, instance, created, using, **kwargs):
+    """Start a new account on a fresh generation, ids can be reused"""
+    if created:
+        invalidate_users([instance.pk], using)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def record_tombstone(sender, instance, using, **kwargs):
+    """Record a deletion so syncing clients can drop the object"""
+    if delete_signals_skipped():
+        return
+
+    Tombstone.objects.using(using).create(
+        custom_user_id=instance.custom_user_id,
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        change_seq=ChangeCounter.objects.reserve(
+            instance.custom_user_id, using=using
+        ),
+    )
+
+
+@receiver(post_delete, sender=get_user_model())
+def user_deleted(sender, instance, using, **kwargs):
+    """Drop the sync state recorded while deleting a user's data"""
+    Tombstone.objects.using(using).filter(custom_user_id=instance.pk).delete()
+    ChangeCounter.objects.using(using) \
+        .filter(custom_user_id=instance.pk).delete()
@@ -0,0 +1,55 @@
+from django.conf import settings
+
+from coreapp.models import ChangeCounter, Ingredient, Recipe, Tag, Tombstone
+
+# Response key and model of each synced collection
+SYNC_MODELS = (
+    ('recipes', Recipe),
+    ('tags', Tag),
+    ('ingredients', Ingredient),
+)
+
+
+def get_sync_limit():
+    """Return the number of change sequence numbers covered per response"""
+    return getattr(settings, 'RECIPE_SYNC_LIMIT', 1000)
+
+
+def get_current_seq(user_id, using='default'):
+    """Return the last change sequence number handed out for a user"""
+    return ChangeCounter.objects.using(using) \
+        .filter(custom_user_id=user_id) \
+        .values_list('value', flat=True).first() or 0
+
+
+def get_seq_range(user_id, since=None, limit=None, using='default'):
+    """Return the (after, upto, current) sequence numbers of the next batch
+
+    Without a token the batch starts before 0, which also covers rows
+    written before sequence numbers existed.
+    """
+    current = get_current_seq(user_id, using)
+    after = -1 if since is None else since
+    upto = min(current, max(after, 0) + (limit or get_sync_limit()))
+
+    return after, upto, current
+
+
+def changed(queryset, after, upto):
+    """Filter queryset to rows written in the sequence range"""
+    return queryset.filter(change_seq__gt=after, change_seq__lte=upto) \
+        .order_by('change_seq', 'id')
+
+
+def get_deleted(user_id, after, upto, using='default'):
+    """Return the ids deleted in the sequence range by collection"""
+    keys = {model._meta.model_name: key for key, model in SYNC_MODELS}
+    deleted = {key: [] for key, model in SYNC_MODELS}
+    tombstones = changed(
+        Tombstone.objects.using(using).filter(custom_user_id=user_id),
+        after, upto
+    ).values_list('model', 'object_id')
+    for model_name, object_id in tombstones:
+        deleted[keys[model_name]].append(object_id)
+
+    return deleted
@@ -0,0 +1,116 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient, Recipe, Tag
+
+BATCH_URL = reverse('recipeapp:recipe-batch')
+
+
+def get_detail_url(recipe_id):
+    """Return the recipe detail URL"""
+    return reverse('recipeapp:recipe-detail', args=[recipe_id])
+
+
+class RecipeBatchTests(TestCase):
+    """Test fetching many recipes by id in one request"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@recipeapp.com', 'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(custom_user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(
+            custom_user=self.user, name='Salt'
+        )
+        self.recipes = [self.create_recipe(self.user, i) for i in range(3)]
+
+    def create_recipe(self, user, i):
+        """Create a recipe with a tag and an ingredient"""
+        recipe = Recipe.objects.create(
+            custom_user=user, title='Recipe %d' % i, time_taken=5,
+            price=Decimal('2.50'),
+        )
+        recipe.tag.add(self.tag)
+        recipe.ingredient.add(self.ingredient)
+        return recipe
+
+    def test_batch_get(self):
+        """Test recipes come in the requested order with detail output"""
+        first, second, third = [recipe.id for recipe in self.recipes]
+
+        res = self.client.get(BATCH_URL, {'ids': '%d,%d,%d' % (
+            third, first, third
+        )})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in res.data['results']],
+                         [third, first])
+        self.assertEqual(res.data['missing'], [])
+        self.assertEqual(res.data['results'][0],
+                         self.client.get(get_detail_url(third)).data)
+
+    def test_batch_post_reports_missing(self):
+        """Test other users' recipes and unknown ids are reported missing"""
+        other = get_user_model().objects.create_user(
+            'other@recipeapp.com', 'password123'
+        )
+        hidden = self.create_recipe(other, 9)
+        ids = [hidden.id, self.recipes[1].id, 999999]
+
+        res = self.client.post(BATCH_URL, {'ids': ids}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in res.data['results']],
+                         [self.recipes[1].id])
+        self.assertEqual(res.data['missing'], [hidden.id, 999999])
+
+    def test_batch_query_count_is_constant(self):
+        """Test the recipes, tags and ingredients take one query each"""
+        for i in range(20):
+            self.create_recipe(self.user, i)
+        ids = ','.join(str(pk) for pk in Recipe.objects.values_list(
+            'id', flat=True
+        ))
+
+        for enabled in (False, True):
+            with self.subTest(fast=enabled), \
+                    self.settings(RECIPE_FAST_READS=enabled), \
+                    self.assertNumQueries(3):
+                res = self.client.get(BATCH_URL, {'ids': ids})
+
+            self.assertEqual(len(res.data['results']), 23)
+
+    def test_invalid_batches(self):
+        """Test empty, malformed and oversized batches are rejected"""
+        requests = [
+            ('get', {'ids': ''}),
+            ('get', {'ids': '1,a'}),
+            ('post', {'ids': ['1']}),
+            ('post', {'ids': list(range(1, 102))}),
+        ]
+        for method, data in requests:
+            with self.subTest(method=method, data=data):
+                res = getattr(self.client, method)(BATCH_URL, data,
+                                                   format='json')
+
+                self.assertEqual(res.status_code,
+                                 status.HTTP_400_BAD_REQUEST)
+                self.assertIn('ids', res.data)
+
+    @mock.patch('coreapp.routers.pin')
+    def test_batch_post_does_not_pin(self, pin):
+        """Test a POSTed batch is a read and keeps replica reads"""
+        res = self.client.post(BATCH_URL, {'ids': [self.recipes[0].id]},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        pin.assert_not_called()
@@ -0,0 +1,216 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient
+from coreapp.models import Recipe
+from coreapp.models import Tag
+from coreapp.models import Tombstone
+
+INGREDIENTS_URL = reverse("recipeapp:ingredient-list")
+INGREDIENTS_BULK_URL = reverse("recipeapp:ingredient-bulk-update")
+INGREDIENTS_BULK_DELETE_URL = reverse("recipeapp:ingredient-bulk-delete")
+RECIPE_URL = reverse("recipeapp:recipe-list")
+RECIPE_BULK_URL = reverse("recipeapp:recipe-bulk-update")
+RECIPE_BULK_DELETE_URL = reverse("recipeapp:recipe-bulk-delete")
+
+
+class BulkApiTests(TestCase):
+    """Test bulk create, update and delete"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@recipeapp.com",
+            "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_ingredients(self):
+        """Test creating ingredients from a list payload"""
+        payload = [{'name': 'salt'}, {'name': 'pepper'}, {'name': 'basil'}]
+
+        res = self.client.post(INGREDIENTS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['name'] for item in res.data],
+                         ['salt', 'pepper', 'basil'])
+        ingredients = Ingredient.objects.filter(custom_user=self.user)
+        self.assertEqual(
+            sorted(item['id'] for item in res.data),
+            sorted(ingredients.values_list('id', flat=True))
+        )
+
+    def test_bulk_create_reports_errors_per_item(self):
+        """Test that an invalid item rejects the payload with its errors"""
+        payload = [{'name': 'salt'}, {'name': ''}]
+
+        res = self.client.post(INGREDIENTS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('name', res.data[1])
+        self.assertFalse(Ingredient.objects.exists())
+
+    @override_settings(RECIPE_BULK_BATCH_SIZE=2)
+    def test_bulk_create_recipes_with_relations(self):
+        """Test creating recipes with tags and ingredients in batches"""
+        tag = Tag.objects.create(custom_user=self.user, name='vegan')
+        ingredient = Ingredient.objects.create(custom_user=self.user, name='tofu')
+        payload = [
+            {'title': 'Recipe %d' % i, 'time_taken': 10, 'price': '5.00',
+             'tag': [tag.id], 'ingredient': [ingredient.id]}
+            for i in range(5)
+        ]
+
+        res = self.client.post(RECIPE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 5)
+        for item in res.data:
+            recipe = Recipe.objects.get(id=item['id'])
+            self.assertEqual(list(recipe.tag.all()), [tag])
+            self.assertEqual(list(recipe.ingredient.all()), [ingredient])
+            self.assertEqual(item['tag'], [tag.id])
+
+    def test_bulk_update_recipes(self):
+        """Test updating recipe fields and relations by id"""
+        old_tag = Tag.objects.create(custom_user=self.user, name='old')
+        new_tag = Tag.objects.create(custom_user=self.user, name='new')
+        recipes = [
+            Recipe.objects.create(
+                custom_user=self.user, title='Recipe %d' % i,
+                time_taken=10, price=5
+            )
+            for i in range(2)
+        ]
+        recipes[0].tag.add(old_tag)
+        payload = [
+            {'id': recipes[0].id, 'tag': [new_tag.id]},
+            {'id': recipes[1].id, 'title': 'Renamed'},
+        ]
+
+        res = self.client.patch(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(recipes[0].tag.all()), [new_tag])
+        recipes[1].refresh_from_db()
+        self.assertEqual(recipes[1].title, 'Renamed')
+        self.assertEqual(res.data[1]['title'], 'Renamed')
+
+    def test_bulk_update_unknown_id(self):
+        """Test that ids of other users are reported as not found"""
+        other_user = get_user_model().objects.create_user(
+            "other@recipeapp.com",
+            "password123"
+        )
+        other = Ingredient.objects.create(custom_user=other_user, name='salt')
+        mine = Ingredient.objects.create(custom_user=self.user, name='pepper')
+        payload = [
+            {'id': mine.id, 'name': 'chilli'},
+            {'id': other.id, 'name': 'sugar'},
+        ]
+
+        res = self.client.patch(INGREDIENTS_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        other.refresh_from_db()
+        self.assertEqual(other.name, 'salt')
+
+    def test_bulk_update_duplicate_id(self):
+        """Test that an id listed twice is reported instead of last wins"""
+        mine = Ingredient.objects.create(custom_user=self.user, name='pepper')
+        payload = [
+            {'id': mine.id, 'name': 'chilli'},
+            {'id': mine.id, 'name': 'paprika'},
+        ]
+
+        res = self.client.patch(INGREDIENTS_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        mine.refresh_from_db()
+        self.assertEqual(mine.name, 'pepper')
+
+    def test_bulk_delete_ingredients(self):
+        """Test deleting the user's ingredients by id"""
+        other_user = get_user_model().objects.create_user(
+            "other@recipeapp.com",
+            "password123"
+        )
+        other = Ingredient.objects.create(custom_user=other_user, name='salt')
+        ingredients = [
+            Ingredient.objects.create(custom_user=self.user, name=name)
+            for name in ('salt', 'pepper', 'basil')
+        ]
+        ids = [ingredients[0].id, ingredients[1].id, other.id]
+
+        res = self.client.post(
+            INGREDIENTS_BULK_DELETE_URL, {'ids': ids}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'deleted': 2})
+        self.assertEqual(
+            list(Ingredient.objects.values_list('id', flat=True).order_by('id')),
+            [other.id, ingredients[2].id]
+        )
+
+    def test_bulk_delete_recipes(self):
+        """Test deleting recipes along with their through rows"""
+        recipe = Recipe.objects.create(
+            custom_user=self.user, title='Curry', time_taken=10, price=5
+        )
+        recipe.tag.add(Tag.objects.create(custom_user=self.user, name='hot'))
+
+        res = self.client.post(
+            RECIPE_BULK_DELETE_URL, {'ids': [recipe.id]}, format='json'
+        )
+
+        self.assertEqual(res.data, {'deleted': 1})
+        self.assertFalse(Recipe.tag.through.objects.exists())
+
+    def test_bulk_delete_query_count_is_constant(self):
+        """Test tombstones and recipe updates are batched, not per row"""
+        recipe = Recipe.objects.create(
+            custom_user=self.user, title='Curry', time_taken=10, price=5
+        )
+
+        def delete(size):
+            ingredients = [
+                Ingredient.objects.create(custom_user=self.user, name='salt')
+                for _ in range(size)
+            ]
+            recipe.ingredient.add(*ingredients)
+            ids = [ingredient.id for ingredient in ingredients]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(
+                    INGREDIENTS_BULK_DELETE_URL, {'ids': ids}, format='json'
+                )
+            self.assertEqual(res.data, {'deleted': size})
+            return ids, len(ctx)
+
+        _ids, single = delete(1)
+        ids, several = delete(5)
+
+        self.assertEqual(several, single)
+        seqs = sorted(Tombstone.objects.filter(object_id__in=ids)
+                      .values_list('change_seq', flat=True))
+        self.assertEqual(seqs, list(range(seqs[0], seqs[0] + 5)))
+        self.assertFalse(recipe.ingredient.exists())
+
+    def test_bulk_delete_invalid_ids(self):
+        """Test that a malformed id list is rejected"""
+        res = self.client.post(
+            RECIPE_BULK_DELETE_URL, {'ids': 'all'}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,159 @@
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient
+from coreapp.models import Recipe
+from coreapp.models import Tag
+from recipeapp import cache
+from recipeapp.checks import check_response_cache
+
+RECIPE_URL = reverse("recipeapp:recipe-list")
+RECIPE_BULK_URL = reverse("recipeapp:recipe-bulk-update")
+TAGS_URL = reverse("recipeapp:tag-list")
+
+
+def get_detail_URL(recipe_id):
+    """Return the recipe detail URL"""
+    return reverse('recipeapp:recipe-detail', args=[recipe_id])
+
+
+@override_settings(RECIPE_CACHE_ENABLED=True)
+class ResponseCacheTests(TestCase):
+    """Test the per-user response cache"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@recipeapp.com",
+            "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            custom_user=self.user, title='Soup', time_taken=10, price=5
+        )
+        cache.reset_stats()
+
+    def test_repeated_list_is_served_from_cache(self):
+        """Test the second identical request runs no queries"""
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(RECIPE_URL)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.data, res.data)
+        self.assertEqual(cache.get_stats()['hits'], 1)
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+    def test_query_string_is_part_of_key(self):
+        """Test different filters are cached separately"""
+        self.client.get(RECIPE_URL)
+
+        res = self.client.get(RECIPE_URL, {'price_min': 10})
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data, [])
+
+    def test_save_invalidates(self):
+        """Test updating a recipe drops the cached list and detail"""
+        self.client.get(RECIPE_URL)
+        self.client.get(get_detail_URL(self.recipe.id))
+
+        self.recipe.title = 'Stew'
+        self.recipe.save()
+
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data[0]['title'], 'Stew')
+        res = self.client.get(get_detail_URL(self.recipe.id))
+        self.assertEqual(res.data['title'], 'Stew')
+
+    def test_delete_invalidates(self):
+        """Test deleting a recipe drops the cached list"""
+        self.client.get(RECIPE_URL)
+
+        self.recipe.delete()
+
+        self.assertEqual(self.client.get(RECIPE_URL).data, [])
+
+    def test_relation_change_invalidates(self):
+        """Test adding a tag to a recipe drops the cached list"""
+        self.client.get(RECIPE_URL)
+        tag = Tag.objects.create(custom_user=self.user, name='Vegan')
+        self.client.get(TAGS_URL)
+
+        self.recipe.tag.add(tag)
+
+        self.assertEqual(self.client.get(RECIPE_URL).data[0]['tag'], [tag.id])
+
+    def test_bulk_update_invalidates(self):
+        """Test bulk writes, which send no signals, drop the cached list"""
+        self.client.get(RECIPE_URL)
+
+        self.client.patch(
+            RECIPE_BULK_URL, [{'id': self.recipe.id, 'title': 'Stew'}],
+            format='json'
+        )
+
+        self.assertEqual(self.client.get(RECIPE_URL).data[0]['title'], 'Stew')
+
+    def test_cache_is_per_user(self):
+        """Test another user's cached list is never served"""
+        self.client.get(TAGS_URL)
+        other = get_user_model().objects.create_user(
+            "other@recipeapp.com",
+            "password123"
+        )
+        Ingredient.objects.create(custom_user=other, name='Salt')
+        Tag.objects.create(custom_user=other, name='Dessert')
+        client = APIClient()
+        client.force_authenticate(other)
+
+        res = client.get(TAGS_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual([tag['name'] for tag in res.data], ['Dessert'])
+        self.assertEqual(self.client.get(TAGS_URL)['X-Cache'], 'HIT')
+
+    @override_settings(RECIPE_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        """Test nothing is cached when the setting is off"""
+        self.client.get(RECIPE_URL)
+
+        res = self.client.get(RECIPE_URL)
+
+        self.assertNotIn('X-Cache', res)
+        self.assertEqual(cache.get_stats()['hits'], 0)
+
+
+class SharedCacheTests(SimpleTestCase):
+    """Test the response cache is only used when workers share it"""
+
+    def test_disabled_with_local_cache(self):
+        """Test a per-process cache leaves the response cache off"""
+        self.assertFalse(cache.is_enabled())
+        self.assertEqual(check_response_cache(None), [])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'recipeapp-test'),
+    }})
+    def test_enabled_with_shared_cache(self):
+        """Test a shared cache turns the response cache on"""
+        self.assertTrue(cache.is_enabled())
+
+    @override_settings(RECIPE_CACHE_ENABLED=True)
+    def test_local_cache_refused(self):
+        """Test forcing the cache on with a local backend is an error"""
+        errors = check_response_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['recipeapp.E001'])
@@ -0,0 +1,172 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Recipe
+from coreapp.models import Tag
+
+RECIPE_URL = reverse("recipeapp:recipe-list")
+RECIPE_BULK_URL = reverse("recipeapp:recipe-bulk-update")
+TAGS_URL = reverse("recipeapp:tag-list")
+
+
+def get_detail_URL(recipe_id):
+    """Return the recipe detail URL"""
+    return reverse('recipeapp:recipe-detail', args=[recipe_id])
+
+
+@override_settings(RECIPE_CACHE_ENABLED=False)
+class ConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified handling"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@recipeapp.com",
+            "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            custom_user=self.user, title='Soup', time_taken=10, price=5
+        )
+        self.tag = Tag.objects.create(custom_user=self.user, name='Vegan')
+
+    def get_etag(self, url):
+        """Return the ETag of a fresh response"""
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res['ETag']
+
+    def test_list_not_modified(self):
+        """Test a matching If-None-Match gets a 304 from one query"""
+        etag = self.get_etag(RECIPE_URL)
+        self.assertTrue(etag.startswith('W/"'))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertEqual(res.content, b'')
+
+    def test_detail_not_modified_since(self):
+        """Test a current If-Modified-Since gets a 304"""
+        res = self.client.get(get_detail_URL(self.recipe.id))
+
+        res = self.client.get(
+            get_detail_URL(self.recipe.id),
+            HTTP_IF_MODIFIED_SINCE=res['Last-Modified']
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_and_detail_etags_differ(self):
+        """Test list and detail of the same data have different ETags"""
+        self.assertNotEqual(self.get_etag(RECIPE_URL),
+                            self.get_etag(get_detail_URL(self.recipe.id)))
+
+    def test_update_changes_etag(self):
+        """Test saving a recipe changes the ETag"""
+        etag = self.get_etag(get_detail_URL(self.recipe.id))
+
+        self.recipe.title = 'Stew'
+        self.recipe.save()
+
+        res = self.client.get(get_detail_URL(self.recipe.id),
+                              HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'Stew')
+
+    def test_relation_change_touches_recipe(self):
+        """Test adding a tag marks the recipe as modified"""
+        modified_on = self.recipe.modified_on
+
+        self.tag.tags.add(self.recipe)
+
+        self.recipe.refresh_from_db()
+        self.assertGreater(self.recipe.modified_on, modified_on)
+
+    def test_tag_rename_and_delete_touch_recipe(self):
+        """Test renaming or deleting a tag marks its recipes as modified"""
+        self.recipe.tag.add(self.tag)
+        etag = self.get_etag(get_detail_URL(self.recipe.id))
+
+        self.tag.name = 'Vegetarian'
+        self.tag.save()
+        renamed_etag = self.get_etag(get_detail_URL(self.recipe.id))
+        self.tag.delete()
+
+        self.assertNotEqual(renamed_etag, etag)
+        self.assertNotEqual(
+            self.get_etag(get_detail_URL(self.recipe.id)), renamed_etag
+        )
+
+    def test_delete_changes_list_etag(self):
+        """Test deleting a row changes the list ETag"""
+        Recipe.objects.create(
+            custom_user=self.user, title='Stew', time_taken=10, price=5
+        )
+        etag = self.get_etag(RECIPE_URL)
+
+        self.recipe.delete()
+
+        self.assertNotEqual(self.get_etag(RECIPE_URL), etag)
+
+    def test_relinking_changes_assigned_only_etag(self):
+        """Test relinking recipes changes the ETag of assigned tags"""
+        first, second, third = [
+            Tag.objects.create(custom_user=self.user, name=name)
+            for name in ('First', 'Second', 'Third')
+        ]
+        self.recipe.tag.set([first, third])
+        url = TAGS_URL + '?assigned_only=1'
+        etag = self.get_etag(url)
+
+        self.recipe.tag.set([second, third])
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag['name'] for tag in res.data],
+                         ['Third', 'Second'])
+
+    def test_bulk_update_sets_modified_on(self):
+        """Test bulk updates move the modification time"""
+        modified_on = self.recipe.modified_on
+
+        self.client.patch(
+            RECIPE_BULK_URL, [{'id': self.recipe.id, 'tag': [self.tag.id]}],
+            format='json'
+        )
+
+        self.recipe.refresh_from_db()
+        self.assertGreater(self.recipe.modified_on, modified_on)
+
+    def test_missing_detail_is_not_found(self):
+        """Test a conditional request for a missing recipe still 404s"""
+        res = self.client.get(get_detail_URL(self.recipe.id + 1),
+                              HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_malformed_detail_is_not_found(self):
+        """Test a non-integer pk 404s instead of failing the ETag query"""
+        for url in (get_detail_URL('abc'),
+                    reverse('recipeapp:tag-detail', args=['abc'])):
+            with self.subTest(url=url):
+                res = self.client.get(url)
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(RECIPE_CACHE_ENABLED=True)
+    def test_cached_not_modified_runs_no_queries(self):
+        """Test a cache hit answers conditional requests without queries"""
+        etag = self.get_etag(TAGS_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['X-Cache'], 'HIT')
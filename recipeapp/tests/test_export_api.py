@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient
+from coreapp.models import Recipe
+from coreapp.models import Tag
+
+EXPORT_URL = reverse("recipeapp:recipe-export")
+
+
+class RecipeExportApiTests(TestCase):
+    """Test streaming the recipe book out"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@recipeapp.com",
+            "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.recipes = [
+            Recipe.objects.create(
+                custom_user=self.user,
+                title='Recipe %d' % i,
+                time_taken=10 + i,
+                price=5
+            )
+            for i in range(5)
+        ]
+        self.recipes[0].tag.add(
+            Tag.objects.create(custom_user=self.user, name='vegan'),
+            Tag.objects.create(custom_user=self.user, name='quick'),
+        )
+        self.recipes[1].ingredient.add(
+            Ingredient.objects.create(custom_user=self.user, name='tofu')
+        )
+
+    def get_content(self, params):
+        """Request an export and return the streamed text"""
+        res = self.client.get(EXPORT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return b''.join(res.streaming_content).decode('utf-8')
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_export_ndjson(self):
+        """Test exporting every recipe as one JSON object per line"""
+        lines = self.get_content({}).splitlines()
+        records = [json.loads(line) for line in lines]
+
+        self.assertEqual([record['id'] for record in records],
+                         [recipe.id for recipe in self.recipes])
+        self.assertEqual(records[0]['tags'], ['quick', 'vegan'])
+        self.assertEqual(records[1]['ingredients'], ['tofu'])
+        self.assertEqual(records[1]['price'], '5.00')
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_export_csv(self):
+        """Test exporting recipes as CSV with joined names"""
+        rows = list(csv.DictReader(io.StringIO(self.get_content({'output': 'csv'}))))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['tags'], 'quick|vegan')
+        self.assertEqual(rows[0]['ingredients'], '')
+        self.assertEqual(rows[2]['time_taken'], '12')
+
+    def test_export_limited_to_user(self):
+        """Test that other users' recipes are not exported"""
+        other_user = get_user_model().objects.create_user(
+            "other@recipeapp.com",
+            "password123"
+        )
+        Recipe.objects.create(
+            custom_user=other_user, title='Other', time_taken=5, price=1
+        )
+
+        lines = self.get_content({}).splitlines()
+
+        self.assertEqual(len(lines), 5)
+
+    def test_export_invalid_output(self):
+        """Test that unknown output formats are rejected"""
+        res = self.client.get(EXPORT_URL, {'output': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,167 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import serializers as drf_serializers, status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient, Recipe, Tag
+from recipeapp import fastpath, renderers, serializers
+
+TAGS_URL = reverse('recipeapp:tag-list')
+INGREDIENTS_URL = reverse('recipeapp:ingredient-list')
+RECIPE_URL = reverse('recipeapp:recipe-list')
+
+
+def get_detail_url(name, pk):
+    """Return the detail URL of an object"""
+    return reverse('recipeapp:%s-detail' % name, args=[pk])
+
+
+@override_settings(RECIPE_CACHE_ENABLED=False)
+class FastReadEquivalenceTests(TestCase):
+    """Test the fast read path renders what the serializers render"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@recipeapp.com', 'password123'
+        )
+        other = get_user_model().objects.create_user(
+            'other@recipeapp.com', 'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        # Created out of name order so ids and names disagree
+        self.tags = [Tag.objects.create(custom_user=self.user, name=name)
+                     for name in ('Vegan', 'Dessert', 'Ema datshi ')]
+        self.ingredients = [
+            Ingredient.objects.create(custom_user=self.user, name=name)
+            for name in ('salt', 'épice', 'Basil', 'salt')
+        ]
+        Tag.objects.create(custom_user=other, name='Hidden')
+
+        samples = [
+            ('Soup', 10, Decimal('5'), '', [2, 0], [3, 1, 0]),
+            ('Curry "hot"', 45, Decimal('0.10'), 'https://curry.bt', [1], []),
+            ('Toast', 2, Decimal('999.99'), '', [], [2]),
+            ('Naked', 0, Decimal('1.5'), '', [], []),
+        ]
+        self.recipes = []
+        for title, time_taken, price, link, tags, ingredients in samples:
+            recipe = Recipe.objects.create(
+                custom_user=self.user, title=title, time_taken=time_taken,
+                price=price, link=link,
+            )
+            recipe.tag.add(*[self.tags[i] for i in tags])
+            recipe.ingredient.add(*[self.ingredients[i] for i in ingredients])
+            self.recipes.append(recipe)
+
+    def get_both(self, url, **extra):
+        """Return the response bodies with and without the fast path"""
+        contents = []
+        for enabled in (False, True):
+            with self.settings(RECIPE_FAST_READS=enabled):
+                res = self.client.get(url, **extra)
+            self.assertEqual(res.status_code, status.HTTP_200_OK, url)
+            contents.append(res.content)
+
+        return contents
+
+    def assert_same_output(self, url, **extra):
+        """Assert both paths render the same bytes"""
+        slow, fast = self.get_both(url, **extra)
+        self.assertEqual(fast, slow, url)
+
+    def test_lists(self):
+        """Test tag, ingredient and recipe lists match"""
+        urls = [
+            TAGS_URL,
+            TAGS_URL + '?assigned_only=1',
+            INGREDIENTS_URL,
+            RECIPE_URL,
+            RECIPE_URL + '?tags=%d&price_max=10' % self.tags[0].id,
+            RECIPE_URL + '?search=curry',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assert_same_output(url)
+
+    def test_pages(self):
+        """Test paginated lists and their next links match"""
+        for url in (TAGS_URL, INGREDIENTS_URL, RECIPE_URL):
+            url += '?page_size=1'
+            while url:
+                with self.subTest(url=url):
+                    self.assert_same_output(url)
+                url = self.client.get(url).data['next']
+
+    def test_details(self):
+        """Test nested recipe details and tag details match"""
+        for recipe in self.recipes:
+            self.assert_same_output(get_detail_url('recipe', recipe.id))
+        self.assert_same_output(get_detail_url('tag', self.tags[0].id))
+
+    def test_missing_detail(self):
+        """Test other users' objects are not found"""
+        hidden = Tag.objects.get(name='Hidden')
+
+        res = self.client.get(get_detail_url('tag', hidden.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_other_formats(self):
+        """Test the binary formats match too"""
+        accepts = [media_type for media_type, enabled in (
+            ('application/msgpack', renderers.msgpack),
+            ('application/cbor', renderers.cbor2),
+        ) if enabled]
+        for accept in accepts:
+            with self.subTest(accept=accept):
+                self.assert_same_output(RECIPE_URL, HTTP_ACCEPT=accept)
+
+    def test_serializer_bypassed(self):
+        """Test the serializers are not run on the fast path"""
+        with mock.patch.object(
+            drf_serializers.Serializer, 'to_representation'
+        ) as to_representation:
+            res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        to_representation.assert_not_called()
+
+
+class FastReaderTests(TestCase):
+    """Test which serializers the fast path supports"""
+
+    def test_supported(self):
+        """Test the recipe API serializers are supported"""
+        for model, serializer_class in (
+            (Tag, serializers.TagSerializer),
+            (Recipe, serializers.RecipeSerializer),
+            (Recipe, serializers.RecipeDetailSerializer),
+        ):
+            self.assertIsNotNone(fastpath.get_reader(model, serializer_class))
+
+    def test_unsupported(self):
+        """Test serializers computing their values fall back"""
+        class TitleSerializer(drf_serializers.ModelSerializer):
+            upper = drf_serializers.SerializerMethodField()
+
+            class Meta:
+                model = Recipe
+                fields = ('id', 'upper')
+
+            def get_upper(self, recipe):
+                return recipe.title.upper()
+
+        class UserSerializer(drf_serializers.ModelSerializer):
+            class Meta:
+                model = Recipe
+                fields = ('id', 'custom_user')
+
+        self.assertIsNone(fastpath.get_reader(Recipe, TitleSerializer))
+        self.assertIsNone(fastpath.get_reader(Recipe, UserSerializer))
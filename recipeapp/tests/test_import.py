@@ -0,0 +1,183 @@
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient
+from coreapp.models import Recipe
+from coreapp.models import Tag
+
+IMPORT_URL = reverse("recipeapp:recipe-import")
+EXPORT_URL = reverse("recipeapp:recipe-export")
+
+
+def ndjson(*records):
+    """Return records as NDJSON text"""
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+class RecipeImportApiTests(TestCase):
+    """Test the streaming recipe import endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@recipeapp.com",
+            "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, body, content_type='application/x-ndjson'):
+        """Post a raw import body"""
+        return self.client.generic(
+            'POST', IMPORT_URL, body.encode('utf-8'), content_type
+        )
+
+    def test_import_ndjson_resolves_names(self):
+        """Test that names match existing rows and missing ones are created"""
+        vegan = Tag.objects.create(custom_user=self.user, name='vegan')
+        body = ndjson(
+            {'title': 'Tofu bowl', 'time_taken': 15, 'price': '7.50',
+             'tags': ['vegan', 'quick'], 'ingredients': ['tofu', 'rice']},
+            {'title': 'Fried rice', 'time_taken': 20, 'price': '4.00',
+             'tags': ['quick'], 'ingredients': ['rice']},
+        )
+
+        res = self.post(body)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['tags_created'], 1)
+        self.assertEqual(res.data['ingredients_created'], 2)
+        bowl = Recipe.objects.get(custom_user=self.user, title='Tofu bowl')
+        self.assertIn(vegan, bowl.tag.all())
+        self.assertEqual(Tag.objects.filter(name='quick').count(), 1)
+        self.assertEqual(Ingredient.objects.filter(name='rice').count(), 1)
+
+    def test_import_csv(self):
+        """Test importing the CSV layout of the export"""
+        body = (
+            'id,title,time_taken,price,link,tags,ingredients\r\n'
+            '7,Pancakes,20,3.50,,breakfast|sweet,flour|milk\r\n'
+        )
+
+        res = self.post(body, 'text/csv')
+
+        self.assertEqual(res.data['created'], 1)
+        recipe = Recipe.objects.get(custom_user=self.user)
+        self.assertEqual(
+            sorted(recipe.tag.values_list('name', flat=True)),
+            ['breakfast', 'sweet']
+        )
+
+    def test_import_reports_invalid_records(self):
+        """Test that invalid records are skipped and reported by line"""
+        body = ndjson(
+            {'title': 'Soup', 'time_taken': 30, 'price': '3.00'},
+            {'title': 'Broken', 'time_taken': 'long'},
+        ) + 'not json\n'
+
+        res = self.post(body)
+
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['error_count'], 2)
+        self.assertEqual([error['line'] for error in res.data['errors']], [2, 3])
+
+    def test_import_csv_with_byte_order_mark(self):
+        """Test a BOM does not end up in the first CSV header"""
+        body = '\ufefftitle,time_taken,price\r\nPancakes,20,3.50\r\n'
+
+        res = self.post(body, 'text/csv')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 1)
+
+    def test_import_invalid_utf8(self):
+        """Test an undecodable line is reported instead of failing"""
+        body = ndjson(
+            {'title': 'Soup', 'time_taken': 30, 'price': '3.00'}
+        ).encode('utf-8') + b'\xff\xfe{"title": "Stew"}\n'
+
+        res = self.client.generic(
+            'POST', IMPORT_URL, body, 'application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual([error['line'] for error in res.data['errors']], [2])
+
+        res = self.client.generic('POST', IMPORT_URL, b'\xff\xfe', 'text/csv')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['error_count'], 1)
+
+    def test_import_unsupported_content_type(self):
+        """Test that bodies other than NDJSON and CSV are refused"""
+        res = self.post('<recipes/>', 'application/xml')
+
+        self.assertEqual(res.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_export_round_trip(self):
+        """Test that an export imports back into the same recipes"""
+        recipe = Recipe.objects.create(
+            custom_user=self.user, title='Curry', time_taken=40, price=9
+        )
+        recipe.ingredient.add(
+            Ingredient.objects.create(custom_user=self.user, name='rice')
+        )
+        export = self.client.get(EXPORT_URL)
+        body = b''.join(export.streaming_content).decode('utf-8')
+
+        res = self.post(body)
+
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['ingredients_created'], 0)
+        self.assertEqual(Recipe.objects.filter(title='Curry').count(), 2)
+
+
+class ImportRecipesCommandTests(TestCase):
+    """Test the import_recipes management command"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@recipeapp.com",
+            "password123"
+        )
+
+    def write_file(self, suffix, content):
+        """Write content to a temporary file and return its path"""
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w') as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_import_file(self):
+        """Test importing an NDJSON file in batches"""
+        path = self.write_file('.ndjson', ndjson(*[
+            {'title': 'Recipe %d' % i, 'time_taken': 10, 'price': '1.00',
+             'tags': ['batch']}
+            for i in range(5)
+        ]))
+
+        call_command('import_recipes', path, user=self.user.email,
+                     batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(Recipe.objects.filter(custom_user=self.user).count(), 5)
+        self.assertEqual(Tag.objects.filter(custom_user=self.user).count(), 1)
+
+    def test_unknown_user(self):
+        """Test that the command fails for an unknown user"""
+        path = self.write_file('.ndjson', '')
+
+        with self.assertRaises(CommandError):
+            call_command('import_recipes', path, user='nobody@recipeapp.com')
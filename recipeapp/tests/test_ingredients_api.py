@@ -6,6 +6,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from coreapp.models import Ingredient
+from coreapp.models import Recipe
 from recipeapp.serializers import IngredientSerializer
 
 INGREDIENTS_URL = reverse("recipeapp:ingredient-list")
@@ -86,4 +87,21 @@ class PrivateIngredientsApiTest(TestCase):
             'name': ''
         }
         response = self.client.post(INGREDIENTS_URL, payload)
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_ingredients_assigned_to_recipes(self):
+        """Test filtering ingredients by those assigned to recipes"""
+        ingredient1 = Ingredient.objects.create(custom_user=self.user, name="apples")
+        ingredient2 = Ingredient.objects.create(custom_user=self.user, name="turkey")
+        recipe = Recipe.objects.create(
+            custom_user=self.user,
+            title="Apple crumble",
+            time_taken=5,
+            price=10
+        )
+        recipe.ingredient.add(ingredient1)
+
+        res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
+
+        self.assertEqual(res.data, IngredientSerializer([ingredient1], many=True).data)
+        self.assertNotIn(IngredientSerializer(ingredient2).data, res.data)
@@ -0,0 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient
+from coreapp.models import Recipe
+from recipeapp.pagination import KeysetPagination
+
+INGREDIENTS_URL = reverse("recipeapp:ingredient-list")
+RECIPE_URL = reverse("recipeapp:recipe-list")
+
+
+class KeysetPaginationTests(TestCase):
+    """Test opt-in keyset pagination on the list endpoints"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@recipeapp.com",
+            "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk_pages(self, url):
+        """Follow next links and return every page"""
+        pages = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append(res.data['results'])
+            url = res.data['next']
+
+        return pages
+
+    def test_list_not_paginated_by_default(self):
+        """Test that a plain list request still returns a list"""
+        Ingredient.objects.create(custom_user=self.user, name="salt")
+
+        res = self.client.get(INGREDIENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.data, list)
+
+    def test_ingredient_pages_cover_duplicate_names(self):
+        """Test that pages split rows with equal names without gaps"""
+        for name in ("salt", "pepper", "salt", "salt", "basil"):
+            Ingredient.objects.create(custom_user=self.user, name=name)
+
+        pages = self.walk_pages(INGREDIENTS_URL + '?page_size=2')
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        ids = [item['id'] for page in pages for item in page]
+        expected = Ingredient.objects.order_by('-name', 'id') \
+            .values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+
+    def test_recipe_pages_newest_first(self):
+        """Test that recipe pages follow the list order"""
+        for i in range(5):
+            Recipe.objects.create(
+                custom_user=self.user,
+                title='Recipe %d' % i,
+                time_taken=10,
+                price=5
+            )
+
+        pages = self.walk_pages(RECIPE_URL + '?page_size=3')
+
+        ids = [item['id'] for page in pages for item in page]
+        expected = Recipe.objects.order_by('-id').values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+
+    def test_pagination_does_not_count(self):
+        """Test that the page query issues no COUNT"""
+        Ingredient.objects.create(custom_user=self.user, name="salt")
+
+        # The first query computes the ETag
+        with self.assertNumQueries(2) as ctx:
+            self.client.get(INGREDIENTS_URL + '?page_size=10')
+
+        self.assertNotIn('COUNT', ctx.captured_queries[1]['sql'].upper())
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        res = self.client.get(INGREDIENTS_URL + '?cursor=not-a-cursor')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        """Test that cursors with wrong-typed or null positions are rejected"""
+        for url, position in (
+            (RECIPE_URL, ['x']),
+            (RECIPE_URL, [None]),
+            (RECIPE_URL, [[1]]),
+            (INGREDIENTS_URL, ['salt', 'x']),
+            (INGREDIENTS_URL, [None, 1]),
+        ):
+            with self.subTest(url=url, position=position):
+                cursor = KeysetPagination().encode_cursor(position)
+                res = self.client.get(url, {'cursor': cursor})
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Recipe
+from coreapp.models import Tag
+from coreapp.models import Ingredient
+
+RECIPE_URL = reverse("recipeapp:recipe-list")
+
+
+def get_detail_URL(recipe_id):
+    """Return the recipe detail URL"""
+    return reverse('recipeapp:recipe-detail', args=[recipe_id])
+
+
+def get_list_query_count():
+    """Return the number of queries a recipe list takes"""
+    # The ETag and the rows, PostgreSQL aggregates the related ids in the
+    # rows while other databases need one query per relation
+    return 2 if connection.vendor == 'postgresql' else 4
+
+
+def create_sample_recipes(user, count, tag, ingredient):
+    """Bulk create recipes linked to a tag and an ingredient"""
+    Recipe.objects.bulk_create([
+        Recipe(custom_user=user, title='Recipe %d' % i, time_taken=10, price=5)
+        for i in range(count)
+    ])
+    ids = Recipe.objects.filter(custom_user=user).values_list('id', flat=True)
+
+    Recipe.tag.through.objects.bulk_create([
+        Recipe.tag.through(recipe_id=recipe_id, tag_id=tag.id)
+        for recipe_id in ids
+    ], ignore_conflicts=True)
+    Recipe.ingredient.through.objects.bulk_create([
+        Recipe.ingredient.through(recipe_id=recipe_id, ingredient_id=ingredient.id)
+        for recipe_id in ids
+    ], ignore_conflicts=True)
+
+
+# The rows are written behind the ORM's back, bypassing cache invalidation
+@override_settings(RECIPE_CACHE_ENABLED=False)
+class RecipeQueryCountTests(TestCase):
+    """Test that recipe endpoints run a constant number of queries"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "sample@123"
+        )
+        self.tag = Tag.objects.create(custom_user=self.user, name="spicy")
+        self.ingredient = Ingredient.objects.create(
+            custom_user=self.user,
+            name="cinnamon"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_query_count_is_constant(self):
+        """Listing recipes takes a constant number of queries"""
+        for size in (1, 100, 1000):
+            with self.subTest(size=size):
+                existing = Recipe.objects.count()
+                create_sample_recipes(
+                    self.user, size - existing, self.tag, self.ingredient
+                )
+
+                with self.assertNumQueries(get_list_query_count()):
+                    res = self.client.get(RECIPE_URL)
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(res.data), size)
+                self.assertEqual(res.data[0]['tag'], [self.tag.id])
+                self.assertEqual(
+                    res.data[0]['ingredient'], [self.ingredient.id]
+                )
+
+    def test_detail_query_count(self):
+        """Retrieving a recipe loads nested relations with prefetches"""
+        create_sample_recipes(self.user, 1, self.tag, self.ingredient)
+        recipe = Recipe.objects.get(custom_user=self.user)
+
+        with self.assertNumQueries(4):
+            res = self.client.get(get_detail_URL(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['tag'], [
+            {'id': self.tag.id, 'name': self.tag.name}
+        ])
+        self.assertEqual(res.data['ingredient'], [
+            {'id': self.ingredient.id, 'name': self.ingredient.name}
+        ])
+
+    def test_list_loads_only_serialized_columns(self):
+        """The list query leaves out columns the serializer does not read"""
+        create_sample_recipes(self.user, 1, self.tag, self.ingredient)
+
+        with self.assertNumQueries(get_list_query_count()) as ctx:
+            self.client.get(RECIPE_URL)
+
+        recipe_sql = ctx.captured_queries[1]['sql']
+        self.assertIn('"title"', recipe_sql)
+        self.assertNotIn('"custom_user_id"', recipe_sql.split('WHERE')[0])
@@ -3,7 +3,7 @@ from django.urls import reverse
 from django.test import TestCase
 
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 
 from coreapp.models import Recipe
 from coreapp.models import Tag
@@ -190,3 +190,114 @@ class PrivateRecipeApiTest(TestCase):
         self.assertEqual(len(tags), 1)
         self.assertIn(new_tag, tags)
 
+    def test_filter_recipes_by_tags(self):
+        """Test returning recipes with any of the given tags"""
+        recipe1 = create_sample_recipe(user=self.sample_user, title='Curry')
+        recipe2 = create_sample_recipe(user=self.sample_user, title='Tahini')
+        recipe3 = create_sample_recipe(user=self.sample_user, title='Chips')
+        tag1 = create_sample_tag(user=self.sample_user, name='Vegan')
+        tag2 = create_sample_tag(user=self.sample_user, name='Vegetarian')
+        recipe1.tag.add(tag1)
+        recipe2.tag.add(tag1, tag2)
+
+        res = self.client.get(RECIPE_URL, {'tags': '%d,%d' % (tag1.id, tag2.id)})
+
+        ids = [item['id'] for item in res.data]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(ids, [recipe2.id, recipe1.id])
+        self.assertNotIn(recipe3.id, ids)
+
+    def test_filter_recipes_matching_all_tags(self):
+        """Test returning recipes with all of the given tags"""
+        recipe1 = create_sample_recipe(user=self.sample_user, title='Curry')
+        recipe2 = create_sample_recipe(user=self.sample_user, title='Tahini')
+        tag1 = create_sample_tag(user=self.sample_user, name='Vegan')
+        tag2 = create_sample_tag(user=self.sample_user, name='Vegetarian')
+        recipe1.tag.add(tag1)
+        recipe2.tag.add(tag1, tag2)
+
+        res = self.client.get(RECIPE_URL, {
+            'tags': '%d,%d' % (tag1.id, tag2.id),
+            'match': 'all',
+        })
+
+        self.assertEqual([item['id'] for item in res.data], [recipe2.id])
+
+    def test_filter_recipes_by_ingredients(self):
+        """Test returning recipes with specific ingredients"""
+        recipe1 = create_sample_recipe(user=self.sample_user, title='Beans')
+        recipe2 = create_sample_recipe(user=self.sample_user, title='Chicken')
+        ingredient = create_sample_ingredient(user=self.sample_user, name='Feta')
+        recipe1.ingredient.add(ingredient)
+
+        res = self.client.get(RECIPE_URL, {'ingredients': str(ingredient.id)})
+
+        ids = [item['id'] for item in res.data]
+        self.assertEqual(ids, [recipe1.id])
+        self.assertNotIn(recipe2.id, ids)
+
+    def test_filter_recipes_by_ranges(self):
+        """Test filtering recipes by time taken and price ranges"""
+        create_sample_recipe(user=self.sample_user, time_taken=5, price=2)
+        recipe = create_sample_recipe(
+            user=self.sample_user, time_taken=30, price=8
+        )
+        create_sample_recipe(user=self.sample_user, time_taken=60, price=20)
+
+        res = self.client.get(RECIPE_URL, {
+            'time_taken_min': 10,
+            'time_taken_max': 45,
+            'price_max': '10.50',
+        })
+
+        self.assertEqual([item['id'] for item in res.data], [recipe.id])
+
+    def test_filter_recipes_invalid_ids(self):
+        """Test that malformed filter values are rejected"""
+        res = self.client.get(RECIPE_URL, {'tags': 'vegan'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_recipe_validates_ids_in_one_query(self):
+        """Test that all submitted ingredient ids are looked up together"""
+        ingredients = [
+            create_sample_ingredient(user=self.sample_user, name='item %d' % i)
+            for i in range(40)
+        ]
+        payload = {
+            'title': 'Big salad',
+            'time_taken': 15,
+            'price': 8,
+            'ingredient': [ingredient.id for ingredient in ingredients],
+            'tag': [],
+        }
+        request = APIRequestFactory().post(RECIPE_URL)
+        request.user = self.sample_user
+        serializer = RecipeSerializer(data=payload, context={'request': request})
+
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+        self.assertEqual(len(serializer.validated_data['ingredient']), 40)
+
+    def test_create_recipe_reports_missing_ids(self):
+        """Test that unknown and other users' ids are rejected together"""
+        user2 = get_user_model().objects.create_user(
+            "test@123.com",
+            "password@123"
+        )
+        own_tag = create_sample_tag(user=self.sample_user)
+        other_tag = create_sample_tag(user=user2)
+        payload = {
+            'title': 'Cheescake',
+            'tag': [own_tag.id, other_tag.id, 9999],
+            'time_taken': 35,
+            'price': 5
+        }
+
+        res = self.client.post(RECIPE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(other_tag.id), res.data['tag'][0])
+        self.assertIn('9999', res.data['tag'][0])
+        self.assertFalse(Recipe.objects.exists())
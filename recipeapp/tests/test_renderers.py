@@ -0,0 +1,140 @@
+import json
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from coreapp.models import Recipe, Tag
+from recipeapp import renderers
+
+RECIPE_URL = reverse('recipeapp:recipe-list')
+
+DATA = {
+    'results': [{
+        'id': 1,
+        'title': 'Ema datshi\u2028épicé',
+        'price': '5.50',
+        'tags': [1, 2],
+        'link': None,
+        'ratio': 0.1,
+    }],
+    'next': None,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Test the fast JSON renderer matches DRF's output"""
+
+    def test_same_bytes_as_drf(self):
+        """Test the output is byte for byte DRF's"""
+        self.assertEqual(renderers.FastJSONRenderer().render(DATA),
+                         JSONRenderer().render(DATA))
+
+    def test_without_orjson(self):
+        """Test DRF's encoder is used when orjson is missing"""
+        with mock.patch('recipeapp.renderers.orjson', None):
+            self.assertEqual(renderers.FastJSONRenderer().render(DATA),
+                             JSONRenderer().render(DATA))
+
+    def test_decimal_as_string(self):
+        """Test Decimals keep their digits"""
+        content = renderers.FastJSONRenderer().render(
+            {'price': Decimal('0.10')}
+        )
+
+        self.assertEqual(content, b'{"price":"0.10"}')
+
+    def test_indent(self):
+        """Test an indent asked for in the media type is honoured"""
+        content = renderers.FastJSONRenderer().render(
+            DATA, 'application/json; indent=2'
+        )
+
+        self.assertIn(b'\n  ', content)
+
+
+class ContentNegotiationTests(TestCase):
+    """Test the formats offered by the recipe API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@recipeapp.com', 'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(custom_user=self.user, name='Vegan')
+        recipe = Recipe.objects.create(
+            custom_user=self.user, title='Soup', time_taken=10,
+            price=Decimal('5.50'),
+        )
+        recipe.tag.add(self.tag)
+
+    def get(self, accept):
+        """Return the recipe list rendered in the accepted format"""
+        res = self.client.get(RECIPE_URL, HTTP_ACCEPT=accept)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], accept)
+        return res
+
+    def test_json_default(self):
+        """Test JSON is rendered when the client accepts anything"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(res.content.decode())[0]['price'],
+                         '5.50')
+
+    @skipUnless(renderers.msgpack, 'msgpack is not installed')
+    def test_msgpack(self):
+        """Test MessagePack is rendered and parsed"""
+        res = self.get('application/msgpack')
+        expected = json.loads(self.client.get(RECIPE_URL).content.decode())
+
+        self.assertEqual(renderers.msgpack.unpackb(res.content), expected)
+        self.assertIn('Accept', res['Vary'])
+
+        res = self.client.post(
+            RECIPE_URL,
+            renderers.msgpack.packb({
+                'title': 'Stew', 'time_taken': 5, 'price': '2.00',
+                'tag': [self.tag.id], 'ingredient': [],
+            }),
+            content_type='application/msgpack',
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    @skipUnless(renderers.msgpack, 'msgpack is not installed')
+    @override_settings(RECIPE_CACHE_ENABLED=True)
+    def test_cached_per_format(self):
+        """Test a cached JSON response does not answer MessagePack requests"""
+        json_etag = self.client.get(RECIPE_URL)['ETag']
+
+        res = self.client.get(RECIPE_URL, HTTP_ACCEPT='application/msgpack',
+                              HTTP_IF_NONE_MATCH=json_etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertNotEqual(res['ETag'], json_etag)
+
+        res = self.client.get(RECIPE_URL, HTTP_ACCEPT='application/msgpack',
+                              HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['X-Cache'], 'HIT')
+
+    @skipUnless(renderers.cbor2, 'cbor2 is not installed')
+    def test_cbor(self):
+        """Test CBOR is rendered and parsed"""
+        res = self.get('application/cbor')
+        expected = json.loads(self.client.get(RECIPE_URL).content.decode())
+
+        self.assertEqual(renderers.cbor2.loads(res.content), expected)
+
+        res = self.client.post(RECIPE_URL, b'\xff',
+                               content_type='application/cbor')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
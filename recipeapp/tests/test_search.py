@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient
+from coreapp.models import Recipe
+from coreapp.models import Tag
+from recipeapp.search import InvertedIndex
+
+RECIPE_URL = reverse("recipeapp:recipe-list")
+
+
+def create_sample_recipe(user, **params):
+    defaults = {
+        'title': 'Steak and eggs',
+        'time_taken': 20,
+        'price': 10.00
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(custom_user=user, **defaults)
+
+
+class InvertedIndexTests(TestCase):
+    """Test the in-memory search fallback"""
+
+    def test_weighted_ranking(self):
+        """Test that title matches outrank related name matches"""
+        index = InvertedIndex()
+        index.add(1, 'Chips', 1.0)
+        index.add(1, 'Curry powder', 0.4)
+        index.add(2, 'Green curry', 1.0)
+
+        self.assertEqual(index.search('curry'), [2, 1])
+
+    def test_close_matches(self):
+        """Test that misspelled words match the closest indexed word"""
+        index = InvertedIndex()
+        index.add(1, 'Lasagne', 1.0)
+
+        self.assertEqual(index.search('lasagna'), [1])
+        self.assertEqual(index.search('pancakes'), [])
+
+
+class RecipeSearchApiTests(TestCase):
+    """Test the ?search= mode of the recipe list"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "sample@123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, text):
+        """Return the ids of the recipes found for text"""
+        res = self.client.get(RECIPE_URL, {'search': text})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in res.data]
+
+    def test_search_ranks_title_over_relations(self):
+        """Test that recipes matching on title come first"""
+        by_ingredient = create_sample_recipe(user=self.user, title='Chips')
+        by_ingredient.ingredient.add(
+            Ingredient.objects.create(custom_user=self.user, name='Curry')
+        )
+        by_title = create_sample_recipe(user=self.user, title='Curry')
+        create_sample_recipe(user=self.user, title='Pancakes')
+
+        self.assertEqual(self.search('curry'), [by_title.id, by_ingredient.id])
+
+    def test_search_matches_tags(self):
+        """Test that tag names are searched"""
+        recipe = create_sample_recipe(user=self.user, title='Tofu bowl')
+        recipe.tag.add(Tag.objects.create(custom_user=self.user, name='Vegan'))
+        create_sample_recipe(user=self.user, title='Steak')
+
+        self.assertEqual(self.search('vegan'), [recipe.id])
+
+    def test_search_tolerates_typos(self):
+        """Test that a misspelled query still finds the recipe"""
+        recipe = create_sample_recipe(user=self.user, title='Lasagne')
+
+        self.assertEqual(self.search('lasagna'), [recipe.id])
+
+    def test_search_limited_to_user(self):
+        """Test that other users' recipes are not searched"""
+        other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "sample@123"
+        )
+        create_sample_recipe(user=other_user, title='Curry')
+
+        self.assertEqual(self.search('curry'), [])
@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient, Recipe
+
+SHOPPING_LIST_URL = reverse('recipeapp:recipe-shopping-list')
+
+
+class ShoppingListTests(TestCase):
+    """Test the shopping list of a set of recipes"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@recipeapp.com', 'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.salt, self.basil, self.rice = [
+            Ingredient.objects.create(custom_user=self.user, name=name)
+            for name in ('salt', 'basil', 'rice')
+        ]
+
+    def create_recipe(self, price, time_taken, *ingredients, user=None):
+        """Create a recipe using the ingredients"""
+        recipe = Recipe.objects.create(
+            custom_user=user or self.user, title='Recipe', price=price,
+            time_taken=time_taken,
+        )
+        recipe.ingredient.add(*ingredients)
+        return recipe
+
+    def test_shopping_list(self):
+        """Test ingredients are merged and counted with the totals"""
+        ids = [
+            self.create_recipe(Decimal('5.50'), 10, self.salt, self.basil).id,
+            self.create_recipe(Decimal('2.25'), 30, self.salt).id,
+            self.create_recipe(Decimal('1.00'), 5).id,
+        ]
+        self.create_recipe(Decimal('9.00'), 60, self.rice)
+
+        with self.assertNumQueries(2):
+            res = self.client.post(SHOPPING_LIST_URL, {'ids': ids},
+                                   format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['recipes'], 3)
+        self.assertEqual(res.data['price'], '8.75')
+        self.assertEqual(res.data['time_taken'], 45)
+        self.assertEqual(res.data['ingredients'], [
+            {'id': self.basil.id, 'name': 'basil', 'count': 1},
+            {'id': self.salt.id, 'name': 'salt', 'count': 2},
+        ])
+
+    def test_other_users_recipes_left_out(self):
+        """Test ids of other users' recipes are ignored"""
+        other = get_user_model().objects.create_user(
+            'other@recipeapp.com', 'password123'
+        )
+        hidden = self.create_recipe(Decimal('3.00'), 5, self.rice, user=other)
+
+        res = self.client.get(SHOPPING_LIST_URL, {'ids': str(hidden.id)})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['recipes'], 0)
+        self.assertEqual(res.data['price'], '0.00')
+        self.assertEqual(res.data['ingredients'], [])
+
+    def test_large_totals(self):
+        """Test totals beyond the digits of one recipe's price"""
+        ids = [self.create_recipe(Decimal('999.99'), 120, self.salt).id
+               for _ in range(11)]
+
+        res = self.client.get(SHOPPING_LIST_URL,
+                              {'ids': ','.join(map(str, ids))})
+
+        self.assertEqual(res.data['price'], '10999.89')
+        self.assertEqual(res.data['ingredients'][0]['count'], 11)
+
+    def test_too_many_ids(self):
+        """Test the number of recipes is capped"""
+        res = self.client.post(SHOPPING_LIST_URL,
+                               {'ids': list(range(1, 1002))}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
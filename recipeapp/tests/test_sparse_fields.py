@@ -0,0 +1,122 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient, Recipe, Tag
+
+RECIPE_URL = reverse('recipeapp:recipe-list')
+
+
+def get_detail_url(recipe_id):
+    """Return the recipe detail URL"""
+    return reverse('recipeapp:recipe-detail', args=[recipe_id])
+
+
+@override_settings(RECIPE_CACHE_ENABLED=False)
+class SparseFieldsTests(TestCase):
+    """Test ?fields= and ?expand= on the recipe endpoints"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@recipeapp.com', 'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(custom_user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(
+            custom_user=self.user, name='Salt'
+        )
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                custom_user=self.user, title='Recipe %d' % i, time_taken=5,
+                price=Decimal('2.50'),
+            )
+            recipe.tag.add(self.tag)
+            recipe.ingredient.add(self.ingredient)
+        self.recipe = recipe
+
+    def get_both(self, url):
+        """Return the responses with and without the fast read path"""
+        responses = []
+        for enabled in (False, True):
+            with self.settings(RECIPE_FAST_READS=enabled):
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            responses.append(res)
+
+        self.assertEqual(responses[0].content, responses[1].content)
+        return responses
+
+    def test_fields(self):
+        """Test only the requested fields are loaded and returned"""
+        for enabled in (False, True):
+            with self.subTest(fast=enabled), \
+                    self.settings(RECIPE_FAST_READS=enabled), \
+                    self.assertNumQueries(2) as ctx:
+                res = self.client.get(RECIPE_URL + '?fields=title,id')
+
+            self.assertEqual(list(res.data[0]), ['id', 'title'])
+            self.assertNotIn('"price"', ctx.captured_queries[1]['sql'])
+
+    def test_expand(self):
+        """Test expanded relations are nested without a query per recipe"""
+        url = RECIPE_URL + '?expand=tag&fields=id'
+        # The ETag, the rows and the tags, for each path
+        with self.assertNumQueries(6):
+            slow, fast = self.get_both(url)
+
+        self.assertEqual(fast.data[0], {
+            'id': self.recipe.id,
+            'tag': [{'id': self.tag.id, 'name': 'Vegan'}],
+        })
+
+    def test_expand_with_all_fields(self):
+        """Test other relations keep their ids when one is expanded"""
+        slow, fast = self.get_both(RECIPE_URL + '?expand=ingredient')
+
+        self.assertEqual(fast.data[0]['tag'], [self.tag.id])
+        self.assertEqual(fast.data[0]['ingredient'],
+                         [{'id': self.ingredient.id, 'name': 'Salt'}])
+
+    def test_detail_fields(self):
+        """Test fields apply to the detail endpoint"""
+        slow, fast = self.get_both(
+            get_detail_url(self.recipe.id) + '?fields=price'
+        )
+
+        self.assertEqual(fast.data, {'price': '2.50'})
+
+    def test_pages(self):
+        """Test pagination works when the ordering column is left out"""
+        res = self.client.get(RECIPE_URL + '?fields=title&page_size=2')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'title': 'Recipe 2'}, {'title': 'Recipe 1'}
+        ])
+        self.assertIsNotNone(res.data['next'])
+
+    def test_unknown_names_rejected(self):
+        """Test unknown fields and relations are rejected"""
+        for query, param in (('?fields=id,secret', 'fields'),
+                             ('?expand=title', 'expand')):
+            with self.subTest(query=query):
+                res = self.client.get(RECIPE_URL + query)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(param, res.data)
+
+    def test_writes_ignore_fields(self):
+        """Test create responses are not trimmed"""
+        res = self.client.post(RECIPE_URL + '?fields=id', {
+            'title': 'Stew', 'time_taken': 5, 'price': '2.00',
+            'tag': [self.tag.id], 'ingredient': [],
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn('title', res.data)
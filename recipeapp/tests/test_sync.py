@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import Ingredient
+from coreapp.models import Recipe
+from coreapp.models import Tag
+from coreapp.models import Tombstone
+
+SYNC_URL = reverse("recipeapp:sync-list")
+RECIPE_URL = reverse("recipeapp:recipe-list")
+
+
+class SyncApiTests(TestCase):
+    """Test the delta sync endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@recipeapp.com",
+            "password123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = Tag.objects.create(custom_user=self.user, name='Vegan')
+        self.recipe = Recipe.objects.create(
+            custom_user=self.user, title='Soup', time_taken=10, price=5
+        )
+
+    def sync(self, since=None):
+        """Return the data of a sync request"""
+        params = {} if since is None else {'since': since}
+        res = self.client.get(SYNC_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_login_required(self):
+        """Test that authentication is required"""
+        res = APIClient().get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_full_sync_without_token(self):
+        """Test a first sync returns everything"""
+        data = self.sync()
+
+        self.assertEqual([r['title'] for r in data['recipes']], ['Soup'])
+        self.assertEqual([t['name'] for t in data['tags']], ['Vegan'])
+        self.assertEqual(data['ingredients'], [])
+        self.assertFalse(data['more'])
+
+    def test_sync_returns_only_changes(self):
+        """Test a sync with a token returns what changed since"""
+        token = self.sync()['token']
+        Ingredient.objects.create(custom_user=self.user, name='Salt')
+        self.recipe.title = 'Stew'
+        self.recipe.save()
+
+        data = self.sync(token)
+
+        self.assertEqual([r['title'] for r in data['recipes']], ['Stew'])
+        self.assertEqual(data['tags'], [])
+        self.assertEqual([i['name'] for i in data['ingredients']], ['Salt'])
+        self.assertEqual(self.sync(data['token'])['recipes'], [])
+
+    def test_sync_reports_deletions(self):
+        """Test deleted objects are listed by id"""
+        self.recipe.tag.add(self.tag)
+        token = self.sync()['token']
+        tag_id = self.tag.id
+
+        self.tag.delete()
+
+        data = self.sync(token)
+        self.assertEqual(data['deleted']['tags'], [tag_id])
+        # The recipe lost the tag, so it is resent
+        self.assertEqual([r['id'] for r in data['recipes']], [self.recipe.id])
+
+    def test_relation_change_is_synced(self):
+        """Test linking a tag resends the recipe"""
+        token = self.sync()['token']
+
+        self.recipe.tag.add(self.tag)
+
+        data = self.sync(token)
+        self.assertEqual(data['recipes'][0]['tag'], [self.tag.id])
+
+    def test_bulk_writes_are_synced(self):
+        """Test bulk created and bulk deleted recipes are synced"""
+        token = self.sync()['token']
+
+        self.client.post(RECIPE_URL, [
+            {'title': title, 'time_taken': 10, 'price': '5.00',
+             'tag': [self.tag.id], 'ingredient': []}
+            for title in ('Stew', 'Cake')
+        ], format='json')
+        self.client.post(reverse("recipeapp:recipe-bulk-delete"),
+                         {'ids': [self.recipe.id]}, format='json')
+
+        data = self.sync(token)
+        self.assertEqual([r['title'] for r in data['recipes']],
+                         ['Stew', 'Cake'])
+        self.assertEqual(data['deleted']['recipes'], [self.recipe.id])
+
+    @override_settings(RECIPE_SYNC_LIMIT=2)
+    def test_sync_in_batches(self):
+        """Test a client behind by more than the limit catches up in steps"""
+        token = self.sync()['token']
+        for i in range(5):
+            Tag.objects.create(custom_user=self.user, name='Tag %d' % i)
+
+        names = []
+        data = {'more': True, 'token': token}
+        while data['more']:
+            data = self.sync(data['token'])
+            names += [tag['name'] for tag in data['tags']]
+
+        self.assertEqual(names, ['Tag %d' % i for i in range(5)])
+
+    def test_sync_limited_to_user(self):
+        """Test other users' changes are not synced"""
+        token = self.sync()['token']
+        other = get_user_model().objects.create_user(
+            "other@recipeapp.com",
+            "password123"
+        )
+        Tag.objects.create(custom_user=other, name='Dessert')
+
+        self.assertEqual(self.sync(token)['tags'], [])
+
+    def test_invalid_token(self):
+        """Test malformed or future tokens are rejected"""
+        for since in ('abc', '-1', '1000000'):
+            with self.subTest(since=since):
+                res = self.client.get(SYNC_URL, {'since': since})
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deleting_user_removes_sync_state(self):
+        """Test deleting a user leaves no tombstones behind"""
+        self.user.delete()
+
+        self.assertFalse(Tombstone.objects.exists())
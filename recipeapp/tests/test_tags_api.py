@@ -6,6 +6,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from coreapp.models import Tag
+from coreapp.models import Recipe
 from recipeapp.serializers import TagSerializer
 
 
@@ -94,3 +95,19 @@ class PrivateTagsApiTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_retrieve_tags_assigned_to_recipes(self):
+        """Test filtering tags by those assigned to recipes"""
+        tag1 = Tag.objects.create(custom_user=self.user, name="breakfast")
+        tag2 = Tag.objects.create(custom_user=self.user, name="lunch")
+        recipe = Recipe.objects.create(
+            custom_user=self.user,
+            title="Eggs on toast",
+            time_taken=10,
+            price=5
+        )
+        recipe.tag.add(tag1)
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        self.assertEqual(res.data, TagSerializer([tag1], many=True).data)
+        self.assertNotIn(TagSerializer(tag2).data, res.data)
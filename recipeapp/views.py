@@ -1,25 +1,497 @@
-from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+import hashlib
+from collections import OrderedDict
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.translation import gettext_lazy as _
+from rest_framework import generics, viewsets, mixins, status, \
+    serializers as drf_serializers
+from rest_framework.decorators import action
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework.response import Response
+
+from coreapp import routers
 from coreapp.models import Tag
 from coreapp.models import Ingredient
 from coreapp.models import Recipe
+from recipeapp import bulk
+from recipeapp import cache
+from recipeapp import fastpath
+from recipeapp import importer
+from recipeapp import parsers
+from recipeapp import renderers
 from recipeapp import serializers
+from recipeapp import shopping
+from recipeapp import sync
+from recipeapp.export import EXPORT_FORMATS
+from recipeapp.filters import AssignedOnlyFilterBackend, RecipeFilterBackend, \
+    RecipeSearchFilterBackend, parse_ids, parse_names
+from recipeapp.pagination import KeysetPagination, NameKeysetPagination, \
+    RecipeKeysetPagination
+from userapp.authentication import CachedTokenAuthentication
+
+
+def shape_queryset(queryset, serializer):
+    """Limit the queryset to the columns and relations a serializer reads"""
+    model = queryset.model
+    columns = ['id']
+    prefetches = []
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        name = field.source.split('.')[0]
+
+        if isinstance(field, drf_serializers.ManyRelatedField):
+            # Primary keys only, no need to load the related rows
+            related = model._meta.get_field(name).related_model
+            prefetches.append(Prefetch(
+                name,
+                queryset=related.objects.only('id').order_by('id')
+            ))
+        elif isinstance(field, drf_serializers.ListSerializer):
+            related = model._meta.get_field(name).related_model
+            prefetches.append(Prefetch(
+                name,
+                queryset=shape_queryset(
+                    related.objects.order_by('id'), field.child
+                )
+            ))
+        elif name not in columns:
+            columns.append(name)
+
+    return queryset.only(*columns).prefetch_related(*prefetches)
+
+
+class QueryShapingMixin:
+    """Shape querysets of read actions from the serializer in use"""
+
+    shaped_actions = ('list', 'retrieve')
+
+    def shape_queryset(self, queryset):
+        """Return the queryset trimmed for the current action"""
+        if self.action not in self.shaped_actions:
+            return queryset
+
+        return shape_queryset(queryset, self.get_serializer())
+
+
+class FastReadMixin:
+    """Serve read actions from values() rows instead of the serializer
+
+    Used when the serializer only reads columns, lists of primary keys and
+    nested objects, see recipeapp.fastpath, otherwise the actions fall back
+    to the serializer. The querysets are limited to the user's objects, so
+    no object permissions are checked on retrieve.
+    """
+
+    fast_actions = ('list', 'retrieve')
+
+    def get_fast_reader(self):
+        """Return the FastReader of the current action, if any"""
+        if not fastpath.is_enabled() or self.action not in self.fast_actions:
+            return None
+
+        return fastpath.get_reader(
+            self.queryset.model, self.get_serializer_class(),
+            tuple(sorted(self.get_serializer_kwargs().items()))
+        )
+
+    def get_serializer_kwargs(self):
+        """Return extra keyword arguments for the serializer of the action"""
+        return {}
+
+    def shape_queryset(self, queryset):
+        """The values() query reads its own columns"""
+        if self.get_fast_reader() is not None:
+            return queryset
+
+        return super().shape_queryset(queryset)
+
+    def get_read_data(self, queryset):
+        """Return the serialized objects of a queryset"""
+        reader = self.get_fast_reader()
+        if reader is None:
+            return self.get_serializer(queryset, many=True).data
+
+        return reader.represent(reader.values(queryset), queryset.db)
+
+    def get_ordering_columns(self):
+        """Return the columns the keyset paginator reads from each row"""
+        if isinstance(self.paginator, KeysetPagination):
+            return self.paginator.get_fields()
+
+        return []
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_fast_reader()
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = reader.values(queryset, *self.get_ordering_columns())
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                reader.represent(page, queryset.db)
+            )
+
+        return Response(reader.represent(rows, queryset.db))
+
+    def retrieve(self, request, *args, **kwargs):
+        reader = self.get_fast_reader()
+        if reader is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = generics.get_object_or_404(
+            reader.values(queryset),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+        return Response(reader.represent([row], queryset.db)[0])
+
+
+class SparseFieldsMixin:
+    """Let clients pick the fields of read responses
+
+    ``?fields=id,title`` keeps only the named fields and
+    ``?expand=tag,ingredient`` nests the named relations, see
+    serializers.SparseFieldsMixin. The queryset is shaped from the trimmed
+    serializer, so columns and relations left out are never loaded.
+    """
+
+    sparse_actions = ('list', 'retrieve')
+
+    def get_serializer_kwargs(self):
+        """Return the fields and relations to expand asked for"""
+        if self.action not in self.sparse_actions:
+            return super().get_serializer_kwargs()
+
+        serializer_class = self.get_serializer_class()
+        params = self.request.query_params
+        kwargs = {}
+        for param, allowed in (
+            ('fields', serializer_class.Meta.fields),
+            ('expand', serializer_class.expandable_fields),
+        ):
+            names = parse_names(params, param)
+            if not names:
+                continue
+
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                raise ValidationError({param: [
+                    _('Unknown fields: %s') % ', '.join(unknown)
+                ]})
+            kwargs[param] = tuple(name for name in allowed if name in names)
+
+        return kwargs
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.get_serializer_kwargs())
+        return super().get_serializer(*args, **kwargs)
+
+
+class ReplicaReadMixin:
+    """Serve safe requests from a read replica
+
+    Users who wrote recently are pinned to the primary, so they read their
+    own writes. Authentication runs before replica reads start, which keeps
+    a freshly issued token from being looked up on a lagging replica.
+    Actions in ``read_actions`` only read even when POSTed to.
+    """
+
+    read_actions = ()
+
+    def is_read(self, request):
+        """Return True when the request does not write"""
+        return request.method in SAFE_METHODS or \
+            getattr(self, 'action', None) in self.read_actions
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            routers.end_replica_reads()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.is_read(request) and routers.get_replicas() and \
+                not routers.is_pinned(request.user.pk):
+            routers.start_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if not self.is_read(request) and \
+                response.status_code < 400 and request.user.is_authenticated:
+            routers.pin(request.user.pk)
+
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def get_not_modified_response(request, validators):
+    """Return a 304 response if the client's copy matches the validators"""
+    last_modified = validators.get('Last-Modified')
+    response = get_conditional_response(
+        request,
+        etag=validators.get('ETag'),
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+    )
+    if response is not None:
+        for header, value in validators.items():
+            response[header] = value
+
+    return response
+
+
+class ConditionalGetMixin:
+    """Answer conditional GETs with 304 before serializing anything
+
+    List ETags come from the user's change counter, which every write to
+    their recipes, tags and ingredients moves, so validating a list reads
+    one row however many rows the filters match. Detail responses get a
+    weak ETag and Last-Modified from the object's modification time.
+    Lists get no Last-Modified because deleting a row does not move the
+    latest modification time.
+    """
+
+    conditional_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        """List objects unless the client's copy is current"""
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve an object unless the client's copy is current"""
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_etag(self, version):
+        """Return a weak ETag of the action's output at a version"""
+        tag = '%s:%s:%s' % (
+            self.action, self.request.accepted_renderer.format, version
+        )
+        return 'W/"%s"' % hashlib.md5(tag.encode('utf-8')).hexdigest()
+
+    def get_validators(self):
+        """Return the ETag and Last-Modified headers of the resource"""
+        if self.action == 'list':
+            seq = sync.get_current_seq(self.request.user.pk,
+                                       self.get_queryset().db)
+            return {'ETag': self.get_etag(seq)}
 
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            # Malformed lookups are left to retrieve, which 404s
+            return {}
 
-class BaseRecipeAttrViewSet(viewsets.GenericViewSet,
+        last_modified = queryset.values_list('modified_on', flat=True) \
+            .first()
+        if last_modified is None:
+            return {}
+
+        return {
+            'ETag': self.get_etag(last_modified.isoformat()),
+            'Last-Modified': http_date(last_modified.timestamp()),
+        }
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        """Return a 304 response, or the handler's response with validators"""
+        if self.action not in self.conditional_actions:
+            return handler(request, *args, **kwargs)
+
+        validators = self.get_validators()
+        response = get_not_modified_response(request, validators)
+        if response is not None:
+            return response
+
+        response = handler(request, *args, **kwargs)
+        for header, value in validators.items():
+            response[header] = value
+        return response
+
+
+class CachedResponseMixin:
+    """Serve read actions from a per-user response cache
+
+    Cached responses are keyed by the user's generation, which the signal
+    handlers and bulk writes bump whenever the user's data changes. The
+    validators are cached along with the data, so conditional requests
+    hitting the cache are answered without a query.
+    """
+
+    validator_headers = ('ETag', 'Last-Modified')
+
+    cached_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        """List objects, from the cache when possible"""
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve an object, from the cache when possible"""
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        """Return the cached response data, or run handler and cache it"""
+        if not cache.is_enabled() or self.action not in self.cached_actions:
+            return handler(request, *args, **kwargs)
+
+        # Read the generation first, a write that lands while the response
+        # is built moves the user on and the entry is never read
+        user_id = request.user.pk
+        key = cache.get_response_key(
+            user_id, cache.get_generation(user_id),
+            request.build_absolute_uri(), request.accepted_renderer.format
+        )
+        entry = cache.get_cache().get(key)
+        if entry is not None:
+            cache.record(hit=True)
+            data, validators = entry
+            response = get_not_modified_response(request, validators)
+            if response is None:
+                response = Response(data)
+                for header, value in validators.items():
+                    response[header] = value
+            response['X-Cache'] = 'HIT'
+            return response
+
+        cache.record(hit=False)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            validators = {header: response[header]
+                          for header in self.validator_headers
+                          if header in response}
+            cache.get_cache().set(
+                key, (response.data, validators), cache.get_timeout()
+            )
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class BulkMixin:
+    """Write many objects per request with batched queries
+
+    POSTing a list to the list endpoint creates every item, PATCHing a
+    list of objects with ids to ``bulk/`` updates them and POSTing
+    ``{"ids": [...]}`` to ``bulk-delete/`` deletes them. Invalid payloads
+    are rejected as a whole with the errors listed per item.
+    """
+
+    def create(self, request, *args, **kwargs):
+        """Create one object, or every object of a list payload"""
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objs = serializer.save(custom_user=self.request.user)
+
+        return Response(self.get_bulk_data(objs), status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch'], url_path='bulk',
+            url_name='bulk-update')
+    def bulk_update(self, request):
+        """Update the objects of a list payload by id"""
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError(_('Expected a list of objects'))
+
+        ids = [item.get('id') if isinstance(item, dict) else None
+               for item in items]
+        instances = self.get_queryset().in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+        errors = []
+        seen = set()
+        for pk in ids:
+            if not isinstance(pk, int) or pk not in instances:
+                errors.append({'id': [_('Not found.')]})
+            elif pk in seen:
+                errors.append({'id': [_('Duplicate id.')]})
+            else:
+                errors.append({})
+                seen.add(pk)
+        if any(errors):
+            raise ValidationError(errors)
+
+        serializer = self.get_serializer(
+            [instances[pk] for pk in ids], data=items, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objs = serializer.save()
+
+        return Response(self.get_bulk_data(objs))
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete',
+            url_name='bulk-delete')
+    def bulk_delete(self, request):
+        """Delete the objects listed in ids with a single DELETE"""
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or \
+                not all(isinstance(pk, int) for pk in ids):
+            raise ValidationError({'ids': [_('Expected a list of ids')]})
+
+        deleted = bulk.bulk_delete(self.get_queryset().filter(pk__in=ids))
+
+        return Response({'deleted': deleted})
+
+    def get_bulk_data(self, objs):
+        """Serialize written objects, reloading them in one shaped query"""
+        serializer = self.get_serializer()
+        loaded = shape_queryset(
+            self.get_queryset().model.objects.filter(
+                pk__in=[obj.pk for obj in objs]
+            ),
+            serializer
+        ).in_bulk()
+
+        return self.get_serializer(
+            [loaded[obj.pk] for obj in objs], many=True
+        ).data
+
+
+class BaseRecipeAttrViewSet(ReplicaReadMixin,
+                            CachedResponseMixin,
+                            ConditionalGetMixin,
+                            FastReadMixin,
+                            BulkMixin,
+                            QueryShapingMixin,
+                            viewsets.GenericViewSet,
                             mixins.ListModelMixin,
                             mixins.CreateModelMixin,
                             mixins.RetrieveModelMixin,
                             mixins.UpdateModelMixin,
                             mixins.DestroyModelMixin):
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    renderer_classes = renderers.get_renderer_classes()
+    parser_classes = parsers.get_parser_classes()
+    pagination_class = NameKeysetPagination
+    filter_backends = (AssignedOnlyFilterBackend,)
 
     def get_queryset(self):
         """Return queryset data for an object"""
-        return self.queryset.filter(custom_user=self.request.user).order_by('-name')
+        queryset = self.queryset.filter(custom_user=self.request.user)
+        return self.shape_queryset(queryset.order_by('-name', 'id'))
 
     def perform_create(self, serializer):
         """Save current user as part of the object"""
@@ -31,6 +503,7 @@ class TagViewSet(BaseRecipeAttrViewSet):
 
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    recipe_field = 'tag'
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
@@ -38,15 +511,32 @@ class IngredientViewSet(BaseRecipeAttrViewSet):
 
     queryset = Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
+    recipe_field = 'ingredient'
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ReplicaReadMixin, CachedResponseMixin, ConditionalGetMixin,
+                    SparseFieldsMixin, FastReadMixin, BulkMixin,
+                    QueryShapingMixin, viewsets.ModelViewSet):
     """Manage recipes endpoint"""
 
     serializer_class = serializers.RecipeSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    renderer_classes = renderers.get_renderer_classes()
+    parser_classes = parsers.get_parser_classes()
+    pagination_class = RecipeKeysetPagination
+    import_content_types = {
+        'application/x-ndjson': 'ndjson',
+        'application/jsonl': 'ndjson',
+        'text/csv': 'csv',
+    }
+    filter_backends = (RecipeFilterBackend, RecipeSearchFilterBackend)
+    shaped_actions = ('list', 'retrieve', 'batch')
+    fast_actions = ('list', 'retrieve', 'batch')
+    read_actions = ('batch', 'shopping_list')
+    batch_max_ids = 100
+    shopping_list_max_ids = 1000
 
     def perform_create(self, serializer):
         """Assign user to the recipe being created"""
@@ -54,13 +544,162 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve the recipe for the authenticated user"""
-        return self.queryset.filter(custom_user=self.request.user)
+        queryset = self.queryset.filter(custom_user=self.request.user)
+        return self.shape_queryset(queryset.order_by('-id'))
+
+    def paginate_queryset(self, queryset):
+        """Search results are ranked and capped instead of paginated"""
+        if self.request.query_params.get('search'):
+            return None
+
+        return super().paginate_queryset(queryset)
+
+    def get_validators(self):
+        """Ranked search results are not given validators"""
+        if self.request.query_params.get('search'):
+            return {}
+
+        return super().get_validators()
+
+    def get_requested_ids(self, request, max_ids):
+        """Return the unique ids of ``?ids=1,2`` or ``{"ids": [1, 2]}``"""
+        if request.method == 'GET':
+            ids = parse_ids(request.query_params, 'ids')
+        else:
+            ids = request.data.get('ids') \
+                if isinstance(request.data, dict) else None
+            if not isinstance(ids, list) or \
+                    not all(isinstance(pk, int) for pk in ids):
+                raise ValidationError({'ids': [_('Expected a list of ids')]})
+
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise ValidationError({'ids': [_('Expected a list of ids')]})
+        if len(ids) > max_ids:
+            raise ValidationError({'ids': [
+                _('At most %d ids can be given at once') % max_ids
+            ]})
+
+        return ids
+
+    @action(detail=False, methods=['get', 'post'])
+    def batch(self, request):
+        """Return the recipes of ``?ids=1,2`` or ``{"ids": [1, 2]}`` in detail
+
+        Recipes come in the order of the ids, ids of recipes the user does
+        not have are listed under ``missing``.
+        """
+        ids = self.get_requested_ids(request, self.batch_max_ids)
+        data = self.get_read_data(self.get_queryset().filter(pk__in=ids))
+        found = {item['id']: item for item in data}
+
+        return Response(OrderedDict([
+            ('results', [found[pk] for pk in ids if pk in found]),
+            ('missing', [pk for pk in ids if pk not in found]),
+        ]))
+
+    @action(detail=False, methods=['get', 'post'], url_path='shopping-list',
+            url_name='shopping-list')
+    def shopping_list(self, request):
+        """Return the ingredients of the recipes in ``ids`` with totals
+
+        Every ingredient is listed once with the number of recipes using
+        it, ids of other users' recipes are left out.
+        """
+        ids = self.get_requested_ids(request, self.shopping_list_max_ids)
+        recipes = self.get_queryset().filter(pk__in=ids)
+
+        return Response(serializers.ShoppingListSerializer(
+            shopping.get_shopping_list(recipes)
+        ).data)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the user's recipes as NDJSON or CSV (``?output=csv``)"""
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': [
+                _('Expected one of: %s') % ', '.join(sorted(EXPORT_FORMATS))
+            ]})
+
+        content_type, stream = EXPORT_FORMATS[output]
+        queryset = self.filter_queryset(self.get_queryset())
+
+        response = StreamingHttpResponse(stream(queryset), content_type=content_type)
+        response['Content-Disposition'] = \
+            'attachment; filename="recipes.%s"' % output
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import',
+            url_name='import')
+    def import_recipes(self, request):
+        """Import recipes from an NDJSON or CSV request body
+
+        The body is read line by line instead of being parsed up front, tags
+        and ingredients are given by name.
+        """
+        content_type = request.content_type.split(';')[0].strip()
+        input_format = self.import_content_types.get(content_type)
+        if input_format is None:
+            raise UnsupportedMediaType(content_type)
+
+        lines = importer.decode_lines(request.stream or [])
+        summary = importer.import_recipes(request.user, lines, input_format)
+
+        return Response(summary, status=status.HTTP_201_CREATED
+                        if summary['created'] else status.HTTP_400_BAD_REQUEST)
 
     def get_serializer_class(self):
         """Return the appropriate serializer class based on @action"""
-        if self.action == 'retrieve':
+        if self.action in ('retrieve', 'batch'):
             return serializers.RecipeDetailSerializer
 
         return self.serializer_class
 
 
+class SyncViewSet(viewsets.GenericViewSet):
+    """Changes to the user's recipes, tags and ingredients since a token
+
+    Each response covers a range of change sequence numbers and returns
+    the token of the next range, ``more`` is set while the client is
+    behind. Deleted objects are listed by id under ``deleted``.
+    """
+
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    serializer_classes = {
+        'recipes': serializers.RecipeSerializer,
+        'tags': serializers.TagSerializer,
+        'ingredients': serializers.IngredientSerializer,
+    }
+
+    def list(self, request):
+        """Return the objects written or deleted after the since token"""
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                since = -1
+            if since < 0:
+                raise ValidationError({'since': [_('Invalid token')]})
+
+        user_id = request.user.pk
+        after, upto, current = sync.get_seq_range(user_id, since)
+        if after > current:
+            raise ValidationError({'since': [
+                _('Token is ahead of the server, sync again without one')
+            ]})
+
+        data = OrderedDict([('token', str(upto)), ('more', upto < current)])
+        for key, model in sync.SYNC_MODELS:
+            serializer_class = self.serializer_classes[key]
+            queryset = sync.changed(
+                model.objects.filter(custom_user=request.user), after, upto
+            )
+            data[key] = serializer_class(
+                shape_queryset(queryset, serializer_class()), many=True
+            ).data
+        data['deleted'] = sync.get_deleted(user_id, after, upto)
+
+        return Response(data)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class UserappConfig(AppConfig):
     name = 'userapp'
+
+    def ready(self):
+        """Connect the signal handlers and register the system checks"""
+        from userapp import checks, signals  # noqa: F401
@@ -0,0 +1,186 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from coreapp.caches import is_shared
+from coreapp.models import ExpiringToken
+
+TOKEN_CACHE_KEY = 'userapp:token:%s'
+REVOKED_KEY = 'userapp:revoked:%s'
+
+
+def get_local_size():
+    """Return the number of tokens kept in the in-process cache"""
+    return getattr(settings, 'RECIPE_TOKEN_CACHE_SIZE', 1000)
+
+
+def get_local_ttl():
+    """Return the seconds a token stays in the in-process cache
+
+    By default the in-process cache is only used when the revocation
+    cache is shared by all worker processes, other workers would keep
+    accepting a revoked token they cached before.
+    """
+    ttl = getattr(settings, 'RECIPE_TOKEN_CACHE_TTL', None)
+    if ttl is None:
+        return 30 if is_shared(get_revocation_alias()) else 0
+
+    return ttl
+
+
+def get_shared_cache():
+    """Return the shared cache tier, if one is configured"""
+    alias = getattr(settings, 'RECIPE_TOKEN_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def get_revocation_alias():
+    """Return the alias of the cache holding the revocation markers"""
+    return getattr(settings, 'RECIPE_TOKEN_REVOCATION_ALIAS', 'default')
+
+
+def get_revocation_cache():
+    """Return the cache holding the revocation markers"""
+    return caches[get_revocation_alias()]
+
+
+def get_shared_ttl():
+    """Return the seconds a token stays in the shared cache"""
+    return getattr(settings, 'RECIPE_TOKEN_SHARED_CACHE_TTL', 300)
+
+
+class LRUCache:
+    """Bounded, thread-safe mapping whose entries expire after a TTL"""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, ttl):
+        """Return the value stored under key, or None once expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= ttl:
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, maxsize):
+        """Store value under key, evicting the least recently used entries"""
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        """Remove key if present"""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry"""
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+local_cache = LRUCache()
+
+
+def get_cache_key(key):
+    """Return the cache key of a token, raw tokens are never stored as keys"""
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def invalidate_tokens(keys):
+    """Drop tokens from the in-process and shared caches"""
+    cache_keys = [get_cache_key(key) for key in keys]
+    for cache_key in cache_keys:
+        local_cache.delete(cache_key)
+
+    shared = get_shared_cache()
+    if shared is not None and cache_keys:
+        shared.delete_many([TOKEN_CACHE_KEY % key for key in cache_keys])
+
+
+def mark_revoked(tokens):
+    """Reject tokens in the processes sharing the revocation cache
+
+    Other processes drop the tokens from their in-process cache within
+    RECIPE_TOKEN_CACHE_TTL seconds and then find them deleted.
+    """
+    revocations = get_revocation_cache()
+    now = timezone.now()
+    for token in tokens:
+        timeout = (token.expires - now).total_seconds()
+        if timeout > 0:
+            revocations.set(
+                REVOKED_KEY % get_cache_key(token.key), True, int(timeout) + 1
+            )
+
+
+def is_revoked(cache_key):
+    """Return whether the token has a revocation marker"""
+    return get_revocation_cache().get(REVOKED_KEY % cache_key) is not None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Expiring token authentication that skips the query for known tokens
+
+    Authenticated tokens are kept in a bounded in-process LRU cache and,
+    when RECIPE_TOKEN_CACHE_ALIAS names a cache, in that shared cache.
+    Deleting a token or saving its user drops it from the shared tier
+    and the in-process cache of the process doing it. Revoked tokens
+    also get a marker in the revocation cache, checked with a single key
+    lookup, so they are rejected everywhere at once. The in-process
+    cache is therefore only used when RECIPE_TOKEN_REVOCATION_ALIAS
+    names a cache shared by all workers, see get_local_ttl. Expiry is
+    checked on the token itself, cached or not.
+    """
+
+    model = ExpiringToken
+
+    def authenticate_credentials(self, key):
+        """Return the user and token for key, from the cache when possible"""
+        cache_key = get_cache_key(key)
+        if is_revoked(cache_key):
+            raise AuthenticationFailed(_('Invalid token.'))
+
+        entry = local_cache.get(cache_key, get_local_ttl())
+        if entry is None:
+            shared = get_shared_cache()
+            if shared is not None:
+                entry = shared.get(TOKEN_CACHE_KEY % cache_key)
+            if entry is None:
+                entry = super().authenticate_credentials(key)
+                if shared is not None:
+                    shared.set(
+                        TOKEN_CACHE_KEY % cache_key, entry, get_shared_ttl()
+                    )
+            if get_local_ttl() > 0:
+                local_cache.set(cache_key, entry, get_local_size())
+
+        if entry[1].is_expired:
+            invalidate_tokens([key])
+            raise AuthenticationFailed(_('Token has expired.'))
+
+        # Requests get their own copies, changes never leak into the cache
+        return copy.deepcopy(entry)
@@ -0,0 +1,89 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the thread pool running the deferred rehashes"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'RECIPE_REHASH_WORKERS', 1),
+                thread_name_prefix='rehash',
+            )
+        return _executor
+
+
+def rehash_password(user_id, raw_password, encoded, using='default'):
+    """Replace an outdated hash, unless the password changed meanwhile"""
+    get_user_model().objects.using(using) \
+        .filter(pk=user_id, password=encoded) \
+        .update(password=make_password(raw_password))
+
+
+def run_rehash(*args):
+    """Rehash in a pool thread, closing the thread's connection after"""
+    try:
+        rehash_password(*args)
+    except Exception:
+        logger.exception('Could not rehash the password of user %s', args[0])
+    finally:
+        connections.close_all()
+
+
+def schedule_rehash(user, raw_password):
+    """Upgrade the user's password hash once the login has committed"""
+    using = user._state.db or 'default'
+    args = (user.pk, raw_password, user.password, using)
+    if not getattr(settings, 'RECIPE_REHASH_DEFERRED', True):
+        rehash_password(*args)
+        return
+
+    transaction.on_commit(
+        lambda: get_executor().submit(run_rehash, *args), using=using
+    )
+
+
+class DeferredRehashModelBackend(ModelBackend):
+    """ModelBackend that upgrades outdated password hashes off the request
+
+    Django rehashes a password with the preferred hasher inside
+    check_password(), which doubles the cost of the first login after a
+    hasher change. Here the rehash runs in a background thread instead.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Run the default hasher once to reduce the timing difference
+            # between an existing and a nonexistent user
+            UserModel().set_password(password)
+            return None
+
+        is_correct = check_password(
+            password, user.password,
+            setter=lambda raw_password: schedule_rehash(user, raw_password),
+        )
+        if is_correct and self.user_can_authenticate(user):
+            return user
+
+        return None
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from coreapp.caches import is_shared
+from userapp import authentication
+
+
+@register()
+def check_token_cache(app_configs, **kwargs):
+    """Refuse an in-process token cache without shared revocations"""
+    alias = authentication.get_revocation_alias()
+    if not getattr(settings, 'RECIPE_TOKEN_CACHE_TTL', None) or \
+            is_shared(alias):
+        return []
+
+    return [Error(
+        'RECIPE_TOKEN_CACHE_TTL is set but the %r cache is local to each '
+        'process, other workers would accept a revoked token from their '
+        'in-process cache.' % alias,
+        hint='Point RECIPE_TOKEN_REVOCATION_ALIAS to a shared cache such as '
+             'memcached, or leave RECIPE_TOKEN_CACHE_TTL unset.',
+        id='userapp.E001',
+    )]
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from coreapp.models import ExpiringToken
+
+
+class Command(BaseCommand):
+    """Django command to delete expired tokens in batches"""
+    help = 'Delete expired authentication tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Tokens deleted per query')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = ExpiringToken.objects.filter(expires__lte=now)
+        deleted = 0
+
+        # Short batches keep the locks and the transactions small
+        while True:
+            keys = list(expired.values_list('key', flat=True)
+                        [:options['batch_size']])
+            if not keys:
+                break
+
+            _count, per_model = ExpiringToken.objects \
+                .filter(key__in=keys).delete()
+            deleted += per_model.get(ExpiringToken._meta.label, 0)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted %d expired tokens' % deleted
+        ))
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from coreapp.models import ExpiringToken
+from userapp.authentication import invalidate_tokens, mark_revoked
+
+
+@receiver(post_delete, sender=ExpiringToken)
+def token_deleted(sender, instance, **kwargs):
+    """Stop accepting a deleted token right away, in every process"""
+    invalidate_tokens([instance.key])
+    mark_revoked([instance])
+
+
+@receiver(post_save, sender=get_user_model())
+def user_saved(sender, instance, created, using, **kwargs):
+    """Drop cached tokens of a changed user, revoke them once inactive"""
+    if created:
+        return
+
+    tokens = list(ExpiringToken.objects.using(using).filter(user=instance))
+    invalidate_tokens([token.key for token in tokens])
+    if not instance.is_active:
+        mark_revoked(tokens)
@@ -0,0 +1,26 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Deliberately weak, logins in the tests would otherwise spend most of the
+# suite's time hashing
+FAST_PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+
+class FastHasherTestRunner(DiscoverRunner):
+    """Run the test suite with a fast password hasher
+
+    Tests of the production hashers override PASSWORD_HASHERS themselves.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.hashers = override_settings(
+            PASSWORD_HASHERS=FAST_PASSWORD_HASHERS
+        )
+        self.hashers.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.hashers.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,232 @@
+import io
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from coreapp.models import ExpiringToken
+from userapp import authentication
+from userapp.authentication import local_cache
+from userapp.checks import check_token_cache
+
+PROFILE_URL = reverse('userapp:profile')
+TOKEN_URL = reverse('userapp:token')
+TOKEN_REFRESH_URL = reverse('userapp:token-refresh')
+TOKEN_REVOKE_URL = reverse('userapp:token-revoke')
+
+
+# The tests run in a single process, which sees its own revocations
+@override_settings(RECIPE_TOKEN_CACHE_TTL=30)
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token authentication with the token cache"""
+
+    def setUp(self):
+        local_cache.clear()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='atman@druk.com',
+            password='testpass',
+            name='name'
+        )
+        self.token = ExpiringToken.objects.create_token(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_token_looked_up_once(self):
+        """Test repeated requests with a token run no token query"""
+        with self.assertNumQueries(1):
+            res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is rejected and not cached"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(local_cache), 0)
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops working right away"""
+        self.client.get(PROFILE_URL)
+
+        self.token.delete()
+
+        res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user's token stops working right away"""
+        self.client.get(PROFILE_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_not_cached_stale(self):
+        """Test updates through the API are seen by the next request"""
+        self.client.get(PROFILE_URL)
+
+        self.client.patch(PROFILE_URL, {'name': 'new name'})
+
+        self.assertEqual(self.client.get(PROFILE_URL).data['name'], 'new name')
+
+    @override_settings(RECIPE_TOKEN_CACHE_TTL=0)
+    def test_cache_disabled_with_zero_ttl(self):
+        """Test a zero TTL looks the token up on every request"""
+        self.client.get(PROFILE_URL)
+
+        with self.assertNumQueries(1):
+            self.client.get(PROFILE_URL)
+
+    @override_settings(RECIPE_TOKEN_CACHE_SIZE=2)
+    def test_cache_is_bounded(self):
+        """Test the least recently used tokens are evicted"""
+        for i in range(3):
+            user = get_user_model().objects.create_user(
+                email='user%d@druk.com' % i, password='testpass'
+            )
+            client = APIClient()
+            token = ExpiringToken.objects.create_token(user)
+            client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+            client.get(PROFILE_URL)
+
+        self.assertEqual(len(local_cache), 2)
+
+    @override_settings(RECIPE_TOKEN_CACHE_TTL=0,
+                       RECIPE_TOKEN_CACHE_ALIAS='default')
+    def test_shared_cache_tier(self):
+        """Test tokens are served from and invalidated in the shared cache"""
+        self.client.get(PROFILE_URL)
+
+        with self.assertNumQueries(0):
+            self.client.get(PROFILE_URL)
+
+        self.token.delete()
+        res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SharedRevocationTests(SimpleTestCase):
+    """Test the in-process token cache requires shared revocations"""
+
+    def test_disabled_with_local_cache(self):
+        """Test a per-process revocation cache leaves the token cache off"""
+        self.assertEqual(authentication.get_local_ttl(), 0)
+        self.assertEqual(check_token_cache(None), [])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'userapp-test'),
+    }})
+    def test_enabled_with_shared_cache(self):
+        """Test a shared revocation cache turns the token cache on"""
+        self.assertEqual(authentication.get_local_ttl(), 30)
+
+    @override_settings(RECIPE_TOKEN_CACHE_TTL=30)
+    def test_local_cache_refused(self):
+        """Test forcing the token cache on with a local backend is an error"""
+        errors = check_token_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['userapp.E001'])
+
+
+class ExpiringTokenTests(TestCase):
+    """Test issuing, refreshing, revoking and purging expiring tokens"""
+
+    def setUp(self):
+        local_cache.clear()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='atman@druk.com',
+            password='testpass',
+            name='name'
+        )
+        self.client = APIClient()
+
+    def authenticate(self, token):
+        """Send token with the following requests"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+    def test_login_returns_expiring_token(self):
+        """Test logging in issues a token with an expiry time"""
+        res = self.client.post(TOKEN_URL, {
+            'email': 'atman@druk.com', 'password': 'testpass'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        token = ExpiringToken.objects.get(key=res.data['token'])
+        self.assertEqual(token.user, self.user)
+        self.assertEqual(res.data['expires'], token.expires)
+
+    def test_expired_token_rejected(self):
+        """Test an expired token is rejected even when cached"""
+        token = ExpiringToken.objects.create_token(self.user)
+        self.authenticate(token.key)
+        self.client.get(PROFILE_URL)
+
+        later = token.expires + timedelta(seconds=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            res = self.client.get(PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_rotates_token(self):
+        """Test refreshing issues a new token and revokes the old one"""
+        token = ExpiringToken.objects.create_token(self.user)
+        self.authenticate(token.key)
+
+        res = self.client.post(TOKEN_REFRESH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['token'], token.key)
+        self.assertEqual(self.client.get(PROFILE_URL).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+        self.authenticate(res.data['token'])
+        self.assertEqual(self.client.get(PROFILE_URL).status_code,
+                         status.HTTP_200_OK)
+
+    def test_revoke_token(self):
+        """Test a revoked token is rejected without a query"""
+        token = ExpiringToken.objects.create_token(self.user)
+        self.authenticate(token.key)
+
+        res = self.client.post(TOKEN_REVOKE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ExpiringToken.objects.filter(key=token.key).exists())
+        with self.assertNumQueries(0):
+            res = self.client.get(PROFILE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_purge_expired_tokens(self):
+        """Test the purge command deletes only expired tokens"""
+        valid = ExpiringToken.objects.create_token(self.user)
+        for _ in range(5):
+            ExpiringToken.objects.create_token(
+                self.user, lifetime=timedelta(seconds=-1)
+            )
+        out = io.StringIO()
+
+        call_command('purge_expired_tokens', batch_size=2, stdout=out)
+
+        self.assertEqual(list(ExpiringToken.objects.all()), [valid])
+        self.assertIn('Deleted 5 expired tokens', out.getvalue())
@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import check_password, identify_hasher, \
+    make_password
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from userapp import backends
+from userapp.hashers import ScryptPasswordHasher
+
+SCRYPT_HASHERS = [
+    'userapp.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+
+@override_settings(PASSWORD_HASHERS=SCRYPT_HASHERS)
+class ScryptPasswordHasherTests(TestCase):
+    """Test the scrypt password hasher"""
+
+    def test_hash_and_check(self):
+        """Test a password hashed with scrypt can be verified"""
+        encoded = make_password('lètmein')
+
+        self.assertTrue(encoded.startswith('scrypt$16384$'))
+        self.assertEqual(len(encoded.split('$')), 6)
+        self.assertTrue(check_password('lètmein', encoded))
+        self.assertFalse(check_password('letmein', encoded))
+
+    def test_must_update_after_work_factor_change(self):
+        """Test hashes with another work factor are upgraded"""
+        hasher = ScryptPasswordHasher()
+        encoded = hasher.encode('letmein', hasher.salt(), 2 ** 10)
+
+        self.assertTrue(hasher.verify('letmein', encoded))
+        self.assertTrue(hasher.must_update(encoded))
+        self.assertFalse(hasher.must_update(make_password('letmein')))
+
+
+@override_settings(PASSWORD_HASHERS=SCRYPT_HASHERS)
+class DeferredRehashBackendTests(TestCase):
+    """Test logging in with outdated password hashes"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(
+            email='atman@druk.com',
+            password=make_password('testpass', hasher='md5'),
+        )
+
+    def get_algorithm(self):
+        """Return the algorithm of the user's stored hash"""
+        self.user.refresh_from_db()
+        return identify_hasher(self.user.password).algorithm
+
+    def test_rehash_is_deferred(self):
+        """Test logging in does not rehash on the request thread"""
+        user = authenticate(username='atman@druk.com', password='testpass')
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(self.get_algorithm(), 'md5')
+
+    @override_settings(RECIPE_REHASH_DEFERRED=False)
+    def test_rehash_inline(self):
+        """Test the rehash can run inline when deferring is disabled"""
+        authenticate(username='atman@druk.com', password='testpass')
+
+        self.assertEqual(self.get_algorithm(), 'scrypt')
+        self.assertTrue(self.user.check_password('testpass'))
+
+    def test_rehash_skipped_after_password_change(self):
+        """Test a late rehash does not undo a password change"""
+        encoded = self.user.password
+        self.user.set_password('newpass')
+        self.user.save()
+
+        backends.rehash_password(self.user.pk, 'testpass', encoded)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpass'))
+
+    def test_wrong_password_or_user(self):
+        """Test invalid credentials do not authenticate"""
+        self.assertIsNone(
+            authenticate(username='atman@druk.com', password='wrong')
+        )
+        self.assertIsNone(
+            authenticate(username='nobody@druk.com', password='testpass')
+        )
+
+
+@override_settings(PASSWORD_HASHERS=SCRYPT_HASHERS)
+class DeferredRehashCommitTests(TransactionTestCase):
+    """Test the rehash is handed to the pool once the login commits"""
+
+    def test_rehash_submitted_after_commit(self):
+        """Test the rehash runs in the pool, not on the request thread"""
+        user = get_user_model().objects.create(
+            email='atman@druk.com',
+            password=make_password('testpass', hasher='md5'),
+        )
+
+        with mock.patch('userapp.backends.get_executor') as get_executor:
+            authenticate(username='atman@druk.com', password='testpass')
+
+        get_executor.return_value.submit.assert_called_once_with(
+            backends.run_rehash, user.pk, 'testpass', user.password, 'default'
+        )
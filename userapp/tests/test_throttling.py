@@ -0,0 +1,174 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from userapp import throttling
+
+CREATE_USER_URL = reverse('userapp:create')
+TOKEN_URL = reverse('userapp:token')
+
+RATES = {
+    'REST_FRAMEWORK': {
+        'DEFAULT_THROTTLE_RATES': {
+            'login_ip': '5/min',
+            'login_email': '3/min',
+            'signup_ip': '2/hour',
+        },
+    },
+}
+
+
+class CountMinSketchTests(TestCase):
+    """Test the approximate counter behind the in-process store"""
+
+    def test_counts_are_never_under(self):
+        """Test estimates are at least the true counts"""
+        sketch = throttling.CountMinSketch(width=64, depth=4)
+        counts = {'key %d' % i: i % 7 for i in range(200)}
+        for key, count in counts.items():
+            for _ in range(count):
+                sketch.add(sketch.indexes(key))
+
+        for key, count in counts.items():
+            self.assertGreaterEqual(sketch.estimate(sketch.indexes(key)),
+                                    count)
+
+    def test_distinct_keys_counted_apart(self):
+        """Test a wide sketch keeps a few keys exact"""
+        sketch = throttling.CountMinSketch(width=16384, depth=4)
+        sketch.add(sketch.indexes('a'))
+        sketch.add(sketch.indexes('a'))
+
+        self.assertEqual(sketch.estimate(sketch.indexes('a')), 2)
+        self.assertEqual(sketch.estimate(sketch.indexes('b')), 0)
+
+
+@override_settings(**RATES)
+class LoginThrottleTests(TestCase):
+    """Test throttling the login and sign up endpoints"""
+
+    def setUp(self):
+        throttling.reset_stores()
+        cache.clear()
+        self.addCleanup(throttling.reset_stores)
+        get_user_model().objects.create_user(
+            email='atman@druk.com', password='testpass'
+        )
+        self.client = APIClient()
+
+    def login(self, email='atman@druk.com', ip='10.0.0.1'):
+        return self.client.post(TOKEN_URL, {
+            'email': email, 'password': 'wrong'
+        }, REMOTE_ADDR=ip)
+
+    def test_login_throttled_per_email(self):
+        """Test attempts on one email are limited across IPs"""
+        for i in range(3):
+            self.assertEqual(self.login(ip='10.0.0.%d' % i).status_code,
+                             status.HTTP_400_BAD_REQUEST)
+
+        res = self.login(ip='10.0.0.9')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+        self.assertEqual(self.login(email='other@druk.com').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_login_throttled_per_ip(self):
+        """Test attempts from one IP are limited across emails"""
+        for i in range(5):
+            self.login(email='user%d@druk.com' % i)
+
+        res = self.login(email='user9@druk.com')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login(email='user9@druk.com', ip='10.0.0.2')
+                         .status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_forwarded_for_ignored_without_proxies(self):
+        """Test a spoofed X-Forwarded-For does not reset the IP budget"""
+        for i in range(6):
+            res = self.client.post(TOKEN_URL, {
+                'email': 'user%d@druk.com' % i, 'password': 'wrong'
+            }, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.%d' % i)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_behind_proxy(self):
+        """Test the client IP is taken from X-Forwarded-For behind a proxy"""
+        rates = dict(RATES['REST_FRAMEWORK'], NUM_PROXIES=1)
+        with self.settings(REST_FRAMEWORK=rates):
+            for i in range(6):
+                res = self.client.post(TOKEN_URL, {
+                    'email': 'user%d@druk.com' % i, 'password': 'wrong'
+                }, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4')
+            self.assertEqual(res.status_code,
+                             status.HTTP_429_TOO_MANY_REQUESTS)
+
+            res = self.client.post(TOKEN_URL, {
+                'email': 'user9@druk.com', 'password': 'wrong'
+            }, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.5')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_email_normalized(self):
+        """Test changing the case of the email does not reset the limit"""
+        for email in ('atman@druk.com', 'Atman@Druk.com', ' ATMAN@druk.com'):
+            self.login(email=email)
+
+        self.assertEqual(self.login().status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_signup_throttled_per_ip(self):
+        """Test sign ups from one IP are limited"""
+        for i in range(2):
+            res = self.client.post(CREATE_USER_URL, {
+                'email': 'new%d@druk.com' % i, 'password': 'testpass',
+                'name': 'name',
+            })
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(CREATE_USER_URL, {
+            'email': 'new9@druk.com', 'password': 'testpass', 'name': 'name'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_window_slides(self):
+        """Test the previous window counts in proportion to its overlap"""
+        with mock.patch.object(throttling.SlidingWindowThrottle, 'timer',
+                               return_value=600.0):
+            for _ in range(3):
+                self.login()
+        with mock.patch.object(throttling.SlidingWindowThrottle, 'timer',
+                               return_value=660.0):
+            self.assertEqual(self.login().status_code,
+                             status.HTTP_429_TOO_MANY_REQUESTS)
+        with mock.patch.object(throttling.SlidingWindowThrottle, 'timer',
+                               return_value=690.0):
+            self.assertEqual(self.login().status_code,
+                             status.HTTP_400_BAD_REQUEST)
+
+    def test_no_queries_when_throttled(self):
+        """Test a throttled request never reaches the database"""
+        for _ in range(3):
+            self.login()
+
+        with self.assertNumQueries(0):
+            self.login()
+
+    @override_settings(RECIPE_THROTTLE_CACHE_ALIAS='default')
+    def test_shared_cache_store(self):
+        """Test the counts can be kept in a shared cache"""
+        for _ in range(3):
+            self.login()
+        throttling.reset_stores()
+
+        self.assertEqual(self.login().status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,237 @@
+import hashlib
+import threading
+from array import array
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+THROTTLE_KEY = 'userapp:throttle:%s:%d'
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_sketch_width():
+    """Return the number of counters in each row of a sketch"""
+    return getattr(settings, 'RECIPE_THROTTLE_SKETCH_WIDTH', 16384)
+
+
+def get_sketch_depth():
+    """Return the number of rows, i.e. hash functions, of a sketch"""
+    return getattr(settings, 'RECIPE_THROTTLE_SKETCH_DEPTH', 4)
+
+
+def get_store(scope, duration):
+    """Return the counter store shared by the throttles of a scope"""
+    alias = getattr(settings, 'RECIPE_THROTTLE_CACHE_ALIAS', None)
+    with _stores_lock:
+        key = (scope, duration, alias)
+        if key not in _stores:
+            if alias:
+                _stores[key] = CacheStore(caches[alias], duration)
+            else:
+                _stores[key] = SketchStore(
+                    get_sketch_width(), get_sketch_depth()
+                )
+        return _stores[key]
+
+
+def reset_stores():
+    """Forget all throttle counts kept in the process"""
+    with _stores_lock:
+        _stores.clear()
+
+
+class CountMinSketch:
+    """Fixed-size approximate counter, which may overcount but never under"""
+
+    def __init__(self, width, depth):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('L', [0]) * width for _ in range(depth)]
+
+    def indexes(self, key):
+        """Return the counter of each row the key hashes to"""
+        digest = hashlib.blake2b(
+            key.encode(), digest_size=4 * self.depth
+        ).digest()
+        return [
+            int.from_bytes(digest[i * 4:i * 4 + 4], 'little') % self.width
+            for i in range(self.depth)
+        ]
+
+    def estimate(self, indexes):
+        """Return the smallest of the key's counters"""
+        return min(row[i] for row, i in zip(self.rows, indexes))
+
+    def add(self, indexes):
+        """Count one more occurrence of the key"""
+        for row, i in zip(self.rows, indexes):
+            row[i] += 1
+
+
+class SketchStore:
+    """In-process counts of the current and previous window"""
+
+    def __init__(self, width, depth):
+        self.width = width
+        self.depth = depth
+        self.lock = threading.Lock()
+        self.window = None
+        self.previous = self.current = None
+
+    def rotate(self, window):
+        """Move on to window, keeping the last one if it is adjacent"""
+        if window == self.window:
+            return
+        if self.window is not None and window == self.window + 1:
+            self.previous = self.current
+        else:
+            self.previous = CountMinSketch(self.width, self.depth)
+        self.current = CountMinSketch(self.width, self.depth)
+        self.window = window
+
+    def get_counts(self, key, window):
+        """Return the key's counts in the previous and current window"""
+        with self.lock:
+            self.rotate(window)
+            indexes = self.current.indexes(key)
+            return (self.previous.estimate(indexes),
+                    self.current.estimate(indexes))
+
+    def incr(self, key, window):
+        """Count a request for the key in the current window"""
+        with self.lock:
+            self.rotate(window)
+            self.current.add(self.current.indexes(key))
+
+
+class CacheStore:
+    """Counts of the current and previous window kept in a shared cache"""
+
+    def __init__(self, cache, duration):
+        self.cache = cache
+        self.timeout = 2 * duration
+
+    def make_key(self, key, window):
+        """Return the cache key counting key in window"""
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return THROTTLE_KEY % (digest, window)
+
+    def get_counts(self, key, window):
+        """Return the key's counts in the previous and current window"""
+        previous = self.make_key(key, window - 1)
+        current = self.make_key(key, window)
+        counts = self.cache.get_many([previous, current])
+        return counts.get(previous, 0), counts.get(current, 0)
+
+    def incr(self, key, window):
+        """Count a request for the key in the current window"""
+        cache_key = self.make_key(key, window)
+        self.cache.add(cache_key, 0, self.timeout)
+        try:
+            self.cache.incr(cache_key)
+        except ValueError:
+            # Expired between add and incr
+            self.cache.set(cache_key, 1, self.timeout)
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Limit requests per sliding window without touching the database
+
+    The count of the previous window is weighted by how much of it still
+    overlaps the sliding window, so only two counters are read per check.
+    """
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+
+    def get_rate(self):
+        """Return the rate of the scope from the current settings"""
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            msg = "No default throttle rate set for '%s' scope" % self.scope
+            raise ImproperlyConfigured(msg)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        window, elapsed = divmod(self.timer(), self.duration)
+        window = int(window)
+        store = get_store(self.scope, self.duration)
+        previous, current = store.get_counts(self.key, window)
+        weight = 1 - elapsed / self.duration
+
+        if previous * weight + current >= self.num_requests:
+            self.wait_seconds = self.get_wait(previous, current, elapsed)
+            return False
+
+        store.incr(self.key, window)
+        return True
+
+    def get_wait(self, previous, current, elapsed):
+        """Return the seconds until the estimate drops below the limit"""
+        if current < self.num_requests:
+            free = (self.num_requests - current) / previous
+            return max(0, self.duration * (1 - free) - elapsed)
+
+        # Wait for the next window, where this one becomes the previous
+        return self.duration - elapsed + \
+            self.duration * (1 - self.num_requests / current)
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    """Throttle requests by client IP"""
+
+    def get_ident(self, request):
+        """Return the client IP, from X-Forwarded-For only behind proxies
+
+        DRF trusts the whole X-Forwarded-For header the client sends when
+        NUM_PROXIES is unset, which would let every spoofed value start a
+        new budget, so REMOTE_ADDR is used unless NUM_PROXIES is set.
+        """
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get('REMOTE_ADDR')
+        return super().get_ident(request)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class LoginIPThrottle(IPThrottle):
+    """Throttle login attempts from one IP"""
+    scope = 'login_ip'
+
+
+class SignupIPThrottle(IPThrottle):
+    """Throttle sign ups from one IP"""
+    scope = 'signup_ip'
+
+
+class LoginEmailThrottle(SlidingWindowThrottle):
+    """Throttle login attempts for one email, whatever the IP"""
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        email = data.get('email') if hasattr(data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': email.strip().lower(),
+        }
@@ -1,26 +1,78 @@
-from rest_framework import generics, authentication, permissions
+from django.db import transaction
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from django.shortcuts import render
 
+from coreapp.models import ExpiringToken
+from userapp.authentication import CachedTokenAuthentication
 from userapp.serializers import UserSerializer, AuthTokenSerializer
+from userapp.throttling import LoginEmailThrottle, LoginIPThrottle, \
+    SignupIPThrottle
+
+
+def token_response(token):
+    """Return the response body describing a token"""
+    return {'token': token.key, 'expires': token.expires}
 
 
 class CreateUserView(generics.CreateAPIView):
     """Create a new user in the system"""
     serializer_class = UserSerializer
+    throttle_classes = (SignupIPThrottle,)
 
 
 class CreateTokenView(ObtainAuthToken):
     """Create a new user in the system"""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (LoginIPThrottle, LoginEmailThrottle)
+
+    def post(self, request, *args, **kwargs):
+        """Issue a new expiring token for valid credentials"""
+        serializer = self.serializer_class(
+            data=request.data, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        token = ExpiringToken.objects.create_token(
+            serializer.validated_data['user']
+        )
+
+        return Response(token_response(token))
+
+
+class RefreshTokenView(APIView):
+    """Swap the token of the request for a new one"""
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request):
+        """Issue a new token and revoke the one used for the request"""
+        with transaction.atomic():
+            token = ExpiringToken.objects.create_token(request.user)
+            ExpiringToken.objects.filter(key=request.auth.key).delete()
+
+        return Response(token_response(token))
+
+
+class RevokeTokenView(APIView):
+    """Revoke the token of the request"""
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request):
+        """Delete the token used for the request"""
+        ExpiringToken.objects.filter(key=request.auth.key).delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):